@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import uuid
+import time
+import datetime
+import tempfile
+import tracemalloc
+
+###########################################################################################################################
+#
+# nacteni systemdata.json - puvodni json.load s object_hook vs. proudove, selektivni get_demodata
+# synteticky soubor (vychozi 100 MB) obsahuje tabulky jinych sluzeb a mensi mnozstvi udalosti
+# spusteni: python -m benchmarks.bench_demodata [velikost v MB]
+#
+###########################################################################################################################
+
+def createSeedFile(filename, sizeMB=100):
+    """Zapise synteticky seed, cca 95 % objemu tvori tabulky, ktere tato sluzba nepouziva"""
+    now = datetime.datetime(2023, 1, 1)
+    def foreignRow(index):
+        return {
+            "id": f"{uuid.uuid4()}", "name": f"form {index}", "name_en": f"form {index}",
+            "type_id": f"{uuid.uuid4()}", "created": now.isoformat(), "lastchange": now.isoformat(),
+            "createdby": f"{uuid.uuid4()}", "description": "x" * 200
+        }
+    def eventRow(index):
+        return {
+            "id": f"{uuid.uuid4()}", "name": f"event {index}", "name_en": f"event {index}",
+            "type_id": f"{uuid.uuid4()}", "startdate": (now + datetime.timedelta(hours=index)).isoformat(),
+            "enddate": (now + datetime.timedelta(hours=index + 2)).isoformat(), "createdby": f"{uuid.uuid4()}"
+        }
+
+    targetSize = sizeMB * 1024 * 1024
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write("{")
+        index = 0
+        tableIndex = 0
+        while f.tell() < targetSize * 0.95:
+            f.write(f'"foreign{tableIndex}": [')
+            f.write(",".join(json.dumps(foreignRow(index + i)) for i in range(10000)))
+            f.write("],")
+            index = index + 10000
+            tableIndex = tableIndex + 1
+        f.write('"events": [')
+        eventCount = 0
+        while f.tell() < targetSize:
+            f.write(("," if eventCount > 0 else "") + ",".join(json.dumps(eventRow(eventCount + i)) for i in range(1000)))
+            eventCount = eventCount + 1000
+        f.write("]}")
+    return eventCount
+
+def legacyLoad(filename):
+    """puvodni get_demodata (json.load s konverzi klicu podle jmena)"""
+    def datetime_parser(json_dict):
+        for (key, value) in json_dict.items():
+            if key in ["startdate", "enddate", "lastchange", "created"]:
+                json_dict[key] = None if value is None else datetime.datetime.fromisoformat(value).replace(tzinfo=None)
+            if (key in ["id", "changedby", "createdby", "rbacobject"]) or ("_id" in key):
+                if value not in ["", None]:
+                    json_dict[key] = uuid.UUID(value)
+        return json_dict
+
+    with open(filename, "r", encoding="utf-8") as f:
+        return json.load(f, object_hook=datetime_parser)
+
+def streamingLoad(filename):
+    from src.DBFeeder import get_demodata
+    from src.DBDefinitions import EventTypeModel, PresenceTypeModel, InvitationTypeModel, EventModel, EventGroupModel, PresenceModel
+    dbModels = [EventTypeModel, PresenceTypeModel, InvitationTypeModel, EventModel, EventGroupModel, PresenceModel]
+    return get_demodata(dbModels, filename=filename)
+
+def measure(name, func, filename):
+    start = time.perf_counter()
+    result = func(filename)
+    duration = time.perf_counter() - start
+    eventCount = len(result.get("events", []))
+    del result
+
+    tracemalloc.start()
+    func(filename)
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<20} {duration:8.2f} s {peak / 1024 / 1024:10.1f} MB peak {eventCount:8} events")
+
+def main():
+    sizeMB = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "systemdata.json")
+        eventCount = createSeedFile(filename, sizeMB)
+        print(f"seed {os.path.getsize(filename) / 1024 / 1024:.1f} MB, {eventCount} events")
+        measure("json.load", legacyLoad, filename)
+        measure("get_demodata", streamingLoad, filename)
+
+if __name__ == "__main__":
+    main()
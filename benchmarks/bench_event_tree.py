@@ -0,0 +1,67 @@
+import asyncio
+import datetime
+import uuid
+
+from sqlalchemy import insert
+
+from .utils import createSessionMaker, measure
+
+###########################################################################################################################
+#
+# strom udalosti semestr -> tydny -> lekce (5000 listu)
+# porovnani vnorenych subEvents / masterEvent s descendants / ancestors (rekurzivni CTE)
+#
+###########################################################################################################################
+
+WEEKS = 20
+LESSONS = 5000
+
+async def createTree(asyncSessionMaker):
+    from src.DBDefinitions import EventModel
+    start = datetime.datetime(2023, 9, 1, 8, 0)
+    semester = {"id": uuid.uuid4(), "name": "semester", "startdate": start, "enddate": start + datetime.timedelta(weeks=WEEKS)}
+    weeks = [
+        {"id": uuid.uuid4(), "name": f"week {w}", "masterevent_id": semester["id"],
+         "startdate": start + datetime.timedelta(weeks=w), "enddate": start + datetime.timedelta(weeks=w + 1)}
+        for w in range(WEEKS)
+    ]
+    lessons = [
+        {"id": uuid.uuid4(), "name": f"lesson {l}", "masterevent_id": weeks[l % WEEKS]["id"],
+         "startdate": weeks[l % WEEKS]["startdate"] + datetime.timedelta(minutes=l), 
+         "enddate": weeks[l % WEEKS]["startdate"] + datetime.timedelta(minutes=l + 90)}
+        for l in range(LESSONS)
+    ]
+    async with asyncSessionMaker() as session:
+        await session.execute(insert(EventModel), [semester, *weeks, *lessons])
+        await session.commit()
+    return semester, weeks, lessons
+
+async def main():
+    asyncSessionMaker, counter = await createSessionMaker()
+    semester, weeks, lessons = await createTree(asyncSessionMaker)
+    print(f"tree: 1 semester, {len(weeks)} weeks, {len(lessons)} lessons")
+
+    variable_values = {"id": f"{semester['id']}"}
+    nested, _, _ = await measure(
+        "subEvents { subEvents }", asyncSessionMaker, counter,
+        """query($id: UUID!) { eventById(id: $id) { id subEvents { id subEvents { id } } } }""", variable_values)
+    cte, _, _ = await measure(
+        "descendants(maxDepth: 2)", asyncSessionMaker, counter,
+        """query($id: UUID!) { eventById(id: $id) { id descendants(maxDepth: 2) { id } } }""", variable_values)
+    nestedIds = {sub["id"] for week in nested.data["eventById"]["subEvents"] for sub in [week, *week["subEvents"]]}
+    cteIds = {row["id"] for row in cte.data["eventById"]["descendants"]}
+    assert nestedIds == cteIds, "descendants differ from nested subEvents"
+
+    variable_values = {"id": f"{lessons[-1]['id']}"}
+    await measure(
+        "masterEvent { masterEvent }", asyncSessionMaker, counter,
+        """query($id: UUID!) { eventById(id: $id) { id masterEvent { id masterEvent { id } } } }""", variable_values)
+    await measure(
+        "ancestors", asyncSessionMaker, counter,
+        """query($id: UUID!) { eventById(id: $id) { id ancestors { id } } }""", variable_values)
+
+    lessonPage = """query { eventPage(skip: 0, limit: 500) { id masterEvent { id masterEvent { id } } } }"""
+    await measure("eventPage(500) masterEvent x2", asyncSessionMaker, counter, lessonPage, repeat=3)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+import os
+import io
+import sys
+import time
+import uuid
+import asyncio
+import logging
+import contextlib
+
+from types import SimpleNamespace
+
+###########################################################################################################################
+#
+# propustnost has_permission: puvodni ladici vypisy (print, logging.info s f-retezci) proti trasovani (PERMISSIONTRACE)
+# role jsou v procesni cache, stdout a log (uroven INFO jako v main.py) jsou presmerovany do os.devnull
+#
+# spusteni: python -m benchmarks.bench_permission_trace
+#
+###########################################################################################################################
+
+CHECKS = 20000
+userId = "2d9dc5ca-a4a2-11ed-b9df-0242ac120003"
+administratorId = "ced46aa4-3217-4fc1-b79d-f6be7d21c6b6"
+
+def createInfo():
+    from src.Dataloaders import createLoaders
+    return SimpleNamespace(context={"loaders": createLoaders(None), "user": {"id": userId}})
+
+def createLegacyPermission(roles):
+    """has_permission pred odstranenim ladicich vypisu (stejne vypisy a stejny test roli)"""
+    from src._GraphPermissions import RolesToList
+    from src.GraphTypeDefinitionsExt import RBACObjectGQLModel
+    from src._GraphResolvers import getUserFromInfo
+    class RolebasedPermission:
+        async def has_permission(self, source, info, **kwargs):
+            logging.info(f"has_permission {kwargs}")
+            print("RolebasedPermission", self)
+            print("RolebasedPermission", source)
+            print("RolebasedPermission", kwargs)
+            roleIdsNeeded = RolesToList(roles)
+            rbacobject = source.rbacobject
+            authorizedroles = await RBACObjectGQLModel.resolve_roles(info=info, id=rbacobject)
+            print("RolebasedPermission.rbacobject", rbacobject)
+            print("RolebasedPermission.authorized", authorizedroles)
+            user = getUserFromInfo(info)
+            user_id = user["id"]
+            s = [r for r in authorizedroles if (r["roletype"]["id"] in roleIdsNeeded)and(r["user"]["id"] == user_id)]
+            logging.info(f"RolebasedPermission.authorized user {user} has roles {s}")
+            if len(s) > 0:
+                print("RolebasedPermission.access allowed")
+            else:
+                print("RolebasedPermission.access denied")
+            print(s)
+            print(roleIdsNeeded)
+            return len(s) > 0
+    return RolebasedPermission()
+
+async def throughput(name, permission, entities, perRequest=1):
+    """Provede CHECKS kontrol, kazdych perRequest kontrol v novem kontextu (requestu)"""
+    start = time.perf_counter()
+    info = None
+    for index in range(CHECKS):
+        if index % perRequest == 0:
+            info = createInfo()
+        allowed = permission.has_permission(entities[index % len(entities)], info)
+        if asyncio.iscoroutine(allowed):
+            await allowed
+    duration = time.perf_counter() - start
+    print(f"{name:<50} {CHECKS / duration:12.0f} checks/s", file=sys.__stdout__)
+
+async def main():
+    import src.GraphTypeDefinitions
+    from src import _GraphPermissions
+    from src._GraphPermissions import RoleBasedPermission, OnlyForAuthentized, authorizationCache, AuthorizedRoles
+
+    rbacobjects = [f"{uuid.uuid4()}" for _ in range(10)]
+    for index, rbacobject in enumerate(rbacobjects):
+        roles = [{"valid": True, "roletype": {"id": administratorId}, "user": {"id": f"{uuid.uuid4()}"}, "group": {"id": rbacobject}} for _ in range(20)]
+        if index % 2 == 0:
+            roles.append({"valid": True, "roletype": {"id": administratorId}, "user": {"id": userId}, "group": {"id": rbacobject}})
+        authorizationCache.put(rbacobject, AuthorizedRoles(roles))
+    authorizationCache.ttl = 3600
+    entities = [SimpleNamespace(rbacobject=rbacobject) for rbacobject in rbacobjects]
+
+    devnull = open(os.devnull, "w")
+    logging.basicConfig(level=logging.INFO, stream=devnull, force=True)
+    with contextlib.redirect_stdout(devnull):
+        print(f"{CHECKS} checks over {len(rbacobjects)} rbacobjects, every check in a new request", file=sys.__stdout__)
+        await throughput("RoleBasedPermission before (print, logging.info)", createLegacyPermission("administrator"), entities)
+        permission = RoleBasedPermission(roles="administrator")()
+        _GraphPermissions.isTracing = False
+        await throughput("RoleBasedPermission after, tracing off", permission, entities)
+        _GraphPermissions.isTracing = True
+        await throughput("RoleBasedPermission after, tracing on", permission, entities)
+
+        os.environ["DEMO"] = "True"
+        class LegacyDemo:
+            async def has_permission(self, source, info, **kwargs):
+                print("DEMO Enabled, not for production")
+                return True
+        await throughput("OnlyForAuthentized DEMO before (print)", LegacyDemo(), entities, perRequest=100)
+        _GraphPermissions.isTracing = False
+        await throughput("OnlyForAuthentized DEMO after, tracing off", OnlyForAuthentized(isList=False)(), entities, perRequest=100)
+    devnull.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+import asyncio
+import time
+import statistics
+import uuid
+
+from types import SimpleNamespace
+
+###########################################################################################################################
+#
+# vyhodnoceni opravneni na strance 500 polozek (RoleBasedPermission, OnlyForAuthentized)
+# role na rbacobject jsou cteny z falesneho zdroje (bez site), merena je jen rezie opravneni
+#
+# spusteni: python -m benchmarks.bench_permissions
+#
+###########################################################################################################################
+
+ITEMS = 500
+RBACOBJECTS = 25
+REPEAT = 20
+userId = "2d9dc5ca-a4a2-11ed-b9df-0242ac120003"
+administratorId = "ced46aa4-3217-4fc1-b79d-f6be7d21c6b6"
+
+def createRoles(rbacobjects):
+    # uzivatel je administratorem na kazdem druhem rbacobject, ostatni role patri jinym uzivatelum
+    result = {}
+    for index, rbacobject in enumerate(rbacobjects):
+        roles = [
+            {"valid": True, "roletype": {"id": administratorId}, "user": {"id": f"{uuid.uuid4()}"}, "group": {"id": None}}
+            for _ in range(20)]
+        if index % 2 == 0:
+            roles.append({"valid": True, "roletype": {"id": administratorId}, "user": {"id": userId}, "group": {"id": None}})
+        result[rbacobject] = roles
+    return result
+
+def createInfo():
+    from src.Dataloaders import createLoaders
+    return SimpleNamespace(context={"loaders": createLoaders(None), "user": {"id": userId}})
+
+async def timeit(name, run):
+    durations = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = await run()
+        durations.append(time.perf_counter() - start)
+    print(f"{name:<45} {statistics.median(durations) * 1000:10.2f} ms")
+    return result
+
+async def main():
+    import src.GraphTypeDefinitions
+    from src._GraphPermissions import RoleBasedPermission, OnlyForAuthentized, authorizationCache
+
+    rbacobjects = [f"{uuid.uuid4()}" for _ in range(RBACOBJECTS)]
+    roles = createRoles(rbacobjects)
+    calls = {"count": 0}
+    async def readAuthorizations(keys, token=None):
+        calls["count"] = calls["count"] + 1
+        return [roles[key] for key in keys]
+    authorizationCache.readAuthorizations = readAuthorizations
+    entities = [SimpleNamespace(id=index, rbacobject=rbacobjects[index % RBACOBJECTS]) for index in range(ITEMS)]
+    Permission = RoleBasedPermission(roles="administrator")
+    print(f"page of {ITEMS} items, {RBACOBJECTS} distinct rbacobjects, median of {REPEAT} requests")
+
+    async def perItemUncached():
+        # puvodni zpusob: role na rbacobject a jejich pruchod pro kazdou polozku zvlast
+        info = createInfo()
+        result = []
+        for entity in entities:
+            authorizedroles = await info.context["loaders"].authorizations.load(entity.rbacobject)
+            s = [r for r in authorizedroles if (r["roletype"]["id"] in [administratorId]) and (r["user"]["id"] == userId)]
+            if len(s) > 0:
+                result.append(entity)
+        return result
+
+    async def perItem():
+        info = createInfo()
+        permission = Permission()
+        return [entity for entity in entities if await permission.has_permission(entity, info)]
+
+    async def listLevel():
+        return await Permission.filterPermitted(createInfo(), entities)
+
+    authorizationCache.clear()
+    uncached = await timeit("per item, list scan (before)", perItemUncached)
+    authorizationCache.clear()
+    item = await timeit("per item has_permission (request memo)", perItem)
+    authorizationCache.clear()
+    calls["count"] = 0
+    bulk = await timeit("list level filterPermitted", listLevel)
+    assert [e.id for e in uncached] == [e.id for e in item] == [e.id for e in bulk]
+    print(f"{len(bulk)} of {ITEMS} items permitted, role source called {calls['count']} times for {REPEAT} list level requests")
+
+    # createdby + changedby na kazde polozce = 2 * ITEMS volani OnlyForAuthentized
+    import os
+    os.environ["DEMO"] = "False"
+    authentized = OnlyForAuthentized(isList=False)()
+    async def onlyForAuthentized():
+        info = createInfo()
+        for _ in range(2 * ITEMS):
+            authentized.has_permission(None, info)
+    await timeit(f"OnlyForAuthentized x {2 * ITEMS}", onlyForAuthentized)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+import sys
+import time
+import uuid
+import asyncio
+import datetime
+
+from .utils import createSessionMaker
+
+###########################################################################################################################
+#
+# naplneni DB - ImportModels (ORM, po 30 radcich) vs. BulkImportModels (COPY / INSERT s vice radky)
+# spusteni: python -m benchmarks.bench_seeding [pocet udalosti] [connectionstring]
+#
+###########################################################################################################################
+
+def createData(eventCount, presencesPerEvent=10):
+    start = datetime.datetime(2023, 9, 1, 8, 0)
+    events = [
+        {"id": uuid.uuid4(), "name": f"event {index}", "startdate": start + datetime.timedelta(hours=index),
+         "enddate": start + datetime.timedelta(hours=index + 2)}
+        for index in range(eventCount)
+    ]
+    presences = [
+        {"id": uuid.uuid4(), "event_id": event["id"], "user_id": uuid.uuid4()}
+        for event in events for _ in range(presencesPerEvent)
+    ]
+    return {"events": events, "events_users": presences}
+
+async def main():
+    from uoishelpers.feeders import ImportModels
+    from src.DBFeeder import BulkImportModels
+    from src.DBDefinitions import EventModel, PresenceModel
+
+    eventCount = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    connectionstring = sys.argv[2] if len(sys.argv) > 2 else "sqlite+aiosqlite:///:memory:"
+    jsonData = createData(eventCount)
+    rowCount = sum(len(rows) for rows in jsonData.values())
+    dbModels = [EventModel, PresenceModel]
+
+    for name, importFunction in [("ImportModels", ImportModels), ("BulkImportModels", BulkImportModels)]:
+        asyncSessionMaker, _ = await createSessionMaker(connectionstring)
+        start = time.perf_counter()
+        await importFunction(asyncSessionMaker, dbModels, jsonData)
+        duration = time.perf_counter() - start
+        print(f"{name:<20} {rowCount} rows {duration:8.2f} s {rowCount / duration:10.0f} rows/s")
+
+    start = time.perf_counter()
+    await BulkImportModels(asyncSessionMaker, dbModels, jsonData)
+    print(f"{'repeated (no-op)':<20} {time.perf_counter() - start:8.2f} s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+import asyncio
+import tempfile
+
+###########################################################################################################################
+#
+# studeny start - startEngine s create_all pri kazdem startu vs. startEngine s otiskem schematu
+# spusteni: python -m benchmarks.bench_startup [connectionstring]
+#
+###########################################################################################################################
+
+async def createAllBoot(connectionstring):
+    """puvodni chovani startEngine, create_all pri kazdem startu"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from src.DBDefinitions import BaseModel
+    asyncEngine = create_async_engine(connectionstring)
+    async with asyncEngine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+    await asyncEngine.dispose()
+
+async def fingerprintBoot(connectionstring):
+    from src.DBDefinitions import startEngine
+    asyncSessionMaker = await startEngine(connectionstring, makeDrop=False, makeUp=True)
+    await asyncSessionMaker.kw["bind"].dispose()
+
+async def measure(name, boot, connectionstring, repeat=20):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await boot(connectionstring)
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    print(f"{name:<20} median {durations[len(durations) // 2] * 1000:8.1f} ms")
+
+async def main():
+    with tempfile.TemporaryDirectory() as directory:
+        defaultConnectionstring = f"sqlite+aiosqlite:///{os.path.join(directory, 'data.sqlite')}"
+        connectionstring = sys.argv[1] if len(sys.argv) > 1 else defaultConnectionstring
+        # prvni start vytvori tabulky a ulozi otisk
+        await fingerprintBoot(connectionstring)
+        await measure("create_all", createAllBoot, connectionstring)
+        await measure("fingerprint", fingerprintBoot, connectionstring)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+import asyncio
+import datetime
+import uuid
+
+from sqlalchemy import insert
+
+from .utils import createSessionMaker, measure
+
+###########################################################################################################################
+#
+# stranka 1000 udalosti s federacnimi odkazy (createdby, changedby, groups)
+# odkazy jsou jen stuby (id), merena je rezie jejich vytvoreni
+#
+# spusteni: python -m benchmarks.bench_stubs
+#
+###########################################################################################################################
+
+EVENTS = 1000
+USERS = 50
+REPEAT = 30
+
+async def createEvents(asyncSessionMaker):
+    from src.DBDefinitions import EventModel, EventGroupModel
+    userIds = [uuid.uuid4() for _ in range(USERS)]
+    start = datetime.datetime(2024, 1, 1)
+    events = [
+        {"id": uuid.uuid4(), "name": f"event {index}", "startdate": start + datetime.timedelta(hours=index),
+         "createdby": userIds[index % USERS], "changedby": userIds[(index * 7) % USERS]}
+        for index in range(EVENTS)]
+    groups = [{"id": uuid.uuid4(), "event_id": event["id"], "group_id": userIds[index % USERS]} for index, event in enumerate(events)]
+    async with asyncSessionMaker() as session:
+        await session.execute(insert(EventModel), events)
+        await session.execute(insert(EventGroupModel), groups)
+        await session.commit()
+
+async def main():
+    asyncSessionMaker, counter = await createSessionMaker()
+    await createEvents(asyncSessionMaker)
+    print(f"{EVENTS} events, {USERS} distinct users")
+    await measure(
+        "eventPage { id }", asyncSessionMaker, counter,
+        """query($limit: Int) { eventPage(limit: $limit) { id } }""", {"limit": EVENTS}, repeat=REPEAT)
+    await measure(
+        "eventPage { createdby { id } }", asyncSessionMaker, counter,
+        """query($limit: Int) { eventPage(limit: $limit) { id createdby { id } } }""", {"limit": EVENTS}, repeat=REPEAT)
+    await measure(
+        "eventPage { createdby changedby }", asyncSessionMaker, counter,
+        """query($limit: Int) { eventPage(limit: $limit) { id createdby { id } changedby { id } } }""", {"limit": EVENTS}, repeat=REPEAT)
+    await measure(
+        "eventPage { groups { id } }", asyncSessionMaker, counter,
+        """query($limit: Int) { eventPage(limit: $limit) { id groups { id } } }""", {"limit": EVENTS}, repeat=REPEAT)
+
+if __name__ == "__main__":
+    asyncio.run(main())
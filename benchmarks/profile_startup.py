@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import subprocess
+
+###########################################################################################################################
+#
+# profil startu - doba importu jednotlivych modulu (python -X importtime) a doba sestaveni GQL schematu
+# spusteni: python -m benchmarks.profile_startup [pocet radku] [modul]
+#
+###########################################################################################################################
+
+# promenne prostredi, ktere main.py pri importu vyzaduje
+bootEnv = {
+    "DEMO": "True",
+    "GQLUG_ENDPOINT_URL": "http://localhost:8124/gql",
+    "JWTPUBLICKEYURL": "http://localhost:8000/oauth/publickey",
+    "JWTRESOLVEUSERPATHURL": "http://localhost:8000/oauth/userinfo",
+}
+
+def importProfile(module="main"):
+    """Importuje module v novem procesu, vraci (celkova doba v s, list (modul, vlastni us, kumulativni us))"""
+    env = {**bootEnv, **os.environ}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, capture_output=True, text=True, check=True
+    )
+    duration = time.perf_counter() - start
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        [selfTime, cumulative, name] = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(selfTime), int(cumulative)))
+    return duration, rows
+
+def schemaBuildTime(repeat=5):
+    """Doba sestaveni GQL schematu tak, jak jej sestavuje src.GraphTypeDefinitions (bez importu modulu), median v s"""
+    from src.GraphTypeDefinitions import FederationSchema, Query, Mutation
+    from src.GraphTypeDefinitionsExt import UserGQLModel, GroupGQLModel
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        FederationSchema(Query, types=(UserGQLModel, GroupGQLModel), mutation=Mutation)
+        durations.append(time.perf_counter() - start)
+    return sorted(durations)[len(durations) // 2]
+
+def main():
+    top = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    module = sys.argv[2] if len(sys.argv) > 2 else "main"
+    duration, rows = importProfile(module)
+    print(f"import {module}: {duration * 1000:.0f} ms (process wall time)")
+
+    print(f"\n{'module':<60} {'self ms':>9} {'cumul. ms':>10}")
+    for name, selfTime, cumulative in sorted(rows, key=lambda row: row[2], reverse=True)[:top]:
+        print(f"{name:<60} {selfTime / 1000:9.1f} {cumulative / 1000:10.1f}")
+
+    print(f"\nown modules")
+    for name, selfTime, cumulative in rows:
+        if name in ["main", "src"] or name.startswith("src."):
+            print(f"{name:<60} {selfTime / 1000:9.1f} {cumulative / 1000:10.1f}")
+
+    os.environ.update({**bootEnv, **os.environ})
+    print(f"\nschema build: {schemaBuildTime() * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
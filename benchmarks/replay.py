@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+
+from .suite import percentile
+
+###########################################################################################################################
+#
+# prehravani zaznamenanych GQL operaci proti ASGI aplikaci (main.app) bez site (httpx.ASGITransport)
+#
+# vstup:
+#   queries.txt (fixture QueriesFile), radky `"jmeno": {"query": ..., "mutation": ..., "variables": ...},`
+#   JSONL, radky {"query": ..., "variables": ..., "operationName": ...}
+# radky bez dotazu jsou preskoceny
+#
+# spusteni:
+#   python -m benchmarks.replay queries.txt --concurrency 20 --rate 200 --requests 2000
+#   DEMODATA=True DEMODATAFILE=data.json python -m benchmarks.replay queries.txt --db sqlite+aiosqlite:///data.sqlite
+#
+###########################################################################################################################
+
+def parseLine(line):
+    """Vrati dict (query, variables, operationName) nebo None"""
+    line = line.strip().rstrip(",").strip()
+    if line == "":
+        return None
+    try:
+        data = json.loads(line)
+    except json.JSONDecodeError:
+        # radek z queries.txt je fragment JSON objektu
+        try:
+            data = json.loads("{" + line + "}")
+        except json.JSONDecodeError:
+            return None
+    if not isinstance(data, dict):
+        return None
+    if len(data) == 1:
+        [value] = data.values()
+        if isinstance(value, dict):
+            data = value
+    query = data.get("query", None) or data.get("mutation", None)
+    if not isinstance(query, str):
+        return None
+    operation = {"query": query, "variables": data.get("variables", None) or {}}
+    if data.get("operationName", None) is not None:
+        operation["operationName"] = data["operationName"]
+    return operation
+
+def loadOperations(filenames):
+    operations = []
+    skipped = 0
+    for filename in filenames:
+        with open(filename, "r", encoding="utf-8") as f:
+            for line in f:
+                operation = parseLine(line)
+                if operation is None:
+                    skipped = skipped + 1
+                else:
+                    operations.append(operation)
+    return operations, skipped
+
+class PoolWaitMeter:
+    """Meri dobu ziskani spojeni z poolu SQLAlchemy enginu"""
+    def __init__(self, asyncEngine):
+        self.waits = []
+        pool = asyncEngine.sync_engine.pool
+        connect = pool.connect
+        def measuredConnect():
+            start = time.perf_counter()
+            try:
+                return connect()
+            finally:
+                self.waits.append(time.perf_counter() - start)
+        pool.connect = measuredConnect
+
+async def replay(app, operations, requests, concurrency, rate=None):
+    """Odesle requests operaci (cyklicky z operations), nejvyse concurrency soucasne.
+    Je-li rate uvedeno, jsou operace spousteny v pravidelnych intervalech (ops/s), jinak co nejrychleji.
+    Vraci (doba v s, list latenci v s, pocet chyb).
+    """
+    import httpx
+    latencies = []
+    errors = {"count": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay") as client:
+        async def send(operation):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/gql", json=operation)
+                    failed = (response.status_code != 200) or (response.json().get("errors", None) is not None)
+                except Exception:
+                    failed = True
+                latencies.append(time.perf_counter() - start)
+                if failed:
+                    errors["count"] = errors["count"] + 1
+
+        start = time.perf_counter()
+        tasks = []
+        for index in range(requests):
+            if rate is not None:
+                delay = start + index / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                # bez rate neni treba vytvaret vice cekajicich uloh, nez kolik jich muze bezet
+                await semaphore.acquire()
+                semaphore.release()
+            tasks.append(asyncio.create_task(send(operations[index % len(operations)])))
+        await asyncio.gather(*tasks)
+        duration = time.perf_counter() - start
+    return duration, latencies, errors["count"]
+
+async def run(args):
+    os.environ.setdefault("DEMO", "True")
+    os.environ.setdefault("GQLUG_ENDPOINT_URL", "http://localhost:8124/gql")
+    os.environ.setdefault("JWTPUBLICKEYURL", "http://localhost:8000/oauth/publickey")
+    os.environ.setdefault("JWTRESOLVEUSERPATHURL", "http://localhost:8000/oauth/userinfo")
+    import main
+    main.connectionString = args.db
+
+    operations, skipped = loadOperations(args.files)
+    assert len(operations) > 0, f"no operations found in {args.files} ({skipped} lines skipped)"
+    print(f"{len(operations)} operations loaded, {skipped} lines skipped")
+
+    async with main.lifespan(main.app):
+        asyncSessionMaker = await main.RunOnceAndReturnSessionMaker()
+        meter = PoolWaitMeter(asyncSessionMaker.kw["bind"])
+        (duration, latencies, errors) = await replay(main.app, operations, args.requests, args.concurrency, args.rate)
+
+    print(f"requests     {len(latencies)} in {duration:.2f} s, concurrency {args.concurrency}, target rate {args.rate or 'max'}")
+    print(f"throughput   {len(latencies) / duration:.1f} req/s")
+    print(f"latency      p50 {percentile(latencies, 0.5) * 1000:.1f} ms, p95 {percentile(latencies, 0.95) * 1000:.1f} ms, p99 {percentile(latencies, 0.99) * 1000:.1f} ms")
+    print(f"errors       {errors} ({errors / len(latencies):.1%})")
+    if len(meter.waits) > 0:
+        print(f"pool wait    {len(meter.waits)} checkouts, mean {sum(meter.waits) / len(meter.waits) * 1000:.2f} ms, p95 {percentile(meter.waits, 0.95) * 1000:.2f} ms, total {sum(meter.waits):.2f} s")
+
+def main():
+    parser = argparse.ArgumentParser(description="replays recorded GQL operations against main.app in process")
+    parser.add_argument("files", nargs="+", help="queries.txt or JSONL files")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=None, help="target requests per second, default is as fast as possible")
+    parser.add_argument("--db", default="sqlite+aiosqlite:///:memory:", help="connection string used instead of ComposeConnectionString()")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import time
+import statistics
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+###########################################################################################################################
+#
+# spolecne funkce pro benchmarky
+# spusteni napr. python -m benchmarks.bench_event_tree
+#
+###########################################################################################################################
+
+# dotazy jsou mereny bez vyhodnoceni opravneni (DEMO rezim), opravneni meri bench_permissions
+os.environ.setdefault("DEMO", "True")
+
+class StatementCounter:
+    """Pocita SQL prikazy poslane do DB enginem"""
+    def __init__(self, asyncEngine):
+        self.count = 0
+        event.listen(asyncEngine.sync_engine, "before_cursor_execute", self.increment)
+
+    def increment(self, *args, **kwargs):
+        self.count = self.count + 1
+
+    def reset(self):
+        self.count = 0
+
+
+async def createSessionMaker(connectionstring="sqlite+aiosqlite:///:memory:"):
+    """Vytvori prazdnou databazi a vrati dvojici (asyncSessionMaker, StatementCounter)"""
+    from src.DBDefinitions import BaseModel
+    asyncEngine = create_async_engine(connectionstring)
+    async with asyncEngine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.drop_all)
+        await conn.run_sync(BaseModel.metadata.create_all)
+
+    asyncSessionMaker = sessionmaker(
+        asyncEngine, expire_on_commit=False, class_=AsyncSession
+    )
+    return asyncSessionMaker, StatementCounter(asyncEngine)
+
+
+def createContext(asyncSessionMaker, user={"id": "2d9dc5ca-a4a2-11ed-b9df-0242ac120003"}):
+    """Kontext pro schema.execute, stejne jako v main.get_context jsou loadery vytvoreny pro kazdy dotaz znovu"""
+    from src.Dataloaders import createLoadersContext
+
+    class Request:
+        scope = {"user": user}
+        headers = {}
+        cookies = {}
+
+    context = createLoadersContext(asyncSessionMaker)
+    context["request"] = Request()
+    context["user"] = user
+    return context
+
+
+async def measure(name, asyncSessionMaker, counter, query, variable_values={}, repeat=10):
+    """Provede query repeat krat (vzdy s novym kontextem) a vytiskne median doby a pocet SQL prikazu na jedno provedeni"""
+    from src.GraphTypeDefinitions import schema
+    durations = []
+    for _ in range(repeat):
+        context = createContext(asyncSessionMaker)
+        counter.reset()
+        start = time.perf_counter()
+        result = await schema.execute(query, variable_values=variable_values, context_value=context)
+        durations.append(time.perf_counter() - start)
+        assert result.errors is None, result.errors
+    median = statistics.median(durations)
+    print(f"{name:<40} {median * 1000:10.1f} ms {counter.count:8} statements")
+    return result, median, counter.count
@@ -8,14 +8,12 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from strawberry.fastapi import GraphQLRouter
-from strawberry.asgi import GraphQL
 
 import logging
 import logging.handlers
 
 from src.GraphTypeDefinitions import schema
-from src.DBDefinitions import startEngine, ComposeConnectionString
-from src.DBFeeder import initDB
+from src.DBDefinitions import startEngine, ComposeConnectionString, EventModel, PresenceModel
 from uoishelpers.authenticationMiddleware import createAuthentizationSentinel
 
 # region logging setup
@@ -70,12 +68,14 @@ async def RunOnceAndReturnSessionMaker():
     """Provadi inicializaci asynchronniho db engine, inicializaci databaze a vraci asynchronni SessionMaker.
     Protoze je dekorovana, volani teto funkce se provede jen jednou a vystup se zapamatuje a vraci se pri dalsich volanich.
     """
+    from src.DBFeeder import initDB
 
     makeDrop = os.getenv("DEMO", None) == "True"
-    logging.info(f'starting engine for "{connectionString} makeDrop={makeDrop}"')
+    makePartitions = os.getenv("EVENTS_PARTITIONED", None) == "True"
+    logging.info(f'starting engine for "{connectionString} makeDrop={makeDrop} makePartitions={makePartitions}"')
 
     result = await startEngine(
-        connectionstring=connectionString, makeDrop=makeDrop, makeUp=True
+        connectionstring=connectionString, makeDrop=makeDrop, makeUp=True, makePartitions=makePartitions
     )
 
     logging.info(f"initializing system structures")
@@ -138,8 +138,13 @@ async def get_context(request: Request):
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    from src._GraphPermissions import roleCatalogue
     initizalizedEngine = await RunOnceAndReturnSessionMaker()
+    # v DEMO rezimu staci vestaveny katalog roli (rolelist)
+    if os.getenv("DEMO", None) != "True":
+        await roleCatalogue.start()
     yield
+    await roleCatalogue.stop()
 
 app = FastAPI(lifespan=lifespan)
 # app.mount("/gql", graphql_app)
@@ -177,8 +182,55 @@ async def apollo_gql(request: Request, item: Item):
     result = {"data": schemaresult.data}
     if schemaresult.errors:
         result["errors"] = [f"{error}" for error in schemaresult.errors]
+    if "trace" in context:
+        # jen pri PERMISSIONTRACE=True
+        result["extensions"] = {"trace": context["trace"]}
     return result
 
+class ExportItem(BaseModel):
+    where: dict = None
+    format: str = "ndjson"
+
+async def exportRows(request: Request, item: ExportItem, DBModel, createStatement):
+    from fastapi.responses import StreamingResponse
+    from src.GraphTypeDefinitions import EventInputFilter
+    from src.DBExport import formats, convertWhere, streamRows
+
+    DEMOE = os.getenv("DEMO", None)
+    sentinelItem = Item(query=f"export {DBModel.__tablename__}")
+    sentinelResult = await sentinel(request, sentinelItem)
+    if DEMOE == "False":
+        if sentinelResult:
+            logging.info(f"sentinel test failed for export={item} \n request={request}")
+            return sentinelResult
+    
+    if item.format not in formats:
+        return JSONResponse({"errors": [f"unknown format `{item.format}`, use one of {list(formats.keys())}"]}, status_code=400)
+    allowedNames = [field.python_name for field in EventInputFilter.__strawberry_definition__.fields]
+    try:
+        where = None if item.where is None else convertWhere(EventModel, item.where, allowedNames=allowedNames)
+        statement = createStatement(where)
+    except Exception as e:
+        return JSONResponse({"errors": [f"{type(e).__name__}: {e}"]}, status_code=400)
+
+    asyncSessionMaker = await RunOnceAndReturnSessionMaker()
+    return StreamingResponse(
+        streamRows(asyncSessionMaker, DBModel, statement, format=item.format),
+        media_type=formats[item.format]
+    )
+
+@app.post("/export/events")
+async def export_events(request: Request, item: ExportItem):
+    """Streams events selected by where (same structure as EventInputFilter) as NDJSON or CSV"""
+    from src.DBExport import create_statement_for_events_export
+    return await exportRows(request, item, EventModel, create_statement_for_events_export)
+
+@app.post("/export/presences")
+async def export_presences(request: Request, item: ExportItem):
+    """Streams presences of events selected by where (same structure as EventInputFilter) as NDJSON or CSV"""
+    from src.DBExport import create_statement_for_presences_export
+    return await exportRows(request, item, PresenceModel, create_statement_for_presences_export)
+
 logging.info("All initialization is done")
 
 # @app.get('/hello')
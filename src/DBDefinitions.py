@@ -1,4 +1,3 @@
-from email.policy import default
 import sqlalchemy
 import datetime
 import uuid
@@ -13,8 +12,8 @@ from sqlalchemy import (
     Sequence,
     Table,
     Boolean,
+    Index,
 )
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import declarative_base
 from .uuid import UUIDColumn, UUIDFKey
@@ -36,6 +35,13 @@ BaseModel = declarative_base()
 ###########################################################################################################################
 class EventModel(BaseModel):
     __tablename__ = "events"
+    __table_args__ = (
+        # indexy pro strankovani podle klice (eventConnection)
+        Index("ix_events_startdate_id", "startdate", "id"),
+        Index("ix_events_lastchange_id", "lastchange", "id"),
+        # udalosti typu razene podle startdate (EventTypeGQLModel.events), pocty udalosti typu
+        Index("ix_events_type_id_startdate_id", "type_id", "startdate", "id"),
+    )
 
     id = UUIDColumn()
     name = Column(String)
@@ -56,6 +62,10 @@ class EventModel(BaseModel):
     masterevent_id = Column(ForeignKey("events.id"), index=True, nullable=True)
     type_id = Column(ForeignKey("eventtypes.id"), index=True)
     type = relationship("EventTypeModel", back_populates="events")
+    # jen pro eager loading (selectinload) strankovanych udalosti, zapisy jdou vzdy pres cizi klice
+    presences = relationship("PresenceModel", viewonly=True)
+    groups = relationship("EventGroupModel", viewonly=True)
+    subevents = relationship("EventModel", viewonly=True)
 
 class EventTypeModel(BaseModel):
     __tablename__ = "eventtypes"
@@ -94,6 +104,10 @@ class EventGroupModel(BaseModel):
 ##########################################################
 class PresenceModel(BaseModel):
     __tablename__ = "events_users"
+    __table_args__ = (
+        # index pro strankovani podle klice (eventPresenceConnection)
+        Index("ix_events_users_lastchange_id", "lastchange", "id"),
+    )
     id = UUIDColumn()
 
     event_id = Column(ForeignKey("events.id"), index=True)
@@ -142,6 +156,150 @@ class InvitationTypeModel(BaseModel):
 #
 ##########################################################
 
+##########################################################
+#
+# Stav synchronizace seed dat (src.DBFeeder.SyncModels)
+#
+# Pro kazdou tabulku je ulozen hash zdrojovych dat, pocet radku v DB po synchronizaci a cas synchronizace (lastchange).
+# Tabulka je soucasti BaseModel.metadata, makeDrop ji tedy smaze spolu s daty a nasledna synchronizace tabulky znovu naplni.
+#
+##########################################################
+
+feederStateTable = Table(
+    "feeder_state", BaseModel.metadata,
+    Column("tablename", String, primary_key=True),
+    Column("hash", String),
+    Column("rowcount", BigInteger),
+    Column("lastchange", DateTime, server_default=sqlalchemy.sql.func.now())
+)
+
+def currentTimestamp(dialectName):
+    """Aktualni cas urceny v DB (jako server_default sloupcu lastchange), ne hodinami aplikace.
+    V SQLite je pouzit cas s milisekundami, CURRENT_TIMESTAMP ma presnost jen na sekundy.
+    """
+    if dialectName == "sqlite":
+        return sqlalchemy.func.strftime("%Y-%m-%d %H:%M:%f", "now")
+    return sqlalchemy.func.now()
+
+##########################################################
+#
+# Volitelne rozdeleni tabulky events na partitions podle startdate (jen PostgreSQL)
+#
+# Partitioned tabulka musi mit startdate v primarnim klici, id tedy neni samo o sobe unikatni
+# a nelze na nej odkazovat cizim klicem. Constraints odkazujici na events.id (vcetne events.masterevent_id) proto v tomto rezimu
+# nejsou v DB vytvoreny (v metadatech zustavaji, takze ORM joiny funguji beze zmeny).
+# Ostatni cizi klice tabulky events (napr. events.type_id -> eventtypes.id) zustavaji.
+# Tabulka events_users partitioned neni, nema vlastni casovy sloupec.
+#
+##########################################################
+
+partitioning = {"events": False}
+
+def eventsNotPartitioned(ddl, target, bind, state=None, **kwargs):
+    return not state["events"]
+
+for table in [EventModel.__table__, EventGroupModel.__table__, PresenceModel.__table__]:
+    for constraint in table.foreign_key_constraints:
+        if constraint.referred_table is EventModel.__table__:
+            constraint.ddl_if(callable_=eventsNotPartitioned, state=partitioning)
+
+def partitionedEventsTable():
+    """Tabulka events (v samostatnych metadatech) ve variante PARTITION BY RANGE (startdate)"""
+    source = EventModel.__table__
+    columns = [
+        Column(
+            column.name, column.type,
+            # cizi klice na jine tabulky jsou zachovany, na events (masterevent_id) odkazovat nelze
+            *[ForeignKey(foreignKey.column) for foreignKey in column.foreign_keys if foreignKey.column.table is not source],
+            nullable=column.nullable and column.name != "startdate",
+            server_default=None if column.server_default is None else column.server_default.arg,
+            comment=column.comment
+        )
+        for column in source.columns
+    ]
+    table = Table(
+        source.name, sqlalchemy.MetaData(), *columns,
+        sqlalchemy.PrimaryKeyConstraint("id", "startdate"),
+        postgresql_partition_by="RANGE (startdate)"
+    )
+    for index in source.indexes:
+        Index(index.name, *[table.c[column.name] for column in index.columns])
+    return table
+
+def createPartitionedEventsTable(connection):
+    """Vytvori (pokud neexistuje) tabulku events jako PARTITION BY RANGE (startdate)"""
+    partitionedEventsTable().create(connection, checkfirst=True)
+
+def addMonths(date, months):
+    monthIndex = date.month - 1 + months
+    return datetime.date(date.year + monthIndex // 12, monthIndex % 12 + 1, 1)
+
+def createEventPartitions(connection, start=None, count=12, months=1):
+    """Vytvori (pokud neexistuji) partitions tabulky events pro count obdobi o delce months mesicu, pocinaje mesicem start (vychozi je aktualni mesic),
+    a vychozi partition events_default pro vsechny ostatni hodnoty startdate.
+    Obdobi nesmi zasahovat do jiz existujicich partitions a v events_default nesmi byt radky z vytvareneho obdobi.
+    """
+    start = datetime.date.today() if start is None else start
+    lower = datetime.date(start.year, start.month, 1)
+    connection.execute(sqlalchemy.text("CREATE TABLE IF NOT EXISTS events_default PARTITION OF events DEFAULT"))
+    for _ in range(count):
+        upper = addMonths(lower, months)
+        connection.execute(sqlalchemy.text(
+            f"CREATE TABLE IF NOT EXISTS events_p{lower:%Y%m} PARTITION OF events "
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        ))
+        lower = upper
+
+async def createUpcomingEventPartitions(asyncSessionMaker, start=None, count=12, months=1):
+    """Asynchronni varianta createEventPartitions, urcena pro periodicke zakladani partitions pro nadchazejici obdobi"""
+    async with asyncSessionMaker() as session:
+        await session.run_sync(lambda session: createEventPartitions(session.connection(), start=start, count=count, months=months))
+        await session.commit()
+
+##########################################################
+#
+# Otisk (fingerprint) schematu
+#
+# Hash DDL vsech tabulek BaseModel.metadata je ulozen v tabulce schema_version.
+# Pokud je otisk v DB shodny, startEngine DDL (create_all) neprovadi.
+# Jinak DDL provede jediny proces (v PostgreSQL pod advisory lock), ostatni na nej cekaji a otisk pak jen overi.
+#
+##########################################################
+
+SCHEMANAME = "gql_events"
+schemaVersionTable = Table(
+    "schema_version", sqlalchemy.MetaData(),
+    Column("name", String, primary_key=True),
+    Column("fingerprint", String),
+    Column("lastchange", DateTime, server_default=sqlalchemy.sql.func.now())
+)
+
+def schemaFingerprint(dialect):
+    """Vrati sha256 z DDL (pro dany dialect) vsech tabulek a indexu BaseModel.metadata"""
+    import hashlib
+    from sqlalchemy.schema import CreateTable, CreateIndex
+    statements = [f"partitioning={partitioning}"]
+    for table in BaseModel.metadata.sorted_tables:
+        statements.append(f"{CreateTable(table).compile(dialect=dialect)}")
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            statements.append(f"{CreateIndex(index).compile(dialect=dialect)}")
+    return hashlib.sha256("\n".join(statements).encode("utf-8")).hexdigest()
+
+def readSchemaFingerprint(connection):
+    """Vrati otisk ulozeny v DB nebo None (tabulka schema_version neexistuje nebo otisk chybi)"""
+    if not sqlalchemy.inspect(connection).has_table(schemaVersionTable.name):
+        return None
+    statement = sqlalchemy.select(schemaVersionTable.c.fingerprint).where(schemaVersionTable.c.name == SCHEMANAME)
+    return connection.execute(statement).scalar()
+
+def writeSchemaFingerprint(connection, fingerprint):
+    schemaVersionTable.create(connection, checkfirst=True)
+    connection.execute(sqlalchemy.delete(schemaVersionTable).where(schemaVersionTable.c.name == SCHEMANAME))
+    connection.execute(sqlalchemy.insert(schemaVersionTable).values(name=SCHEMANAME, fingerprint=fingerprint))
+
+# libovolna konstanta, identifikuje zamek pro DDL teto sluzby
+SCHEMALOCKKEY = 0x6576656e7473
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -149,22 +307,47 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine
 
 
-async def startEngine(connectionstring, makeDrop=False, makeUp=True):
-    """Provede nezbytne ukony a vrati asynchronni SessionMaker"""
+async def startEngine(connectionstring, makeDrop=False, makeUp=True, makePartitions=False):
+    """Provede nezbytne ukony a vrati asynchronni SessionMaker
+    makePartitions vytvori tabulku events jako partitioned (podle startdate), uplatni se jen v PostgreSQL
+    DDL (create_all) je provedeno jen tehdy, kdyz otisk schematu v DB neodpovida modelum (nebo je pozadovano makeDrop)
+    """
     asyncEngine = create_async_engine(connectionstring)
-
-    async with asyncEngine.begin() as conn:
-        if makeDrop:
-            await conn.run_sync(BaseModel.metadata.drop_all)
-            print("BaseModel.metadata.drop_all finished")
-        if makeUp:
-            try:
-                await conn.run_sync(BaseModel.metadata.create_all)
-                print("BaseModel.metadata.create_all finished")
-            except sqlalchemy.exc.NoReferencedTableError as e:
-                print(e)
-                print("Unable automaticaly create tables")
-                return None
+    partitioning["events"] = makePartitions and (asyncEngine.dialect.name == "postgresql")
+    if makePartitions and not partitioning["events"]:
+        print(f"partitioning is not supported by {asyncEngine.dialect.name}, ignored")
+
+    fingerprint = schemaFingerprint(asyncEngine.dialect)
+    if makeUp and not makeDrop:
+        async with asyncEngine.connect() as conn:
+            makeUp = fingerprint != await conn.run_sync(readSchemaFingerprint)
+        if not makeUp:
+            print("schema fingerprint matches, create_all skipped")
+
+    if makeDrop or makeUp:
+        async with asyncEngine.begin() as conn:
+            if asyncEngine.dialect.name == "postgresql":
+                # zamek je uvolnen koncem transakce, ostatni procesy zde cekaji
+                await conn.execute(sqlalchemy.text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMALOCKKEY})
+                if not makeDrop and fingerprint == await conn.run_sync(readSchemaFingerprint):
+                    # DDL mezitim provedl jiny proces
+                    makeUp = False
+            if makeDrop:
+                await conn.run_sync(BaseModel.metadata.drop_all)
+                print("BaseModel.metadata.drop_all finished")
+            if makeUp:
+                if partitioning["events"]:
+                    await conn.run_sync(createPartitionedEventsTable)
+                    await conn.run_sync(createEventPartitions)
+                    print("partitioned table events is ready")
+                try:
+                    await conn.run_sync(BaseModel.metadata.create_all)
+                    print("BaseModel.metadata.create_all finished")
+                except sqlalchemy.exc.NoReferencedTableError as e:
+                    print(e)
+                    print("Unable automaticaly create tables")
+                    return None
+                await conn.run_sync(writeSchemaFingerprint, fingerprint)
 
     async_sessionMaker = sessionmaker(
         asyncEngine, expire_on_commit=False, class_=AsyncSession
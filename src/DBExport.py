@@ -0,0 +1,104 @@
+import io
+import csv
+import json
+import uuid
+import datetime
+
+import sqlalchemy
+from sqlalchemy.future import select
+from uoishelpers.dataloaders import prepareSelect
+
+from src.DBDefinitions import EventModel, PresenceModel
+
+###########################################################################################################################
+#
+# export velkych mnozin radku (events, events_users) po castech
+# radky jsou z DB cteny proudove (stream_scalars + yield_per) a serializovany po blocich,
+# pamet tedy nezavisi na velikosti vysledku
+#
+###########################################################################################################################
+
+formats = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+def convertWhere(DBModel, where: dict, allowedNames=None):
+    """Prevede where (strukturou shodny s GQL filtrem, napr. EventInputFilter) z JSON hodnot na hodnoty dle typu sloupcu.
+    Pokud je allowedNames uvedeno, jine atributy nez v nem vyjmenovane nejsou povoleny.
+    """
+    def convertValue(column, value):
+        if isinstance(value, list):
+            return [convertValue(column, item) for item in value]
+        if value is None:
+            return None
+        if isinstance(column.type, sqlalchemy.DateTime):
+            return datetime.datetime.fromisoformat(value).replace(tzinfo=None)
+        if isinstance(column.type, sqlalchemy.Uuid):
+            return uuid.UUID(f"{value}")
+        return value
+
+    def convert(where):
+        result = {}
+        for key, value in where.items():
+            if key in ["_and", "_or"]:
+                result[key] = [convert(item) for item in value]
+                continue
+            assert (allowedNames is None) or (key in allowedNames), f"filter on `{key}` is not allowed"
+            column = DBModel.__table__.columns.get(key, None)
+            assert column is not None, f"cannot map `{key}` to model {DBModel.__tablename__}"
+            result[key] = {op: convertValue(column, opValue) for op, opValue in value.items()}
+        return result
+
+    return convert(where)
+
+def create_statement_for_events_export(where: dict = None):
+    if where is None:
+        statement = select(EventModel)
+    else:
+        statement = prepareSelect(EventModel, where)
+    return statement.order_by(EventModel.startdate, EventModel.id)
+
+def create_statement_for_presences_export(where: dict = None):
+    """presences of events selected by where (EventInputFilter)"""
+    statement = select(PresenceModel)
+    if where is not None:
+        eventIds = prepareSelect(EventModel, where).with_only_columns(EventModel.id)
+        statement = statement.filter(PresenceModel.event_id.in_(eventIds))
+    return statement.order_by(PresenceModel.event_id, PresenceModel.id)
+
+def toJsonValue(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return f"{value}"
+    return value
+
+def serializeChunk(rows, columnNames, format):
+    if format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if value is None else toJsonValue(value) for value in (getattr(row, name) for name in columnNames)])
+        return buffer.getvalue()
+
+    lines = (
+        json.dumps({name: toJsonValue(getattr(row, name)) for name in columnNames}, ensure_ascii=False)
+        for row in rows
+    )
+    return "".join(f"{line}\n" for line in lines)
+
+async def streamRows(asyncSessionMaker, DBModel, statement, format="ndjson", chunkSize=1000):
+    """Asynchronni generator textovych bloku (NDJSON nebo CSV s hlavickou), kazdy blok obsahuje nejvyse chunkSize radku."""
+    assert format in formats, f"unknown format `{format}`, use one of {list(formats.keys())}"
+    columnNames = [column.key for column in DBModel.__table__.columns]
+    if format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(columnNames)
+        yield buffer.getvalue()
+
+    statement = statement.execution_options(yield_per=chunkSize)
+    async with asyncSessionMaker() as session:
+        rows = await session.stream_scalars(statement)
+        async for partition in rows.partitions():
+            yield serializeChunk(partition, columnNames, format)
@@ -130,45 +130,334 @@ import datetime
 #     return result
 
 
+import re
+import time
 import asyncio
 import os
 import json
 import uuid
+import sqlalchemy
 
-from uoishelpers.feeders import ImportModels
-def get_demodata():
-    def datetime_parser(json_dict):
-        for (key, value) in json_dict.items():
-            if key in ["startdate", "enddate", "lastchange", "created"]:
-                if value is None:
-                    dateValueWOtzinfo = None
-                else:
-                    try:
-                        dateValue = datetime.datetime.fromisoformat(value)
-                        dateValueWOtzinfo = dateValue.replace(tzinfo=None)
-                    except:
-                        print("jsonconvert Error", key, value, flush=True)
-                        dateValueWOtzinfo = None
-                
-                json_dict[key] = dateValueWOtzinfo
-            
-            if (key in ["id", "changedby", "createdby", "rbacobject"]) or ("_id" in key):
-                
-                if key == "outer_id":
-                    json_dict[key] = value
-                elif value not in ["", None]:
-                    json_dict[key] = uuid.UUID(value)
-                else:
-                    print(key, value)
-
-        return json_dict
-
-
-    with open("./systemdata.json", "r", encoding="utf-8") as f:
-        jsonData = json.load(f, object_hook=datetime_parser)
+from src.DBDefinitions import BaseModel, feederStateTable, currentTimestamp
+
+###########################################################################################################################
+#
+# proudove (po castech) cteni systemdata.json
+# soubor obsahuje tabulky i jinych sluzeb, nacteny (a prevedeny) jsou jen radky tabulek, ktere odpovidaji predanym modelum,
+# ostatni tabulky jsou precteny po jednotlivych radcich a zahozeny, pamet tedy nezavisi na velikosti souboru
+#
+###########################################################################################################################
+
+whitespace = re.compile(r"[ \t\n\r]*")
+
+def iterJsonTables(f, tableNames, chunkSize=1 << 20):
+    """Generator dvojic (tableName, row) pro radky tabulek vyjmenovanych v tableNames (None znamena vsechny tabulky).
+    f je textovy soubor se strukturou {"tableName": [row, row, ...], ...}, cten je po blocich o velikosti chunkSize.
+    """
+    decoder = json.JSONDecoder()
+    state = {"buffer": "", "pos": 0, "eof": False}
+
+    def readMore():
+        chunk = f.read(chunkSize)
+        if chunk == "":
+            state["eof"] = True
+            return False
+        # zpracovana cast bufferu je zahozena
+        state["buffer"] = state["buffer"][state["pos"]:] + chunk
+        state["pos"] = 0
+        return True
+
+    def peek():
+        """preskoci mezery a vrati nasledujici znak (prazdny retezec na konci souboru)"""
+        while True:
+            state["pos"] = whitespace.match(state["buffer"], state["pos"]).end()
+            if state["pos"] < len(state["buffer"]):
+                return state["buffer"][state["pos"]]
+            if not readMore():
+                return ""
+
+    def expect(chars):
+        char = peek()
+        if char not in chars:
+            raise ValueError(f"unexpected `{char}` at {state['pos']}, expected one of `{chars}`")
+        state["pos"] = state["pos"] + 1
+        return char
+
+    def decodeValue():
+        peek()
+        while True:
+            try:
+                (value, end) = decoder.raw_decode(state["buffer"], state["pos"])
+                # hodnota na konci bufferu (napr. cislo) muze pokracovat v dalsim bloku
+                if end < len(state["buffer"]) or state["eof"]:
+                    state["pos"] = end
+                    return value
+            except json.JSONDecodeError:
+                if state["eof"]:
+                    raise
+            readMore()
+
+    expect("{")
+    if peek() == "}":
+        return
+    while True:
+        tableName = decodeValue()
+        expect(":")
+        if peek() == "[":
+            expect("[")
+            if peek() == "]":
+                expect("]")
+            else:
+                selected = (tableNames is None) or (tableName in tableNames)
+                while True:
+                    row = decodeValue()
+                    if selected:
+                        yield tableName, row
+                    if expect(",]") == "]":
+                        break
+        else:
+            decodeValue()
+        if expect(",}") == "}":
+            return
+
+def createRowConverter(DBModel):
+    """Vytvori funkci, ktera prevede hodnoty radku (dict z JSON) podle typu sloupcu modelu (Uuid, DateTime)"""
+    def toDateTime(value):
+        try:
+            return datetime.datetime.fromisoformat(value).replace(tzinfo=None)
+        except ValueError:
+            print("jsonconvert Error", DBModel.__tablename__, value, flush=True)
+            return None
+
+    def toUUID(value):
+        return None if value == "" else uuid.UUID(value)
+
+    converters = {}
+    for column in DBModel.__table__.columns:
+        if isinstance(column.type, sqlalchemy.DateTime):
+            converters[column.key] = toDateTime
+        elif isinstance(column.type, sqlalchemy.Uuid):
+            converters[column.key] = toUUID
+
+    def convert(row):
+        for key, converter in converters.items():
+            value = row.get(key, None)
+            if value is not None:
+                row[key] = converter(value)
+        return row
+    return convert
+
+def convertByKeyName(row):
+    """Prevede hodnoty radku tabulky, pro kterou neni model, podle jmen klicu (datumy a id)"""
+    for (key, value) in row.items():
+        if value in ["", None]:
+            continue
+        if key in ["startdate", "enddate", "lastchange", "created"]:
+            try:
+                row[key] = datetime.datetime.fromisoformat(value).replace(tzinfo=None)
+            except ValueError:
+                print("jsonconvert Error", key, value, flush=True)
+                row[key] = None
+        elif (key in ["id", "changedby", "createdby", "rbacobject"]) or ("_id" in key and key != "outer_id"):
+            row[key] = uuid.UUID(value)
+    return row
+
+def get_demodata(DBModels=None, filename="./systemdata.json"):
+    """Nacte z filename radky tabulek odpovidajicich DBModels.
+    Vraci dict, klicem je jmeno tabulky, hodnotou list radku (dict) s hodnotami prevedenymi podle typu sloupcu.
+    Bez DBModels jsou nacteny vsechny tabulky, tabulky bez modelu v teto sluzbe jsou prevedeny podle jmen klicu.
+    """
+    converters = {mapper.class_.__tablename__: createRowConverter(mapper.class_) for mapper in BaseModel.registry.mappers}
+    if DBModels is not None:
+        converters = {DBModel.__tablename__: createRowConverter(DBModel) for DBModel in DBModels}
+    tableNames = None if DBModels is None else set(converters.keys())
+
+    jsonData = {}
+    with open(filename, "r", encoding="utf-8") as f:
+        for tableName, row in iterJsonTables(f, tableNames):
+            convert = converters.get(tableName, convertByKeyName)
+            jsonData.setdefault(tableName, []).append(convert(row))
 
     return jsonData
 
+###########################################################################################################################
+#
+# hromadne vkladani (bulk) pro velke objemy dat
+# PostgreSQL - COPY (asyncpg copy_records_to_table), ostatni DB (SQLite) - INSERT s vice radky (VALUES (...), (...), ...)
+# radky, jejichz id jiz v tabulce je, jsou preskoceny (opakovane spusteni nic nezmeni)
+#
+###########################################################################################################################
+
+SQLITEMAXVARIABLES = 32766
+
+async def bulkInsertRows(session, table, columnNames, rows):
+    """Vlozi radky (list of dict se stejnymi klici columnNames) jednim COPY (PostgreSQL) nebo INSERT s vice radky"""
+    connection = await session.connection()
+    if connection.dialect.name == "postgresql":
+        rawConnection = await connection.get_raw_connection()
+        await rawConnection.driver_connection.copy_records_to_table(
+            table.name,
+            records=[tuple(row[name] for name in columnNames) for row in rows],
+            columns=columnNames,
+            schema_name=table.schema
+        )
+        return
+    rowsPerStatement = max(1, SQLITEMAXVARIABLES // len(columnNames))
+    for start in range(0, len(rows), rowsPerStatement):
+        await session.execute(sqlalchemy.insert(table).values(rows[start:start + rowsPerStatement]))
+
+async def BulkImportModels(asyncSessionMaker, DBModels, jsonData, chunkSize=10000):
+    """Hromadne vlozi data z jsonData do tabulek modelu DBModels v danem poradi.
+    Ulozeny jsou jen sloupce modelu, radky s existujicim id jsou preskoceny, radky s _chunk jsou ukladany v poradi _chunk.
+    Vraci dict {tableName: (pocet vlozenych radku, doba v s)}.
+    """
+    result = {}
+    for DBModel in DBModels:
+        table = DBModel.__table__
+        listData = jsonData.get(table.name, None)
+        if not listData:
+            continue
+        start = time.perf_counter()
+        listData = sorted(listData, key=lambda row: row.get("_chunk", 0))
+        columns = table.columns
+        inserted = 0
+        async with asyncSessionMaker() as session:
+            for chunkStart in range(0, len(listData), chunkSize):
+                chunk = listData[chunkStart:chunkStart + chunkSize]
+                existing = await session.execute(
+                    sqlalchemy.select(table.c.id).where(table.c.id.in_([row["id"] for row in chunk])))
+                existingIds = set(existing.scalars())
+                # radky jsou seskupeny podle vyplnenych sloupcu, chybejici sloupce dostanou hodnotu dle server_default
+                groups = {}
+                for row in chunk:
+                    if row["id"] in existingIds:
+                        continue
+                    values = {column.key: row[column.key] for column in columns if row.get(column.key, None) is not None}
+                    # skupiny jsou vytvareny v poradi _chunk, nadrizene radky jsou tak vlozeny drive
+                    groups.setdefault((row.get("_chunk", 0), tuple(values.keys())), []).append(values)
+                for (_, columnNames), rows in groups.items():
+                    await bulkInsertRows(session, table, list(columnNames), rows)
+                    inserted = inserted + len(rows)
+            await session.commit()
+        duration = time.perf_counter() - start
+        result[table.name] = (inserted, duration)
+        print(f"bulk import {table.name}: {inserted} rows in {duration:.2f} s ({inserted / max(duration, 1e-9):.0f} rows/s)", flush=True)
+
+    inserted = sum(count for count, _ in result.values())
+    duration = sum(duration for _, duration in result.values())
+    print(f"bulk import total: {inserted} rows in {duration:.2f} s ({inserted / max(duration, 1e-9):.0f} rows/s)", flush=True)
+    return result
+
+###########################################################################################################################
+#
+# synchronizace tabulek se zdrojovymi daty se zaznamem stavu (src.DBDefinitions.feederStateTable)
+# tabulka se stejnym hashem zdroje a stejnym poctem radku jako po posledni synchronizaci je preskocena,
+# jinak jsou vlozeny chybejici radky a aktualizovany radky, ktere od posledni synchronizace nikdo nezmenil (radky nejsou mazany)
+#
+###########################################################################################################################
+
+# libovolna konstanta, identifikuje zamek pro synchronizaci dat teto sluzby
+FEEDERLOCKKEY = 0x6576656e7466
+
+def sourceRows(DBModel, listData):
+    """Radky zdroje omezene na sloupce modelu (bez None hodnot) a _chunk, serazene podle (_chunk, id)"""
+    columnNames = [column.key for column in DBModel.__table__.columns] + ["_chunk"]
+    rows = [
+        {name: row[name] for name in columnNames if row.get(name, None) is not None}
+        for row in sorted(listData, key=lambda row: (row.get("_chunk", 0), f"{row['id']}"))
+    ]
+    return rows
+
+def hashRows(rows):
+    import hashlib
+    from src.DBExport import toJsonValue
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update(json.dumps({key: toJsonValue(value) for key, value in row.items()}, sort_keys=True).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+async def syncTable(session, DBModel, rows, syncedAt=None, chunkSize=10000):
+    """Vlozi chybejici a aktualizuje zmenene radky, vraci (pocet vlozenych, pocet aktualizovanych, pocet ponechanych).
+    Existujici radek je aktualizovan, jen pokud jeho lastchange neni novejsi nez syncedAt (cas predchozi synchronizace),
+    radky zmenene v DB po synchronizaci jsou ponechany. Bez syncedAt (tabulka jeste nebyla synchronizovana)
+    nejsou existujici radky meneny vubec, stejne jako pri ImportModels.
+    """
+    table = DBModel.__table__
+    hasLastchange = "lastchange" in table.c
+    inserted = 0
+    updated = 0
+    kept = 0
+    for chunkStart in range(0, len(rows), chunkSize):
+        chunk = rows[chunkStart:chunkStart + chunkSize]
+        existing = await session.execute(sqlalchemy.select(table).where(table.c.id.in_([row["id"] for row in chunk])))
+        existing = {row.id: row._mapping for row in existing}
+        toInsert = {}
+        toUpdate = {}
+        for row in chunk:
+            values = {key: value for key, value in row.items() if key != "_chunk"}
+            current = existing.get(row["id"], None)
+            if current is None:
+                toInsert.setdefault((row.get("_chunk", 0), tuple(values.keys())), []).append(values)
+                continue
+            changes = {key: value for key, value in values.items() if key != "id" and current[key] != value}
+            if len(changes) == 0:
+                continue
+            changedInDB = (syncedAt is None) or (hasLastchange and (current["lastchange"] is not None) and (current["lastchange"] > syncedAt))
+            if changedInDB:
+                kept = kept + 1
+                continue
+            toUpdate.setdefault(tuple(changes.keys()), []).append({"_id": row["id"], **changes})
+        for (_, columnNames), groupRows in toInsert.items():
+            await bulkInsertRows(session, table, list(columnNames), groupRows)
+            inserted = inserted + len(groupRows)
+        for columnNames, groupRows in toUpdate.items():
+            # SET je odvozen z klicu parametru (columnNames)
+            statement = sqlalchemy.update(table).where(table.c.id == sqlalchemy.bindparam("_id"))
+            await session.execute(statement, groupRows)
+            updated = updated + len(groupRows)
+    return inserted, updated, kept
+
+async def SyncModels(asyncSessionMaker, DBModels, jsonData):
+    """Synchronizuje tabulky modelu DBModels (v danem poradi) s jsonData, tabulky s nezmenenym zdrojem preskoci.
+    Vraci dict {tableName: "skipped" | (vlozeno, aktualizovano, ponechano)}.
+    """
+    result = {}
+    async with asyncSessionMaker() as session:
+        connection = await session.connection()
+        if connection.dialect.name == "postgresql":
+            # ostatni procesy pockaji a pote tabulky jen preskoci
+            await session.execute(sqlalchemy.text("SELECT pg_advisory_xact_lock(:key)"), {"key": FEEDERLOCKKEY})
+        states = await session.execute(sqlalchemy.select(feederStateTable))
+        states = {row.tablename: row for row in states}
+
+        for DBModel in DBModels:
+            table = DBModel.__table__
+            rows = sourceRows(DBModel, jsonData.get(table.name, []))
+            sourceHash = hashRows(rows)
+            state = states.get(table.name, None)
+            countStatement = sqlalchemy.select(sqlalchemy.func.count()).select_from(table)
+            if state is not None and state.hash == sourceHash:
+                # jiny pocet radku znamena, ze tabulka byla mezitim (napr. po smazani dat) zmenena
+                rowcount = (await session.execute(countStatement)).scalar()
+                if rowcount == state.rowcount:
+                    result[table.name] = "skipped"
+                    continue
+
+            result[table.name] = await syncTable(session, DBModel, rows, syncedAt=None if state is None else state.lastchange)
+            rowcount = (await session.execute(countStatement)).scalar()
+            await session.execute(sqlalchemy.delete(feederStateTable).where(feederStateTable.c.tablename == table.name))
+            await session.execute(sqlalchemy.insert(feederStateTable).values(
+                tablename=table.name, hash=sourceHash, rowcount=rowcount, lastchange=currentTimestamp(connection.dialect.name)))
+        await session.commit()
+
+    for tableName, tableResult in result.items():
+        if tableResult == "skipped":
+            print(f"sync {tableName}: unchanged, skipped", flush=True)
+        else:
+            print(f"sync {tableName}: {tableResult[0]} inserted, {tableResult[1]} updated, {tableResult[2]} changed in DB, kept", flush=True)
+    return result
+
 async def initDB(asyncSessionMaker):
 
     isDemo = os.environ.get("DEMODATA", None)
@@ -191,6 +480,10 @@ async def initDB(asyncSessionMaker):
             InvitationTypeModel        
         ]
 
-    jsonData = get_demodata()
-    await ImportModels(asyncSessionMaker, dbModels, jsonData)
+    # DEMODATAFILE umoznuje nacist napr. data z generatoru (src.DBGenerator)
+    jsonData = get_demodata(dbModels, filename=os.environ.get("DEMODATAFILE", "./systemdata.json"))
+    if os.environ.get("BULKIMPORT", None) == "True":
+        await BulkImportModels(asyncSessionMaker, dbModels, jsonData)
+    else:
+        await SyncModels(asyncSessionMaker, dbModels, jsonData)
     pass
@@ -0,0 +1,247 @@
+import json
+import uuid
+import random
+import asyncio
+import logging
+import datetime
+
+from src.DBDefinitions import (
+    EventModel,
+    EventTypeModel,
+    EventGroupModel,
+    PresenceModel,
+    PresenceTypeModel,
+    InvitationTypeModel
+    )
+
+###########################################################################################################################
+#
+# generator syntetickych dat (deterministicky, rizeny seed)
+#
+# skolni roky -> semestry -> vyuka (prednasky, cviceni, laboratore, seminare) a zkousky
+# kazda vyukova udalost je spojena se studijnimi skupinami, prezence jsou tvoreny cleny techto skupin a vyucujicim
+#
+# vystup je dict tabulek ve strukture systemdata.json, lze jej ulozit do souboru (initDB, promenna DEMODATAFILE)
+# nebo primo do DB (BulkImportModels)
+# spusteni: python -m src.DBGenerator --events 100000 --users 5000 --output data.json
+#
+###########################################################################################################################
+
+# id odpovidaji ciselnikum v systemdata.json
+eventTypeIds = {
+    "schoolyear": "a517c2fd-8dc7-4a2e-a107-cbdb88ba2aa5",
+    "semester": "69ec2b0b-a39d-40df-9cea-e295b36749c9",
+    "P": "c0a12392-ae0e-11ed-9bd8-0242ac110002",
+    "CV": "b87d7c2c-8fd4-11ed-a6d4-0242ac110002",
+    "LAB": "b87d7b28-8fd4-11ed-a6d4-0242ac110002",
+    "SEM": "b87d7ce0-8fd4-11ed-a6d4-0242ac110002",
+    "ZK": "b87d82e4-8fd4-11ed-a6d4-0242ac110002",
+}
+presenceTypeIds = {
+    "present": "466398c6-a79c-11ed-b76e-0242ac110002",
+    "absent": "4663988a-a79c-11ed-b76e-0242ac110002",
+    "vacation": "4663984e-a79c-11ed-b76e-0242ac110002",
+}
+invitationTypeIds = {
+    "organizer": "e8713b6e-a79c-11ed-b76e-0242ac110002",
+    "invited": "e8713f06-a79c-11ed-b76e-0242ac110002",
+    "accepted": "e871403c-a79c-11ed-b76e-0242ac110002",
+}
+
+# podil typu vyuky a pocet skupin na jednu udalost
+lessonTypes = {
+    "P": {"weight": 0.30, "groups": (2, 6)},
+    "CV": {"weight": 0.45, "groups": (1, 1)},
+    "LAB": {"weight": 0.15, "groups": (1, 1)},
+    "SEM": {"weight": 0.10, "groups": (1, 2)},
+}
+# zacatky vyukovych bloku (90 minut)
+lessonSlots = [(7, 30), (9, 20), (11, 10), (13, 0), (14, 50), (16, 40)]
+TEACHINGWEEKS = 13
+EXAMWEEKS = 5
+
+class Generator:
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+
+    def uuid(self):
+        return uuid.UUID(int=self.random.getrandbits(128), version=4)
+
+    def groupSize(self):
+        """velikost studijni skupiny, lognormalni rozdeleni kolem 20 studentu"""
+        return min(40, max(5, round(self.random.lognormvariate(3.0, 0.3))))
+
+def semesterStarts(firstYear):
+    """Nekonecna posloupnost (skolni rok, zacatek zimniho / letniho semestru)"""
+    year = firstYear
+    while True:
+        # zimni semestr zacina posledni pondeli v zari, letni druhe pondeli v unoru
+        winter = datetime.datetime(year, 9, 30)
+        winter = winter - datetime.timedelta(days=winter.weekday())
+        summer = datetime.datetime(year + 1, 2, 8)
+        summer = summer + datetime.timedelta(days=(7 - summer.weekday()) % 7)
+        yield year, winter
+        yield year, summer
+        year = year + 1
+
+def generateData(events=10000, users=1000, groups=None, seed=0, firstYear=2020, subjectsPerSemester=None):
+    """Vygeneruje nejvyse events udalosti (vcetne skolnich roku a semestru), prezence cerpa z users uzivatelu.
+    Vraci dict tabulek (events, events_groups, events_users) s hodnotami typu uuid.UUID a datetime.
+    """
+    generator = Generator(seed)
+    userIds = [generator.uuid() for _ in range(users)]
+    # 5 % uzivatelu jsou vyucujici, ostatni jsou rozdeleni do studijnich skupin
+    teacherCount = max(1, users // 20)
+    teacherIds = userIds[:teacherCount]
+    studentIds = userIds[teacherCount:]
+    members = {}
+    position = 0
+    while position < len(studentIds) and (groups is None or len(members) < groups):
+        size = generator.groupSize()
+        members[generator.uuid()] = studentIds[position:position + size]
+        position = position + size
+    if len(members) == 0:
+        members[generator.uuid()] = studentIds
+    groupIds = list(members.keys())
+
+    result = {"events": [], "events_groups": [], "events_users": []}
+    eventRows = result["events"]
+    # predmet = serie udalosti v jednom semestru se stejnymi skupinami a vyucujicim
+    if subjectsPerSemester is None:
+        subjectsPerSemester = max(1, len(groupIds) * 2)
+
+    def addEvent(name, typeName, startdate, enddate, master=None, chunk=0):
+        row = {
+            "id": generator.uuid(), "name": name, "name_en": name,
+            "type_id": uuid.UUID(eventTypeIds[typeName]),
+            "startdate": startdate, "enddate": enddate,
+            "masterevent_id": None if master is None else master["id"],
+            "_chunk": chunk
+        }
+        eventRows.append(row)
+        return row
+
+    def addPresences(event, teacherId, groupIds, attendance):
+        result["events_users"].append({
+            "id": generator.uuid(), "event_id": event["id"], "user_id": teacherId,
+            "invitationtype_id": uuid.UUID(invitationTypeIds["organizer"]),
+            "presencetype_id": uuid.UUID(presenceTypeIds["present"])
+        })
+        for groupId in groupIds:
+            result["events_groups"].append({"id": generator.uuid(), "event_id": event["id"], "group_id": groupId})
+            for userId in members[groupId]:
+                draw = generator.random.random()
+                presenceType = "present" if draw < attendance else ("absent" if draw < 0.97 else "vacation")
+                result["events_users"].append({
+                    "id": generator.uuid(), "event_id": event["id"], "user_id": userId,
+                    "invitationtype_id": uuid.UUID(invitationTypeIds["invited"]),
+                    "presencetype_id": uuid.UUID(presenceTypeIds[presenceType])
+                })
+
+    schoolYears = {}
+    typeNames = list(lessonTypes.keys())
+    typeWeights = [lessonTypes[name]["weight"] for name in typeNames]
+    for year, semesterStart in semesterStarts(firstYear):
+        # skolni rok (pokud jeste neni) a semestr musi byt v limitu events
+        if len(eventRows) + (1 if year in schoolYears else 2) > events:
+            break
+        schoolYear = schoolYears.get(year, None)
+        if schoolYear is None:
+            schoolYear = addEvent(
+                f"{year}/{(year + 1) % 100:02}", "schoolyear",
+                datetime.datetime(year, 9, 1), datetime.datetime(year + 1, 9, 1), chunk=0)
+            schoolYears[year] = schoolYear
+        semesterEnd = semesterStart + datetime.timedelta(weeks=TEACHINGWEEKS + EXAMWEEKS)
+        semester = addEvent(
+            f"semestr {semesterStart:%Y-%m}", "semester", semesterStart, semesterEnd, master=schoolYear, chunk=1)
+
+        for subjectIndex in range(subjectsPerSemester):
+            if len(eventRows) >= events:
+                break
+            typeName = generator.random.choices(typeNames, weights=typeWeights)[0]
+            (minGroups, maxGroups) = lessonTypes[typeName]["groups"]
+            subjectGroups = generator.random.sample(groupIds, min(len(groupIds), generator.random.randint(minGroups, maxGroups)))
+            teacherId = generator.random.choice(teacherIds)
+            day = generator.random.randrange(5)
+            (hour, minute) = generator.random.choice(lessonSlots)
+            # navstevnost klesa v prubehu semestru
+            baseAttendance = generator.random.uniform(0.8, 0.95)
+            # nektere predmety maji vyuku jen kazdy druhy tyden
+            weekStep = 1 if generator.random.random() < 0.8 else 2
+            for week in range(0, TEACHINGWEEKS, weekStep):
+                if len(eventRows) >= events:
+                    break
+                startdate = semesterStart + datetime.timedelta(weeks=week, days=day, hours=hour, minutes=minute)
+                lesson = addEvent(
+                    f"{typeName} {subjectIndex} / {week + 1}", typeName,
+                    startdate, startdate + datetime.timedelta(minutes=90), master=semester, chunk=2)
+                addPresences(lesson, teacherId, subjectGroups, baseAttendance - 0.01 * week)
+            if typeName == "P" and len(eventRows) < events:
+                # zkouska ve zkouskovem obdobi
+                startdate = semesterStart + datetime.timedelta(
+                    weeks=TEACHINGWEEKS + generator.random.randrange(EXAMWEEKS), days=generator.random.randrange(5), hours=8)
+                exam = addEvent(
+                    f"ZK {subjectIndex}", "ZK",
+                    startdate, startdate + datetime.timedelta(hours=3), master=semester, chunk=2)
+                addPresences(exam, teacherId, subjectGroups, 0.95)
+
+    return result
+
+def withCatalogues(data, filename="./systemdata.json"):
+    """Doplni ciselniky (eventtypes, eventpresencetypes, eventinvitationtypes) ze systemdata.json"""
+    from src.DBFeeder import get_demodata
+    catalogues = get_demodata([EventTypeModel, PresenceTypeModel, InvitationTypeModel], filename=filename)
+    return {**catalogues, **data}
+
+def writeData(data, filename):
+    """Zapise data ve strukture systemdata.json (radek tabulky na radek souboru)"""
+    from src.DBExport import toJsonValue
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write("{")
+        for tableIndex, (tableName, rows) in enumerate(data.items()):
+            f.write(",\n" if tableIndex > 0 else "\n")
+            f.write(f'"{tableName}": [\n')
+            f.write(",\n".join(
+                json.dumps({key: toJsonValue(value) for key, value in row.items()}, ensure_ascii=False)
+                for row in rows))
+            f.write("\n]")
+        f.write("\n}\n")
+
+dbModels = [EventTypeModel, PresenceTypeModel, InvitationTypeModel, EventModel, EventGroupModel, PresenceModel]
+
+async def storeData(asyncSessionMaker, data):
+    """Ulozi data primo do DB (hromadne, existujici id jsou preskocena)"""
+    from src.DBFeeder import BulkImportModels
+    return await BulkImportModels(asyncSessionMaker, dbModels, data)
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="generates synthetic events, presences and group links")
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--groups", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="json file for initDB (DEMODATAFILE)")
+    parser.add_argument("--db", default=None, help="connection string, e.g. postgresql+asyncpg://...")
+    args = parser.parse_args()
+    assert (args.output is None) != (args.db is None), "use exactly one of --output, --db"
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s.%(msecs)03d\t%(levelname)s:\t%(message)s',
+        datefmt='%Y-%m-%dT%I:%M:%S')
+
+    data = withCatalogues(generateData(events=args.events, users=args.users, groups=args.groups, seed=args.seed))
+    for tableName, rows in data.items():
+        logging.info(f"generated {tableName}: {len(rows)} rows")
+    if args.output is not None:
+        writeData(data, args.output)
+        logging.info(f"data written to {args.output}")
+    else:
+        from src.DBDefinitions import startEngine
+        async def store():
+            asyncSessionMaker = await startEngine(args.db, makeDrop=False, makeUp=True)
+            await storeData(asyncSessionMaker, data)
+        asyncio.run(store())
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
-from uoishelpers.dataloaders import createIdLoader, createFkeyLoader
+import json
+import uuid
+import sqlalchemy
+
+from sqlalchemy.future import select
+from uoishelpers.dataloaders import createIdLoader, createFkeyLoader, prepareSelect
 from functools import cache
 
-from src.DBDefinitions import BaseModel
+from src.DBDefinitions import BaseModel, currentTimestamp
 # from src.DBDefinitions import (
 #     BaseModel,
 #     EventModel, 
@@ -96,10 +101,273 @@ def createLoadersAuto(asyncSessionMaker, BaseModel, extra={}):
     Loaders = type('Loaders', (), attrs)   
     return Loaders()
 
+def toUUIDs(ids):
+    return [id if isinstance(id, uuid.UUID) else uuid.UUID(id) for id in ids]
+
+def createIdLoaderExt(asyncSessionMaker, DBModel):
+    """Vytvori IdLoader z uoishelpers a rozsiri jej o operace, ktere maji byt provedeny jednim dotazem do DB.
+    Zakladni trida je odvozena od loaderu z createIdLoader, takze vsechny jeji metody (load, filter_by, page, ...) zustavaji beze zmeny.
+    """
+    BaseLoader = type(createIdLoader(asyncSessionMaker, DBModel))
+    columnNames = [column.key for column in DBModel.__table__.columns]
+    hasLastchange = "lastchange" in columnNames
+
+    # SQLite uklada DateTime jako text a server_default (CURRENT_TIMESTAMP) ma jiny format nez hodnoty zapsane z Pythonu,
+    # proto se v SQLite datumy porovnavaji (a radi) az podle hodnoty julianday
+    asyncEngine = getattr(asyncSessionMaker, "kw", {}).get("bind", None)
+    dialectName = None if asyncEngine is None else asyncEngine.dialect.name
+    isSQLite = dialectName == "sqlite"
+    def comparable(column, value=None):
+        """vraci dvojici (sloupec, hodnota) ve tvaru, ve kterem je lze v DB porovnavat a radit"""
+        if isSQLite and isinstance(column.type, sqlalchemy.DateTime):
+            return sqlalchemy.func.julianday(column), sqlalchemy.func.julianday(value)
+        return column, value
+
+    class Loader(BaseLoader):
+        async def execute_select(self, statement):
+            """Provede select, vsechny nactene radky vlozi do cache loaderu (dalsi load(id) je jiz nenacita z DB)"""
+            async with asyncSessionMaker() as session:
+                rows = await session.execute(statement)
+                rows = list(rows.scalars())
+            for row in rows:
+                self.clear(row.id)
+                self.prime(row.id, row)
+            return iter(rows)
+
+        async def update(self, entity, extraValues={}):
+            """UPDATE ... WHERE id = :id AND lastchange = :lastchange RETURNING *
+            Kontrola lastchange (optimistic concurrency) je soucasti dotazu, neni tedy nutne radek predem cist.
+            Vraci aktualizovany radek (ktery je zaroven vlozen do cache loaderu) nebo None, pokud radek neexistuje ci lastchange nesouhlasi.
+            """
+            values = {}
+            for name in columnNames:
+                if name in ["id", "lastchange"]:
+                    continue
+                value = getattr(entity, name, None)
+                if value is not None:
+                    values[name] = value
+            values.update(extraValues)
+
+            statement = sqlalchemy.update(DBModel).where(DBModel.id == entity.id)
+            if hasLastchange:
+                lastchange = getattr(entity, "lastchange", None)
+                if lastchange is None:
+                    return None
+                (column, value) = comparable(DBModel.lastchange, lastchange)
+                statement = statement.where(column == value)
+                # cas zmeny urcuje DB, je tak porovnatelny s casem synchronizace seed dat (feeder_state)
+                values["lastchange"] = currentTimestamp(dialectName)
+            statement = statement.values(**values).returning(DBModel)
+
+            async with asyncSessionMaker() as session:
+                rows = await session.execute(statement)
+                row = rows.scalars().first()
+                await session.commit()
+
+            if row is not None:
+                self.clear(row.id)
+                self.prime(row.id, row)
+            return row
+
+        async def page(self, skip=0, limit=10, where=None, orderby=None, desc=None, extendedfilter=None, rbacobjects=None, options=None):
+            """Jako page z uoishelpers, rbacobjects (je-li uvedeno) omezuje radky na rbacobject IN (...) jeste pred OFFSET / LIMIT,
+            options jsou volby dotazu (selectinload, joinedload, ...) pro eager loading vazeb nactenych radku
+            """
+            if (rbacobjects is None) and (options is None):
+                return await super().page(skip=skip, limit=limit, where=where, orderby=orderby, desc=desc, extendedfilter=extendedfilter)
+            if where is not None:
+                statement = prepareSelect(DBModel, where, extendedfilter)
+            elif extendedfilter is not None:
+                statement = select(DBModel).filter_by(**extendedfilter)
+            else:
+                statement = select(DBModel)
+            if rbacobjects is not None:
+                statement = statement.where(DBModel.rbacobject.in_(toUUIDs(rbacobjects)))
+            if orderby is not None:
+                column = getattr(DBModel, orderby, None)
+                if column is not None:
+                    statement = statement.order_by(column.desc() if desc else column.asc())
+            statement = statement.offset(skip).limit(limit)
+            if options is not None:
+                statement = statement.options(*options)
+            return await self.execute_select(statement)
+
+        async def rbacobjects(self):
+            """Vraci list ruznych hodnot rbacobject v tabulce (bez None), kandidaty pro omezeni page na povolene rbacobject"""
+            statement = select(DBModel.rbacobject).where(DBModel.rbacobject.is_not(None)).distinct()
+            async with asyncSessionMaker() as session:
+                rows = await session.execute(statement)
+                return [f"{rbacobject}" for rbacobject in rows.scalars()]
+
+        def prime_filter_by(self, foreignKeyName, value, rows):
+            """Vlozi vysledek filter_by(foreignKeyName=value) do cache (napr. radky nactene eager loadingem), radky vlozi i do cache podle id"""
+            rows = list(rows)
+            for row in rows:
+                self.clear(row.id)
+                self.prime(row.id, row)
+            self.__dict__.setdefault("primedFilters", {})[(foreignKeyName, value)] = rows
+
+        async def filter_by(self, **filters):
+            """Jako filter_by z uoishelpers, vysledky vlozene pres prime_filter_by jsou vraceny bez dotazu do DB"""
+            primedFilters = self.__dict__.get("primedFilters", None)
+            if (primedFilters is not None) and (len(filters) == 1):
+                [item] = filters.items()
+                rows = primedFilters.get(item, None)
+                if rows is not None:
+                    return iter(rows)
+            return await super().filter_by(**filters)
+
+        async def prime_levels(self, foreignKeyName, values, depth=1):
+            """Nacte radky s foreignKeyName IN values a vlozi je do cache filter_by (prime_filter_by), jeden dotaz.
+            Pro rekurzivni vazbu (cizi klic na id teze tabulky, napr. masterevent_id) nacte po urovnich (breadth-first)
+            i dalsich depth - 1 urovni, rodice cele urovne jednim dotazem. Vraci dict hodnota -> radky prvni urovne.
+            """
+            column = getattr(DBModel, foreignKeyName)
+            frontier = list(values)
+            result = None
+            for level in range(depth):
+                rows = list(await self.execute_select(select(DBModel).where(column.in_(frontier))))
+                grouped = {value: [] for value in frontier}
+                for row in rows:
+                    grouped[getattr(row, foreignKeyName)].append(row)
+                for value, children in grouped.items():
+                    self.prime_filter_by(foreignKeyName, value, children)
+                if result is None:
+                    result = grouped
+                frontier = [row.id for row in rows]
+                if len(frontier) == 0:
+                    break
+            return result
+
+        async def filter_by_levels(self, depth, **filters):
+            """filter_by pro rekurzivni vazbu, ktera je v dotazu vnorena depth urovni (subEvents { subEvents { ... } }).
+            Hodnoty z jedne davky (rodice na jedne urovni) jsou nacteny po urovnich, jednim dotazem na uroven (prime_levels),
+            vnorene urovne jsou pak odpovezeny z cache filter_by. Pocet dotazu roste s hloubkou, nikoliv s poctem uzlu.
+            """
+            [(foreignKeyName, value)] = filters.items()
+            primedFilters = self.__dict__.get("primedFilters", None)
+            if (primedFilters is not None) and ((foreignKeyName, value) in primedFilters):
+                return iter(primedFilters[(foreignKeyName, value)])
+            if depth <= 1:
+                return await self.filter_by(**filters)
+            levelsLoaders = self.__dict__.setdefault("levelsLoaders", {})
+            levelsLoader = levelsLoaders.get((foreignKeyName, depth), None)
+            if levelsLoader is None:
+                levelsLoader = createLevelsLoader(self, foreignKeyName, depth)
+                levelsLoaders[(foreignKeyName, depth)] = levelsLoader
+            return iter(await levelsLoader.load(value))
+
+        async def keyset_page(self, first=10, after=None, orderby="startdate", where=None, extendedfilter=None, rbacobjects=None):
+            """Strankovani podle klice (keyset), radky jsou razeny podle (orderby, id).
+            after je dvojice (hodnota orderby, id) posledniho radku predchozi stranky, None znamena prvni stranku.
+            Misto OFFSET je pouzit predikat (orderby, id) > (:value, :id), ktery lze vyhodnotit indexem nad (orderby, id).
+            Radky s hodnotou NULL ve sloupci orderby nasleduji az za ostatnimi (razeny podle id).
+            rbacobjects omezuje radky stejne jako u page.
+            """
+            orderColumn = getattr(DBModel, orderby)
+            if where is not None:
+                statement = prepareSelect(DBModel, where, extendedfilter)
+            elif extendedfilter is not None:
+                statement = select(DBModel).filter_by(**extendedfilter)
+            else:
+                statement = select(DBModel)
+            if rbacobjects is not None:
+                statement = statement.where(DBModel.rbacobject.in_(toUUIDs(rbacobjects)))
+
+            (afterValue, afterId) = (None, None) if after is None else after
+            result = []
+            if (after is None) or (afterValue is not None):
+                (column, value) = comparable(orderColumn, afterValue)
+                seekStatement = statement.where(orderColumn.is_not(None))
+                if after is not None:
+                    seekStatement = seekStatement.where(
+                        sqlalchemy.tuple_(column, DBModel.id) > sqlalchemy.tuple_(value, afterId))
+                seekStatement = seekStatement.order_by(column, DBModel.id).limit(first)
+                result.extend(await self.execute_select(seekStatement))
+
+            if len(result) < first:
+                # radky bez hodnoty orderby, druhy dotaz je potreba jen na konci serazenych radku
+                nullStatement = statement.where(orderColumn.is_(None))
+                if afterId is not None and afterValue is None:
+                    nullStatement = nullStatement.where(DBModel.id > afterId)
+                nullStatement = nullStatement.order_by(DBModel.id).limit(first - len(result))
+                result.extend(await self.execute_select(nullStatement))
+            return result
+
+    return Loader(cache=True)
+
+def createLevelsLoader(loader, foreignKeyName, depth):
+    """Loader hodnota ciziho klice -> radky (jako filter_by), davku nacte po urovnich do hloubky depth, viz filter_by_levels"""
+    from aiodataloader import DataLoader
+
+    class LevelsLoader(DataLoader):
+        async def batch_load_fn(self, keys):
+            grouped = await loader.prime_levels(foreignKeyName, keys, depth)
+            return [grouped[key] for key in keys]
+
+    return LevelsLoader(cache=True)
+
+def createAuthorizationLoader():
+    """Loader rbacobject -> AuthorizedRoles, jeden request = jedna instance.
+    Pozadavky na role jsou deduplikovany (cache loaderu) a davkovany, chybejici rbacobject jsou nacteny
+    jednim dotazem do GQLUG_ENDPOINT_URL, nactene role jsou drzeny v procesni cache authorizationCache (TTL).
+    """
+    from aiodataloader import DataLoader
+    from src._GraphPermissions import authorizationCache, tokenFromInfo
+
+    class AuthorizationLoader(DataLoader):
+        token = None
+
+        def setTokenByInfo(self, info):
+            self.token = tokenFromInfo(info)
+
+        async def batch_load_fn(self, keys):
+            return await authorizationCache.load_many(keys, token=self.token)
+
+    return AuthorizationLoader(cache=True)
+
+def createEventsOfOwnersLoader(asyncSessionMaker, eventsLoader, linkModel, ownerColumnName, where=None, skip=0, limit=10, orderby=None, desc=None, rbacobjects=None):
+    """Loader id vlastnika (uzivatel, skupina, typ udalosti) -> list udalosti, vsechny vlastniky z davky nacte jednim dotazem
+    (create_statement_for_events_of_owners), nactene udalosti vlozi do cache eventsLoader.
+    """
+    from aiodataloader import DataLoader
+    from src.GraphResolvers import create_statement_for_events_of_owners
+
+    class EventsOfOwnersLoader(DataLoader):
+        async def batch_load_fn(self, keys):
+            statement = create_statement_for_events_of_owners(
+                linkModel, ownerColumnName, list(keys), where=where, skip=skip, limit=limit, orderby=orderby, desc=desc, rbacobjects=rbacobjects)
+            async with asyncSessionMaker() as session:
+                rows = await session.execute(statement)
+                rows = list(rows)
+            result = {key: [] for key in keys}
+            for event, ownerId in rows:
+                eventsLoader.clear(event.id)
+                eventsLoader.prime(event.id, event)
+                result[ownerId].append(event)
+            return [result[key] for key in keys]
+
+    return EventsOfOwnersLoader(cache=True)
+
+def createEventCountsOfOwnersLoader(asyncSessionMaker, linkModel, ownerColumnName, where=None, rbacobjects=None):
+    """Loader id vlastnika -> pocet udalosti, vsechny vlastniky z davky spocita jednim dotazem (create_statement_for_event_counts_of_owners)"""
+    from aiodataloader import DataLoader
+    from src.GraphResolvers import create_statement_for_event_counts_of_owners
+
+    class EventCountsOfOwnersLoader(DataLoader):
+        async def batch_load_fn(self, keys):
+            statement = create_statement_for_event_counts_of_owners(linkModel, ownerColumnName, list(keys), where=where, rbacobjects=rbacobjects)
+            async with asyncSessionMaker() as session:
+                rows = await session.execute(statement)
+                counts = dict(rows.all())
+            return [counts.get(key, 0) for key in keys]
+
+    return EventCountsOfOwnersLoader(cache=True)
+
 def createLoaders(asyncSessionMaker):
 
     def createLambda(loaderName, DBModel):
-        return lambda self: createIdLoader(asyncSessionMaker, DBModel)
+        return lambda self: createIdLoaderExt(asyncSessionMaker, DBModel)
 
     attrs = {}
 
@@ -107,7 +375,42 @@ def createLoaders(asyncSessionMaker):
         cls = DBModel.class_
         attrs[cls.__tablename__] = property(cache(createLambda(asyncSessionMaker, cls)))
     
-    # attrs["authorizations"] = property(cache(lambda self: AuthorizationLoader()))
+    attrs["authorizations"] = property(cache(lambda self: createAuthorizationLoader()))
+
+    def ownerOf(owner):
+        from src.DBDefinitions import PresenceModel, EventGroupModel
+        return {"users": (PresenceModel, "user_id"), "groups": (EventGroupModel, "group_id"), "eventtypes": (None, "type_id")}[owner]
+
+    def rbacobjectsKey(rbacobjects):
+        return None if rbacobjects is None else tuple(sorted(f"{rbacobject}" for rbacobject in rbacobjects))
+
+    def events_of(self, owner, where=None, skip=0, limit=10, orderby=None, desc=None, rbacobjects=None):
+        """Loader udalosti uzivatelu (owner="users"), skupin (owner="groups") nebo typu udalosti (owner="eventtypes"),
+        jeden pro kazdou kombinaci parametru, rbacobjects omezuje udalosti stejne jako u page
+        """
+        (linkModel, ownerColumnName) = ownerOf(owner)
+        key = (owner, json.dumps(where, sort_keys=True, default=str), skip, limit, orderby, desc, rbacobjectsKey(rbacobjects))
+        loaders = self.__dict__.setdefault("eventsOfOwnersLoaders", {})
+        loader = loaders.get(key, None)
+        if loader is None:
+            loader = createEventsOfOwnersLoader(
+                asyncSessionMaker, self.events, linkModel, ownerColumnName,
+                where=where, skip=skip, limit=limit, orderby=orderby, desc=desc, rbacobjects=rbacobjects)
+            loaders[key] = loader
+        return loader
+    attrs["events_of"] = events_of
+
+    def event_counts_of(self, owner, where=None, rbacobjects=None):
+        """Loader poctu udalosti vlastniku (viz events_of), jeden pro kazdy filtr"""
+        (linkModel, ownerColumnName) = ownerOf(owner)
+        key = (owner, json.dumps(where, sort_keys=True, default=str), rbacobjectsKey(rbacobjects))
+        loaders = self.__dict__.setdefault("eventCountsOfOwnersLoaders", {})
+        loader = loaders.get(key, None)
+        if loader is None:
+            loader = createEventCountsOfOwnersLoader(asyncSessionMaker, linkModel, ownerColumnName, where=where, rbacobjects=rbacobjects)
+            loaders[key] = loader
+        return loader
+    attrs["event_counts_of"] = event_counts_of
     Loaders = type('Loaders', (), attrs)   
     return Loaders()
 
@@ -115,5 +418,3 @@ def createLoadersContext(asyncSessionMaker):
     return {
         "loaders": createLoaders(asyncSessionMaker)
     }
-
-print(createLoaders(None))
\ No newline at end of file
@@ -1,4 +1,3 @@
-from ast import Call
 from typing import Coroutine, Callable, Awaitable, Union, List
 import uuid
 from sqlalchemy.future import select
@@ -94,22 +93,108 @@ async def resolvePresencesForEvent(session, id, invitationtypelist=[]):
 resolvePresenceTypeById = createEntityByIdGetter(PresenceTypeModel)
 resolveInvitationTypeById = createEntityByIdGetter(InvitationTypeModel)
 
+from sqlalchemy import literal
 from uoishelpers.dataloaders import prepareSelect
-def create_statement_for_user_events2(id, where: dict= None):
-    if where is None:
-        statement = select(EventModel)
-    else:    
-        statement = prepareSelect(EventModel, where)
-    statement = statement.join(PresenceModel)
-    statement = statement.filter(PresenceModel.user_id == id)
+def create_statement_for_events(where: dict = None, rbacobjects=None):
+    """Udalosti vyhovujici where, rbacobjects (neni-li None) je omezuji na EventModel.rbacobject IN (...)"""
+    statement = select(EventModel) if where is None else prepareSelect(EventModel, where)
+    if rbacobjects is not None:
+        statement = statement.filter(EventModel.rbacobject.in_([uuid.UUID(f"{rbacobject}") for rbacobject in rbacobjects]))
     return statement
 
+def create_statement_for_events_of_owners(linkModel, ownerColumnName, ids, where: dict = None, skip=0, limit=10, orderby=None, desc=None, rbacobjects=None):
+    """Udalosti vice vlastniku (uzivatelu pres PresenceModel.user_id, skupin pres EventGroupModel.group_id,
+    typu udalosti pres EventModel.type_id pri linkModel=None) jednim dotazem.
+    Kazdy vlastnik ma vlastni strankovani (skip, limit) pres ROW_NUMBER() OVER (PARTITION BY vlastnik), udalosti jsou razeny
+    podle (orderby, id), vychozi orderby je startdate. Vysledek je select dvojic (EventModel, id vlastnika).
+    rbacobjects (neni-li None) omezuje udalosti na EventModel.rbacobject IN (...) pred strankovanim.
+    """
+    from sqlalchemy import func
+    from sqlalchemy.orm import aliased
+    ownerColumn = getattr(EventModel if linkModel is None else linkModel, ownerColumnName)
+    statement = create_statement_for_events(where, rbacobjects)
+    orderColumn = None if orderby is None else getattr(EventModel, orderby, None)
+    if orderColumn is None:
+        orderColumn = EventModel.startdate
+    orderColumns = (orderColumn.desc(), EventModel.id.desc()) if desc else (orderColumn, EventModel.id)
+    rowNumber = func.row_number().over(partition_by=ownerColumn, order_by=orderColumns)
+    if linkModel is not None:
+        statement = statement.join(linkModel)
+    statement = (
+        statement
+        .filter(ownerColumn.in_(ids))
+        .add_columns(ownerColumn.label("owner_id"), rowNumber.label("rownumber"))
+        .subquery()
+    )
+    event = aliased(EventModel, statement)
+    return (
+        select(event, statement.c.owner_id)
+        .filter(statement.c.rownumber > skip)
+        .filter(statement.c.rownumber <= skip + limit)
+        .order_by(statement.c.owner_id, statement.c.rownumber)
+    )
+
+def create_statement_for_event_counts_of_owners(linkModel, ownerColumnName, ids, where: dict = None, rbacobjects=None):
+    """Pocty udalosti vice vlastniku (viz create_statement_for_events_of_owners) jednim dotazem,
+    COUNT ... GROUP BY vlastnik nad indexovanym sloupcem vlastnika. Vysledek je select dvojic (id vlastnika, pocet).
+    """
+    from sqlalchemy import func
+    ownerColumn = getattr(EventModel if linkModel is None else linkModel, ownerColumnName)
+    statement = create_statement_for_events(where, rbacobjects)
+    if linkModel is not None:
+        statement = statement.join(linkModel)
+    return (
+        statement
+        .with_only_columns(ownerColumn, func.count(), maintain_column_froms=True)
+        .filter(ownerColumn.in_(ids))
+        .group_by(ownerColumn)
+    )
+
+# ochrana proti cyklum v masterevent_id
+MAXTREEDEPTH = 100
+
+def create_statement_for_event_descendants(id, maxDepth: int = None):
+    """Vsechny udalosti obsazene v udalosti id (podudalosti, jejich podudalosti, ...) do hloubky maxDepth (1 = jen podudalosti),
+    jednim dotazem s rekurzivnim CTE, serazene podle urovne
+    """
+    maxDepth = MAXTREEDEPTH if maxDepth is None else min(maxDepth, MAXTREEDEPTH)
+    tree = (
+        select(EventModel.id.label("id"), literal(1).label("depth"))
+        .filter(EventModel.masterevent_id == id)
+        .cte("descendants", recursive=True)
+    )
+    tree = tree.union_all(
+        select(EventModel.id, tree.c.depth + 1)
+        .filter(EventModel.masterevent_id == tree.c.id)
+        .filter(tree.c.depth < maxDepth)
+    )
+    statement = (
+        select(EventModel)
+        .join(tree, EventModel.id == tree.c.id)
+        .order_by(tree.c.depth, EventModel.startdate, EventModel.id)
+    )
+    return statement
 
-def create_statement_for_group_events2(id, where: dict= None):
-    if where is None:
-        statement = select(EventModel)
-    else:    
-        statement = prepareSelect(EventModel, where)
-    statement = statement.join(EventGroupModel)
-    statement = statement.filter(EventGroupModel.group_id == id)
-    return statement
\ No newline at end of file
+
+def create_statement_for_event_ancestors(id):
+    """Vsechny udalosti, ktere obsahuji udalost id (nadudalost, jeji nadudalost, ...), jednim dotazem s rekurzivnim CTE,
+    serazene od nejblizsi
+    """
+    tree = (
+        select(EventModel.masterevent_id.label("id"), literal(1).label("depth"))
+        .filter(EventModel.id == id)
+        .filter(EventModel.masterevent_id.is_not(None))
+        .cte("ancestors", recursive=True)
+    )
+    tree = tree.union_all(
+        select(EventModel.masterevent_id, tree.c.depth + 1)
+        .filter(EventModel.id == tree.c.id)
+        .filter(EventModel.masterevent_id.is_not(None))
+        .filter(tree.c.depth < MAXTREEDEPTH)
+    )
+    statement = (
+        select(EventModel)
+        .join(tree, EventModel.id == tree.c.id)
+        .order_by(tree.c.depth)
+    )
+    return statement
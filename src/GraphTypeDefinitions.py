@@ -1,4 +1,5 @@
 from typing import Optional, List, Union, Annotated
+from enum import Enum
 import strawberry
 from dataclasses import dataclass
 
@@ -25,12 +26,25 @@ from ._GraphResolvers import (
     resolve_createdby,
     resolve_changedby,
 
+    createStub,
+    externalType,
+    resolveReferenceFromFK,
+    resolveEntities,
+    recursiveDepth,
+
     asPage,
+    PageInfoGQLModel,
+    resolveConnection,
     
     encapsulateInsert,
     encapsulateUpdate    
     )
 
+from ._GraphPermissions import RoleBasedPermission
+
+# udalosti a ucasti na nich vidi uzivatel s nekterou z techto roli na jejich rbacobject (v DEMO rezimu vsichni)
+EventReadPermission = RoleBasedPermission(roles="administrator;lecturer;trainer")
+
 GroupGQLModel = Annotated["GroupGQLModel", strawberry.lazy(".GraphTypeDefinitionsExt")]
 UserGQLModel = Annotated["UserGQLModel", strawberry.lazy(".GraphTypeDefinitionsExt")]
 
@@ -51,26 +65,36 @@ class PresenceGQLModel:
 
     @strawberry.field(description="""Present, Vacation etc.""")
     async def presence_type(self, info: strawberry.types.Info) -> Optional['PresenceTypeGQLModel']:
-        result = await PresenceTypeGQLModel.resolve_reference(info, self.presencetype_id)
+        result = await resolveReferenceFromFK(info, PresenceTypeGQLModel, self.presencetype_id)
         return result
 
     @strawberry.field(description="""Invited, Accepted, etc.""")
     async def invitation_type(self, info: strawberry.types.Info) -> Optional['InvitationTypeGQLModel']:
-        result = await InvitationTypeGQLModel.resolve_reference(info, self.invitationtype_id)
+        result = await resolveReferenceFromFK(info, InvitationTypeGQLModel, self.invitationtype_id)
         return result
 
     @strawberry.field(description="""The user / participant""")
-    async def user(self, info: strawberry.types.Info) -> Optional['UserGQLModel']:
-        from .GraphTypeDefinitionsExt import UserGQLModel
-        result = await UserGQLModel.resolve_reference(info, id=self.user_id)
-        return result
+    def user(self, info: strawberry.types.Info) -> Optional['UserGQLModel']:
+        return createStub(info, externalType("UserGQLModel"), self.user_id)
 
     @strawberry.field(description="""The event""")
     async def event(self, info: strawberry.types.Info) -> Optional['EventGQLModel']:
-        result = await EventGQLModel.resolve_reference(info, id=self.event_id)
+        result = await resolveReferenceFromFK(info, EventGQLModel, self.event_id)
         return result
 # endregion
 
+from uoishelpers.resolvers import createInputs
+
+# filtr udalosti, pouziva jej eventPage i EventTypeGQLModel.events
+@createInputs
+@dataclass
+class EventInputFilter:
+    name: str
+    name_en: str
+    startdate: datetime.datetime
+    enddate: datetime.datetime
+    type_id: IDType
+
 # region EventType Model
 @strawberry.federation.type(keys=["id"], description="""Represents an event type""")
 class EventTypeGQLModel:
@@ -90,10 +114,31 @@ class EventTypeGQLModel:
     createdby = resolve_createdby
     changedby = resolve_changedby
 
-    @strawberry.field(description="""Related events""")
-    async def events(self, info: strawberry.types.Info) -> List['EventGQLModel']:
-        loader = EventGQLModel.getLoader(info)
-        result = await loader.filter_by(type_id=self.id)
+    @strawberry.field(description="""Related events, paged, ordered by startdate unless orderby is given""")
+    async def events(
+        self,
+        info: strawberry.types.Info,
+        where: Optional[EventInputFilter] = None,
+        orderby: Optional[str] = None,
+        desc: Optional[bool] = None,
+        skip: Optional[int] = 0,
+        limit: Optional[int] = 10
+    ) -> List['EventGQLModel']:
+        # udalosti vsech typu v requestu (napr. ze stranky eventTypePage) jsou nacteny jednim dotazem
+        wheredict = None if where is None else strawberry.asdict(where)
+        loaders = getLoadersFromInfo(info)
+        rbacobjects = await EventReadPermission.permittedRbacobjects(info, loaders.events)
+        loader = loaders.events_of("eventtypes", where=wheredict, skip=skip, limit=limit, orderby=orderby, desc=desc, rbacobjects=rbacobjects)
+        result = await loader.load(self.id)
+        return result
+
+    @strawberry.field(description="""Number of related events""")
+    async def events_count(self, info: strawberry.types.Info, where: Optional[EventInputFilter] = None) -> int:
+        wheredict = None if where is None else strawberry.asdict(where)
+        loaders = getLoadersFromInfo(info)
+        rbacobjects = await EventReadPermission.permittedRbacobjects(info, loaders.events)
+        loader = loaders.event_counts_of("eventtypes", where=wheredict, rbacobjects=rbacobjects)
+        result = await loader.load(self.id)
         return result
 # endregion
 
@@ -145,7 +190,9 @@ import datetime
 from src.GraphResolvers import (
     resolveEventById,
     resolveGroupsForEvent,
-    resolvePresencesForEvent
+    resolvePresencesForEvent,
+    create_statement_for_event_ancestors,
+    create_statement_for_event_descendants
 )
 
 # endregion
@@ -191,35 +238,49 @@ class EventGQLModel:
 
     @strawberry.field(description="""Groups of users linked to the event""")
     async def groups(self, info: strawberry.types.Info) -> List["GroupGQLModel"]:
-        from .GraphTypeDefinitionsExt import GroupGQLModel
+        GroupGQLModel = externalType("GroupGQLModel")
         loader = getLoadersFromInfo(info).events_groups
         rows = await loader.filter_by(event_id=self.id)
-        return map(lambda row: GroupGQLModel(id=row.group_id), rows)           
+        return [createStub(info, GroupGQLModel, row.group_id) for row in rows]
 
     @strawberry.field(description="""Participants of the event and if they were absent or so...""")
     async def presences(self, info: strawberry.types.Info) -> List["PresenceGQLModel"]:
         # loader = getLoadersFromInfo(info).presences
         loader = PresenceGQLModel.getLoader(info)
         result = await loader.filter_by(event_id=self.id)
+        result = await EventReadPermission.filterPermitted(info, result)
         return result
 
     @strawberry.field(description="""Type of the event""")
     async def event_type(self, info: strawberry.types.Info) -> Optional["EventTypeGQLModel"]:
-        result = await EventTypeGQLModel.resolve_reference(info=info, id=self.type_id)
+        result = await resolveReferenceFromFK(info, EventTypeGQLModel, self.type_id)
         return result
 
     @strawberry.field(description="""event which contains this event (aka semester of this lesson)""")
     async def master_event(self, info: strawberry.types.Info) -> Optional["EventGQLModel"]:
-        result = None
-        if (self.masterevent_id is not None):
-            result = await EventGQLModel.resolve_reference(info=info, id=self.masterevent_id)
+        result = await resolveReferenceFromFK(info, EventGQLModel, self.masterevent_id)
         return result
 
     @strawberry.field(description="""events which are contained by this event (aka all lessons for the semester)""")
     async def sub_events(self, info: strawberry.types.Info) -> List["EventGQLModel"]:
-        # loader = getLoadersFromInfo(info).events
+        # vnorene subEvents jsou nacteny po urovnich, jeden dotaz na uroven (viz filter_by_levels)
+        loader = EventGQLModel.getLoader(info)
+        result = await loader.filter_by_levels(recursiveDepth(info), masterevent_id=self.id)
+        result = await EventReadPermission.filterPermitted(info, result)
+        return result
+
+    @strawberry.field(description="""events which contain this event, the nearest first (aka semester and school year of this lesson)""")
+    async def ancestors(self, info: strawberry.types.Info) -> List["EventGQLModel"]:
         loader = EventGQLModel.getLoader(info)
-        result = await loader.filter_by(masterevent_id=self.id)
+        statement = create_statement_for_event_ancestors(self.id)
+        result = await loader.execute_select(statement)
+        return result
+
+    @strawberry.field(description="""events contained by this event up to maxDepth levels (1 means sub events only), ordered by level""")
+    async def descendants(self, info: strawberry.types.Info, max_depth: Optional[int] = None) -> List["EventGQLModel"]:
+        loader = EventGQLModel.getLoader(info)
+        statement = create_statement_for_event_descendants(self.id, maxDepth=max_depth)
+        result = await loader.execute_select(statement)
         return result
 # endregion
 
@@ -232,6 +293,7 @@ class EventGQLModel:
 ###########################################################################################################################
 
 from uoishelpers.resolvers import createInputs
+from src.DBDefinitions import EventModel, partitioning
 
 # region EventType Model
 @createInputs
@@ -305,20 +367,16 @@ async def invitation_type_by_id(self, info: strawberry.types.Info, id: IDType) -
 
 # region Event Model
 
-@createInputs
-@dataclass
-class EventInputFilter:
-    name: str
-    name_en: str
-    startdate: datetime.datetime
-    enddate: datetime.datetime
-    type_id: IDType
-
 @strawberry.field(
     description="""Finds all events paged""",
     #permission_classes=[OnlyForAuthentized(isList=True)]
     )
-@asPage
+@asPage(permission=EventReadPermission, eager={
+    "eventType": EventModel.type,
+    "presences": EventModel.presences,
+    "groups": EventModel.groups,
+    "subEvents": EventModel.subevents
+})
 async def event_page(self, info: strawberry.types.Info, skip: Optional[int] = 0, limit: Optional[int] = 10, where: Optional[EventInputFilter] = None) -> List["EventGQLModel"]:
     return EventGQLModel.getLoader(info)
 
@@ -328,6 +386,41 @@ async def event_page(self, info: strawberry.types.Info, skip: Optional[int] = 0,
     )
 async def event_by_id(self, info: strawberry.types.Info, id: IDType) -> Optional["EventGQLModel"]:
     return await EventGQLModel.resolve_reference(info=info, id=id)
+
+@strawberry.enum(description="""Ordering of eventConnection, ties are resolved by id""")
+class EventConnectionOrderBy(Enum):
+    STARTDATE = "startdate"
+    LASTCHANGE = "lastchange"
+
+@strawberry.type(description="""Event with its cursor""")
+class EventEdgeGQLModel:
+    cursor: str = strawberry.field(description="""Opaque cursor, can be used as `after`""")
+    node: EventGQLModel = strawberry.field(description="""The event""")
+
+@strawberry.type(description="""Page of events (keyset pagination)""")
+class EventConnectionGQLModel:
+    edges: List[EventEdgeGQLModel]
+    page_info: PageInfoGQLModel
+
+@strawberry.field(
+    description="""Finds all events paged by cursor, unlike eventPage it does not slow down on deep pages""",
+    #permission_classes=[OnlyForAuthentized(isList=True)]
+    )
+async def event_connection(
+    self, info: strawberry.types.Info, 
+    first: Optional[int] = 10, 
+    after: Optional[str] = None, 
+    order_by: Optional[EventConnectionOrderBy] = EventConnectionOrderBy.STARTDATE,
+    where: Optional[EventInputFilter] = None
+) -> EventConnectionGQLModel:
+    wf = None if where is None else strawberry.asdict(where)
+    orderby = EventConnectionOrderBy.STARTDATE if order_by is None else order_by
+    loader = EventGQLModel.getLoader(info)
+    rbacobjects = await EventReadPermission.permittedRbacobjects(info, loader)
+    rows, cursors, hasNextPage = await resolveConnection(loader, first=first, after=after, orderby=orderby.value, where=wf, rbacobjects=rbacobjects)
+    edges = [EventEdgeGQLModel(cursor=cursor, node=row) for row, cursor in zip(rows, cursors)]
+    endCursor = cursors[-1] if len(cursors) > 0 else after
+    return EventConnectionGQLModel(edges=edges, page_info=PageInfoGQLModel(has_next_page=hasNextPage, end_cursor=endCursor))
 # endregion
 
 # region Presence Model
@@ -341,7 +434,7 @@ class PresenceInputFilter:
     description="""Finds all events paged""",
     #permission_classes=[OnlyForAuthentized(isList=True)]
     )
-@asPage
+@asPage(permission=EventReadPermission)
 async def presence_page(self, info: strawberry.types.Info, skip: Optional[int] = 0, limit: Optional[int] = 10, where: Optional[PresenceInputFilter] = None) -> List["PresenceGQLModel"]:
     return PresenceGQLModel.getLoader(info)
 
@@ -352,6 +445,32 @@ async def presence_page(self, info: strawberry.types.Info, skip: Optional[int] =
 async def presence_by_id(self, info: strawberry.types.Info, id: IDType) -> Optional["PresenceGQLModel"]:
     return await PresenceGQLModel.resolve_reference(info=info, id=id)
 
+@strawberry.type(description="""Presence with its cursor""")
+class PresenceEdgeGQLModel:
+    cursor: str = strawberry.field(description="""Opaque cursor, can be used as `after`""")
+    node: PresenceGQLModel = strawberry.field(description="""The presence""")
+
+@strawberry.type(description="""Page of presences (keyset pagination)""")
+class PresenceConnectionGQLModel:
+    edges: List[PresenceEdgeGQLModel]
+    page_info: PageInfoGQLModel
+
+@strawberry.field(
+    description="""Finds all presences paged by cursor, ordered by lastchange""",
+    #permission_classes=[OnlyForAuthentized(isList=True)]
+    )
+async def presence_connection(
+    self, info: strawberry.types.Info, 
+    first: Optional[int] = 10, 
+    after: Optional[str] = None
+) -> PresenceConnectionGQLModel:
+    loader = PresenceGQLModel.getLoader(info)
+    rbacobjects = await EventReadPermission.permittedRbacobjects(info, loader)
+    rows, cursors, hasNextPage = await resolveConnection(loader, first=first, after=after, orderby="lastchange", rbacobjects=rbacobjects)
+    edges = [PresenceEdgeGQLModel(cursor=cursor, node=row) for row, cursor in zip(rows, cursors)]
+    endCursor = cursors[-1] if len(cursors) > 0 else after
+    return PresenceConnectionGQLModel(edges=edges, page_info=PageInfoGQLModel(has_next_page=hasNextPage, end_cursor=endCursor))
+
 # endregion
 ###########################################################################################################################
 #
@@ -365,9 +484,11 @@ async def presence_by_id(self, info: strawberry.types.Info, id: IDType) -> Optio
 class Query:
     event_by_id = event_by_id
     event_page = event_page
+    event_connection = event_connection
 
     event_presence_page = presence_page
     event_presence_by_id = presence_by_id
+    event_presence_connection = presence_connection
 
     event_type_by_id = event_type_by_id
     event_type_page = event_type_page
@@ -389,6 +510,7 @@ class Query:
 ###########################################################################################################################
 
 from typing import Optional
+import uuid
 # region Event
 @strawberry.input(description="Datastructure for insert")
 class EventInsertGQLModel:
@@ -432,6 +554,9 @@ class EventResultGQLModel:
         # permission_classes=[OnlyForAuthentized()]
         )
 async def event_insert(self, info: strawberry.types.Info, event: EventInsertGQLModel) -> EventResultGQLModel:
+    if partitioning["events"] and (event.startdate is None):
+        # startdate je soucasti primarniho klice partitioned tabulky events, udalost bez nej nelze ulozit
+        return EventResultGQLModel(id=uuid.uuid4() if event.id is None else event.id, msg="fail")
     return await encapsulateInsert(info, EventGQLModel.getLoader(info), event, EventResultGQLModel(id=None, msg="ok"))
 
 @strawberry.mutation(description="updates the event")
@@ -492,6 +617,7 @@ class EventTypeInsertGQLModel:
 @strawberry.input(description="Datastructure for event type update")
 class EventTypeUpdateGQLModel:
     id: IDType
+    lastchange: datetime.datetime
     name: Optional[str] = None
     name_en: Optional[str] = None
     changedby: strawberry.Private[IDType] = None
@@ -513,7 +639,7 @@ async def event_type_insert(self, info: strawberry.types.Info, event_type: Event
 
 @strawberry.mutation(description="updates the event")
 async def event_type_update(self, info: strawberry.types.Info, event_type: EventTypeUpdateGQLModel) -> EventTypeResultGQLModel:
-    return await encapsulateUpdate(info, PresenceGQLModel.getLoader(info), event_type, EventTypeResultGQLModel(id=None, msg="ok"))
+    return await encapsulateUpdate(info, EventTypeGQLModel.getLoader(info), event_type, EventTypeResultGQLModel(id=None, msg="ok"))
 
 # endregion
 
@@ -529,6 +655,7 @@ class PresenceTypeInsertGQLModel:
 @strawberry.input(description="Datastructure for event type update")
 class PresenceTypeUpdateGQLModel:
     id: IDType
+    lastchange: datetime.datetime
     name: Optional[str] = None
     name_en: Optional[str] = None
     changedby: strawberry.Private[IDType] = None
@@ -566,6 +693,7 @@ class InvitationTypeInsertGQLModel:
 @strawberry.input(description="Datastructure for invitation type update")
 class InvitationTypeUpdateGQLModel:
     id: IDType
+    lastchange: datetime.datetime
     name: Optional[str] = None
     name_en: Optional[str] = None
     changedby: strawberry.Private[IDType] = None
@@ -727,6 +855,15 @@ class Mutation:
 #
 ###########################################################################################################################
 
-from .GraphTypeDefinitionsExt import UserGQLModel
-schema = strawberry.federation.Schema(Query, types=(UserGQLModel,), mutation=Mutation)
+from strawberry.federation.schema import FederationAny
+
+class FederationSchema(strawberry.federation.Schema):
+    """Federacni schema s davkovym _entities (jeden load_many na typ), viz resolveEntities"""
+    async def entities_resolver(
+        self, info: strawberry.types.Info, representations: List[FederationAny]
+    ) -> List[FederationAny]:
+        return await resolveEntities(info, representations, self.schema_converter.type_map, super().entities_resolver)
+
+from .GraphTypeDefinitionsExt import UserGQLModel, GroupGQLModel
+schema = FederationSchema(Query, types=(UserGQLModel, GroupGQLModel), mutation=Mutation)
 #schema = strawberry.federation.Schema(Query, types=(UserGQLModel,))
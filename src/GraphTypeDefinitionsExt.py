@@ -8,14 +8,12 @@ from uoishelpers.resolvers import createInputs
 
 @classmethod
 async def resolve_reference(cls, info: strawberry.types.Info, id: IDType):
+    # id z reprezentace (_entities) je retezec, sloupce Uuid vyzaduji uuid.UUID
+    if id is None: return None
+    if isinstance(id, str): id = IDType(id)
     return cls(id=id)
 
-from .GraphTypeDefinitions import EventGQLModel
-from .GraphResolvers import (
-    
-    create_statement_for_user_events2, 
-    create_statement_for_group_events2
-    )
+from .GraphTypeDefinitions import EventGQLModel, EventReadPermission
 
 @createInputs
 @dataclasses.dataclass
@@ -48,11 +46,12 @@ class UserGQLModel:
         limit: Optional[int] = 10,
         where: Optional[UGEventInputFilter] = None
     ) -> List["EventGQLModel"]:
+        # udalosti vsech uzivatelu v requestu (napr. z _entities) jsou nacteny jednim dotazem
         wheredict = None if where is None else strawberry.asdict(where)
-        statement = create_statement_for_user_events2(self.id, where=wheredict)
-        statement = statement.offset(skip).limit(limit)
-        loader = getLoadersFromInfo(info).events
-        result = await loader.execute_select(statement)
+        loaders = getLoadersFromInfo(info)
+        rbacobjects = await EventReadPermission.permittedRbacobjects(info, loaders.events)
+        loader = loaders.events_of("users", where=wheredict, skip=skip, limit=limit, rbacobjects=rbacobjects)
+        result = await loader.load(self.id)
         return result
 
 @strawberry.federation.type(extend=True, keys=["id"])
@@ -68,11 +67,12 @@ class GroupGQLModel:
         limit: Optional[int] = 10,
         where: Optional[UGEventInputFilter] = None
     ) -> List["EventGQLModel"]:
+        # udalosti vsech skupin v requestu (napr. z _entities) jsou nacteny jednim dotazem
         wheredict = None if where is None else strawberry.asdict(where)
-        statement = create_statement_for_group_events2(self.id, where=wheredict)
-        statement = statement.offset(skip).limit(limit)
-        loader = getLoadersFromInfo(info).events
-        result = await loader.execute_select(statement)
+        loaders = getLoadersFromInfo(info)
+        rbacobjects = await EventReadPermission.permittedRbacobjects(info, loaders.events)
+        loader = loaders.events_of("groups", where=wheredict, skip=skip, limit=limit, rbacobjects=rbacobjects)
+        result = await loader.load(self.id)
         return result
 
 
@@ -84,6 +84,7 @@ class RBACObjectGQLModel:
     @classmethod
     async def resolve_roles(cls, info: strawberry.types.Info, id: IDType):
         loader = getLoadersFromInfo(info).authorizations
+        loader.setTokenByInfo(info)
         authorizedroles = await loader.load(id)
         return authorizedroles
 
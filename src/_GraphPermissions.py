@@ -52,7 +52,6 @@ class BasePermission(strawberry.permission.BasePermission):
 
 
 from functools import cache
-import aiohttp
 
 
 rolelist = [
@@ -184,30 +183,274 @@ rolelist = [
 
 #     pass
 
-import requests
-# from utils.gql_ug_proxy import createProxy
+###########################################################################################################################
+#
+# katalog roli (roletypes)
+# vychozi obsah je rolelist, pri startu (lifespan) je katalog nacten z GQLUG_ENDPOINT_URL a pak periodicky obnovovan na pozadi,
+# pri chybe nacteni zustava platny posledni znamy obsah
+#
+###########################################################################################################################
 
-def ReadAllRoles():
-    GQLUG_ENDPOINT_URL = os.environ.get("GQLUG_ENDPOINT_URL", None)
-    gqlproxy = createProxy(GQLUG_ENDPOINT_URL)
+import asyncio
+
+async def ReadAllRoles(GQLUG_ENDPOINT_URL=None):
+    """Nacte vsechny typy roli z GQLUG_ENDPOINT_URL, vraci list of dict (id, name, name_en)"""
+    import aiohttp
+    GQLUG_ENDPOINT_URL = os.environ.get("GQLUG_ENDPOINT_URL", None) if GQLUG_ENDPOINT_URL is None else GQLUG_ENDPOINT_URL
+    assert GQLUG_ENDPOINT_URL is not None, "GQLUG_ENDPOINT_URL is not defined, roles cannot be read"
 
     query = """query {roleTypePage(limit: 1000) {id, name, nameEn}}"""
-    variables = {}
+    json = {"query": query, "variables": {}}
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+        async with session.post(url=GQLUG_ENDPOINT_URL, json=json) as resp:
+            assert resp.status == 200, f"during roles reading got status {resp.status}"
+            respJson = await resp.json()
 
-    respJson = gqlproxy.post(query=query, variables=variables)
     assert respJson.get("errors", None) is None, respJson["errors"]
     respdata = respJson.get("data", None)
     assert respdata is not None, "during roles reading roles have not been readed"
-    roles = respdata.get("roles", None)
+    roles = respdata.get("roleTypePage", None)
     assert roles is not None, "during roles reading roles have not been readed"
-    print("roles", roles)
-    roles = list(map(lambda item: {**item, "nameEn": item["name_ne"]}, roles))
-    return [*roles]
+    return [{"id": role["id"], "name": role["name"], "name_en": role["nameEn"]} for role in roles]
+
+class RoleCatalogue:
+    """Index roli name_en -> id, obnovovany z GQLUG_ENDPOINT_URL"""
+    def __init__(self, roles, ttl=300, readRoles=ReadAllRoles):
+        self.ttl = ttl
+        self.readRoles = readRoles
+        self.task = None
+        self.setRoles(roles)
+
+    def setRoles(self, roles):
+        self.roleIndex = {role["name_en"]: role["id"] for role in roles}
+        # prevody retezcu roli (RolesToList, RolesToSet) jsou platne jen pro aktualni index
+        self.rolesToListCache = {}
+        self.rolesToSetCache = {}
+
+    async def refresh(self):
+        """Nacte katalog, vraci True pri uspechu. Pri chybe je ponechan dosavadni index."""
+        try:
+            roles = await self.readRoles()
+        except Exception as e:
+            logging.warning(f"role catalogue refresh failed, keeping {len(self.roleIndex)} known roles: {type(e).__name__}: {e}")
+            return False
+        self.setRoles(roles)
+        logging.info(f"role catalogue refreshed, {len(self.roleIndex)} roles")
+        return True
+
+    async def refreshPeriodically(self):
+        while True:
+            await asyncio.sleep(self.ttl)
+            await self.refresh()
+
+    async def start(self):
+        """Prvni nacteni a spusteni obnovovani na pozadi, volano z lifespan"""
+        await self.refresh()
+        if self.task is None:
+            self.task = asyncio.create_task(self.refreshPeriodically())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+roleCatalogue = RoleCatalogue(rolelist, ttl=int(os.environ.get("ROLECATALOGUE_TTL", "300")))
+
+###########################################################################################################################
+#
+# role na rbacobject (authorizations)
+# role jsou nacitany z GQLUG_ENDPOINT_URL davkove (loader authorizations, jeden dotaz na request a davku rbacobject)
+# a drzeny v procesni cache s TTL, role na rbacobject nezavisi na tazateli, cache je tedy sdilena vsemi requesty
+#
+###########################################################################################################################
+
+import time
+
+class AuthorizedRoles(list):
+    """List roli na rbacobject, navic s indexem id uzivatele -> frozenset id typu roli"""
+    def __init__(self, roles):
+        super().__init__(roles)
+        byUser = {}
+        for role in roles:
+            # zneplatnena role (valid: false) opravneni nedava
+            if not role.get("valid", False):
+                continue
+            byUser.setdefault(role["user"]["id"], set()).add(role["roletype"]["id"])
+        self.byUser = {userId: frozenset(roleTypeIds) for userId, roleTypeIds in byUser.items()}
+
+    def roleTypeIdsOf(self, userId):
+        return self.byUser.get(f"{userId}", frozenset())
+
+async def QueryByIds(ids, field, token=None, GQLUG_ENDPOINT_URL=None):
+    """Polozi jeden dotaz na GQLUG_ENDPOINT_URL s polem field pro kazde id (aliasy r0, r1, ...).
+    field je sablona s promennou $id, napr. 'rbacById(id: $id) { roles { ...role } }', muze pouzit fragment role.
+    Vraci list hodnot aliasu ve stejnem poradi jako ids.
+    """
+    import aiohttp
+    GQLUG_ENDPOINT_URL = os.environ.get("GQLUG_ENDPOINT_URL", None) if GQLUG_ENDPOINT_URL is None else GQLUG_ENDPOINT_URL
+    assert GQLUG_ENDPOINT_URL is not None, "GQLUG_ENDPOINT_URL is not defined, roles cannot be read"
+
+    params = ", ".join(f"$id{index}: UUID!" for index, _ in enumerate(ids))
+    fields = "\n".join(
+        f"r{index}: " + field.replace("$id", f"$id{index}") for index, _ in enumerate(ids))
+    query = f"""query ({params}) {{
+{fields}
+}}
+
+fragment role on RoleGQLModel {{
+  valid
+  roletype {{ id }}
+  user {{ id }}
+  group {{ id }}
+}}"""
+    variables = {f"id{index}": f"{id}" for index, id in enumerate(ids)}
+    cookies = {} if token is None else {"authorization": token}
+    json = {"query": query, "variables": variables}
+    async with aiohttp.ClientSession(cookies=cookies, timeout=aiohttp.ClientTimeout(total=10)) as session:
+        async with session.post(url=GQLUG_ENDPOINT_URL, json=json) as resp:
+            assert resp.status == 200, f"during roles reading got status {resp.status}"
+            respJson = await resp.json()
 
-if not isDEMO:
-    rolelist = ReadAllRoles()
+    assert respJson.get("errors", None) is None, respJson["errors"]
+    respdata = respJson.get("data", None)
+    assert respdata is not None, "during roles reading roles have not been readed"
+    return [respdata.get(f"r{index}", None) for index, _ in enumerate(ids)]
+
+async def ReadAuthorizations(rbacobjects, token=None, GQLUG_ENDPOINT_URL=None):
+    """Nacte role na vsech rbacobjects jednim dotazem, vraci list of list of dict ve stejnem poradi"""
+    rows = await QueryByIds(rbacobjects, "rbacById(id: $id) { roles { ...role } }", token=token, GQLUG_ENDPOINT_URL=GQLUG_ENDPOINT_URL)
+    return [[] if rbac is None else (rbac.get("roles", None) or []) for rbac in rows]
+
+class AuthorizationCache:
+    """Procesni cache rbacobject -> AuthorizedRoles s TTL a omezenou velikosti"""
+    def __init__(self, ttl=60, maxsize=10000, readAuthorizations=ReadAuthorizations):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.readAuthorizations = readAuthorizations
+        self.entries = {}
+
+    def get(self, rbacobject):
+        entry = self.entries.get(rbacobject, None)
+        if entry is None:
+            return None
+        (expires, roles) = entry
+        if expires < time.monotonic():
+            del self.entries[rbacobject]
+            return None
+        return roles
+
+    def put(self, rbacobject, roles):
+        if (rbacobject not in self.entries) and (len(self.entries) >= self.maxsize):
+            # dict zachovava poradi vlozeni, odstranen je nejstarsi zaznam
+            del self.entries[next(iter(self.entries))]
+        self.entries[rbacobject] = (time.monotonic() + self.ttl, roles)
+
+    def invalidate(self, rbacobject):
+        self.entries.pop(f"{rbacobject}", None)
+
+    def clear(self):
+        self.entries.clear()
+
+    async def load_many(self, rbacobjects, token=None):
+        """Vraci list AuthorizedRoles, z GQLUG_ENDPOINT_URL jsou nacteny (jednim dotazem) jen chybejici nebo prosle zaznamy"""
+        rbacobjects = [f"{rbacobject}" for rbacobject in rbacobjects]
+        result = {rbacobject: self.get(rbacobject) for rbacobject in rbacobjects}
+        missing = [rbacobject for rbacobject, roles in result.items() if roles is None]
+        if len(missing) > 0:
+            rows = await self.readAuthorizations(missing, token=token)
+            for rbacobject, roles in zip(missing, rows):
+                roles = AuthorizedRoles(roles)
+                self.put(rbacobject, roles)
+                result[rbacobject] = roles
+        return [result[rbacobject] for rbacobject in rbacobjects]
+
+authorizationCache = AuthorizationCache(
+    ttl=int(os.environ.get("AUTHORIZATIONCACHE_TTL", "60")),
+    maxsize=int(os.environ.get("AUTHORIZATIONCACHE_SIZE", "10000")))
+
+def tokenFromInfo(info):
+    request = info.context.get("request", None)
+    return None if request is None else request.scope.get("jwt", None)
+
+###########################################################################################################################
+#
+# procesni cache rozhodnuti (user id, rbacobject, role) -> povoleno, vychozi stav je vypnuto (PERMISSIONCACHE=True zapina)
+# zamitnuti jsou drzena nejvyse stejne dlouho jako povoleni (denyttl <= ttl), aby nove pridelena role zacala platit co nejdrive
+# pri zmene roli je treba volat InvalidateAuthorizations (odstrani i nactene role z authorizationCache)
+#
+###########################################################################################################################
+
+class DecisionCache:
+    """Omezena cache rozhodnuti RoleBasedPermission s kratkym TTL a pocitadly zasahu"""
+    def __init__(self, enabled=False, ttl=10, denyttl=2, maxsize=100000):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.denyttl = min(denyttl, ttl)
+        self.maxsize = maxsize
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, userId, rbacobject, roles):
+        """Vraci True / False nebo None, neni-li rozhodnuti v cache (ci je cache vypnuta)"""
+        if not self.enabled:
+            return None
+        key = (f"{userId}", f"{rbacobject}", roles)
+        entry = self.entries.get(key, None)
+        if (entry is not None) and (entry[0] < time.monotonic()):
+            del self.entries[key]
+            entry = None
+        if entry is None:
+            self.misses = self.misses + 1
+            return None
+        self.hits = self.hits + 1
+        return entry[1]
+
+    def put(self, userId, rbacobject, roles, allowed):
+        if not self.enabled:
+            return
+        key = (f"{userId}", f"{rbacobject}", roles)
+        if (key not in self.entries) and (len(self.entries) >= self.maxsize):
+            del self.entries[next(iter(self.entries))]
+        ttl = self.ttl if allowed else self.denyttl
+        self.entries[key] = (time.monotonic() + ttl, allowed)
+
+    def invalidate(self, userId=None, rbacobject=None):
+        """Odstrani rozhodnuti tykajici se uzivatele a / nebo rbacobject, bez parametru odstrani vse"""
+        if (userId is None) and (rbacobject is None):
+            self.entries.clear()
+            return
+        userId = None if userId is None else f"{userId}"
+        rbacobject = None if rbacobject is None else f"{rbacobject}"
+        for key in list(self.entries.keys()):
+            if ((userId is None) or (key[0] == userId)) and ((rbacobject is None) or (key[1] == rbacobject)):
+                del self.entries[key]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled, "size": len(self.entries),
+            "hits": self.hits, "misses": self.misses, "hitRate": (self.hits / total) if total > 0 else 0.0
+        }
 
-roleIndex = { role["name_en"]: role["id"] for role in rolelist }
+decisionCache = DecisionCache(
+    enabled=os.environ.get("PERMISSIONCACHE", "False") == "True",
+    ttl=float(os.environ.get("PERMISSIONCACHE_TTL", "10")),
+    denyttl=float(os.environ.get("PERMISSIONCACHE_DENYTTL", "2")),
+    maxsize=int(os.environ.get("PERMISSIONCACHE_SIZE", "100000")))
+
+def InvalidateAuthorizations(userId=None, rbacobject=None):
+    """Volat pri zmene roli, userId a / nebo rbacobject omezuji rozsah, bez parametru je zneplatneno vse"""
+    decisionCache.invalidate(userId=userId, rbacobject=rbacobject)
+    if rbacobject is not None:
+        authorizationCache.invalidate(rbacobject)
+    else:
+        # role uzivatele mohly byt zmeneny na libovolnem rbacobject
+        authorizationCache.clear()
 
 # async def ReadRoles(
 #     userId="2d9dc5ca-a4a2-11ed-b9df-0242ac120003", 
@@ -265,28 +508,64 @@ roleIndex = { role["name_en"]: role["id"] for role in rolelist }
 #     print("groupsAuthorizedIds", groupsAuthorizedIds)
 #     return groupsAuthorizedIds
 
-@cache
 def RolesToList(roles: str = ""):
-    roleNames = roles.split(";")
-    roleNames = list(map(lambda item: item.strip(), roleNames))
-    roleIdsNeeded = list(map(lambda roleName: roleIndex[roleName], roleNames))
+    """Prevede retezec jmen roli (name_en oddelene strednikem) na list id podle aktualniho katalogu roli"""
+    roleIdsNeeded = roleCatalogue.rolesToListCache.get(roles, None)
+    if roleIdsNeeded is None:
+        roleNames = roles.split(";")
+        roleNames = list(map(lambda item: item.strip(), roleNames))
+        roleIdsNeeded = list(map(lambda roleName: roleCatalogue.roleIndex[roleName], roleNames))
+        roleCatalogue.rolesToListCache[roles] = roleIdsNeeded
+    return roleIdsNeeded
+
+def RolesToSet(roles: str = ""):
+    """Jako RolesToList, vraci frozenset id (test prunikem s rolemi uzivatele)"""
+    roleIdsNeeded = roleCatalogue.rolesToSetCache.get(roles, None)
+    if roleIdsNeeded is None:
+        roleIdsNeeded = frozenset(RolesToList(roles))
+        roleCatalogue.rolesToSetCache[roles] = roleIdsNeeded
     return roleIdsNeeded
 
 
+###########################################################################################################################
+#
+# trasovani rozhodnuti o opravnenich (PERMISSIONTRACE=True)
+# zaznamy jsou ukladany do kontextu requestu (info.context["trace"]) a main.py je vraci v extensions odpovedi,
+# pri vypnutem trasovani se nevytvari zadne zaznamy ani retezce
+#
+###########################################################################################################################
+
+isTracing = os.environ.get("PERMISSIONTRACE", "False") == "True"
+
+def tracePermission(info, permission, **record):
+    """Prida zaznam o rozhodnuti do trasy requestu, volat jen pokud isTracing"""
+    info.context.setdefault("trace", []).append({"permission": permission, **record})
+
 @cache
 def OnlyForAuthentized(isList=False):
     class OnlyForAuthentized(strawberry.permission.BasePermission):
         message = "User is not authenticated"
 
-        async def has_permission(
+        # synchronni (nic neceka), pole s touto permission a synchronnim resolverem je tak vyhodnoceno bez korutin
+        def has_permission(
             self, source, info: strawberry.types.Info, **kwargs
         ) -> bool:
             if self.isDEMO:
-                print("DEMO Enabled, not for production")
+                if isTracing and ("isAuthentized" not in info.context):
+                    info.context["isAuthentized"] = True
+                    tracePermission(info, "OnlyForAuthentized", allowed=True, demo=True)
                 return True
-            
-            user = getUserFromInfo(info)
-            return (False if user is None else True)
+
+            # vysledek zavisi jen na uzivateli, v ramci requestu (napr. createdby na vsech polozkach listu) se vyhodnocuje jednou
+            result = info.context.get("isAuthentized", None)
+            if result is None:
+                from ._GraphResolvers import getUserFromInfo
+                user = getUserFromInfo(info)
+                result = (False if user is None else True)
+                info.context["isAuthentized"] = result
+                if isTracing:
+                    tracePermission(info, "OnlyForAuthentized", allowed=result)
+            return result
             #     return False        
             # return True
         
@@ -299,80 +578,107 @@ def OnlyForAuthentized(isList=False):
         @cached_property
         def isDEMO(self):
             DEMO = os.getenv("DEMO", None)
+            if DEMO == "True":
+                logging.warning("DEMO Enabled, not for production")
             return True if DEMO == "True" else False
             
     return OnlyForAuthentized
 
+def rbacobjectOf(entity):
+    assert hasattr(entity, "rbacobject"), f"missing rbacobject on {entity}"
+    rbacobject = entity.rbacobject
+    assert rbacobject is not None, f"RoleBasedPermission cannot be used on {entity} as it has None value"
+    return f"{rbacobject}"
+
 @cache
 def RoleBasedPermission(roles: str = "", whatreturn=[]):
-    roleIdsNeeded = RolesToList(roles)
-
-    from .externals import RBACObjectGQLModel
     class RolebasedPermission(BasePermission):
         message = "User has not appropriate roles"
 
         def on_unauthorized(self) -> None:
             return whatreturn
-        
+
+        @classmethod
+        def isDEMO(cls):
+            # v DEMO rezimu se opravneni nevyhodnocuji (stejne jako u OnlyForAuthentized)
+            return os.getenv("DEMO", None) == "True"
+
+        @classmethod
+        async def isAllowedMany(cls, info: strawberry.types.Info, rbacobjects):
+            """Vraci dict rbacobject -> bool. Rozhodnuti jsou drzena v kontextu requestu,
+            kazdy rbacobject je tak vyhodnocen nejvyse jednou za request, chybejici jsou nacteny jednou davkou (loader authorizations).
+            """
+            # RoleBasedPermission je pouzivano pri definici typu, moduly s typy lze importovat az zde
+            from ._GraphResolvers import getLoadersFromInfo, getUserFromInfo
+            decisions = info.context.setdefault("permissionDecisions", {})
+            rbacobjects = [f"{rbacobject}" for rbacobject in rbacobjects]
+            missing = list(dict.fromkeys(
+                rbacobject for rbacobject in rbacobjects if (roles, rbacobject) not in decisions))
+            unknown = []
+            if len(missing) > 0:
+                userId = getUserFromInfo(info)["id"]
+                for rbacobject in missing:
+                    decision = decisionCache.get(userId, rbacobject, roles)
+                    if decision is None:
+                        unknown.append(rbacobject)
+                    else:
+                        decisions[(roles, rbacobject)] = decision
+                        if isTracing:
+                            tracePermission(info, "RoleBasedPermission", allowed=decision, roles=roles, rbacobject=rbacobject, source="decisionCache")
+            if len(unknown) > 0:
+                roleIdsNeeded = RolesToSet(roles)
+                loader = getLoadersFromInfo(info).authorizations
+                loader.setTokenByInfo(info)
+                authorized = await loader.load_many(unknown)
+                for rbacobject, authorizedroles in zip(unknown, authorized):
+                    decision = not roleIdsNeeded.isdisjoint(authorizedroles.roleTypeIdsOf(userId))
+                    decisions[(roles, rbacobject)] = decision
+                    decisionCache.put(userId, rbacobject, roles, decision)
+                    if isTracing:
+                        tracePermission(info, "RoleBasedPermission", allowed=decision, roles=roles, rbacobject=rbacobject, source="authorizations")
+            return {rbacobject: decisions[(roles, rbacobject)] for rbacobject in rbacobjects}
+
+        @classmethod
+        async def permittedRbacobjects(cls, info: strawberry.types.Info, loader):
+            """Vraci frozenset rbacobject z tabulky loaderu, na ktere ma uzivatel nekterou z roli (jednou za request a tabulku).
+            Kandidati jsou ruzne hodnoty rbacobject v tabulce (jeden dotaz), rozhodnuti o nich jsou ziskana z isAllowedMany,
+            omezeni v SQL (rbacobject IN (...)) tedy vraci stejne radky jako filterPermitted.
+            V DEMO rezimu vraci None (bez omezeni).
+            """
+            if cls.isDEMO():
+                return None
+            permitted = info.context.setdefault("permittedRbacobjects", {})
+            result = permitted.get((roles, loader), None)
+            if result is None:
+                candidates = await loader.rbacobjects()
+                decisions = await cls.isAllowedMany(info, candidates)
+                result = frozenset(rbacobject for rbacobject, decision in decisions.items() if decision)
+                permitted[(roles, loader)] = result
+            return result
+
+        @classmethod
+        async def filterPermitted(cls, info: strawberry.types.Info, entities):
+            """Vraci list entit, na ktere ma uzivatel opravneni, opravneni je vyhodnoceno pro cely list najednou"""
+            if cls.isDEMO():
+                return list(entities)
+            # entity bez rbacobject nelze autorizovat, stejne jako v SQL (rbacobject IN (...)) nejsou vraceny
+            entities = [entity for entity in entities if getattr(entity, "rbacobject", None) is not None]
+            rbacobjects = [rbacobjectOf(entity) for entity in entities]
+            decisions = await cls.isAllowedMany(info, rbacobjects)
+            return [entity for entity, rbacobject in zip(entities, rbacobjects) if decisions[rbacobject]]
+
         async def has_permission(
                 self, source: Any, info: strawberry.types.Info, **kwargs: Any
-            # self, source, info: strawberry.types.Info, **kwargs
-            # self, source, **kwargs
         ) -> bool:
-            # return False
-            logging.info(f"has_permission {kwargs}")
-            # assert False
-
-            # GQLUG_ENDPOINT_URL = os.environ.get("GQLUG_ENDPOINT_URL", None)
-            # assert GQLUG_ENDPOINT_URL is not None
-            # proxy = createProxy(GQLUG_ENDPOINT_URL)
-
-            print("RolebasedPermission", self) ##
-            print("RolebasedPermission", source) ## self as in GQLModel
-            print("RolebasedPermission", kwargs)
-
-            assert hasattr(source, "rbacobject"), f"missing rbacobject on {source}"
-            
-            rbacobject = source.rbacobject
-            
-            #rbacobject
-            assert rbacobject is not None, f"RoleBasedPermission cannot be used on {source} as it has None value"
-            # rbacobject = "2d9dc5ca-a4a2-11ed-b9df-0242ac120003"
-
-
-            ## zjistime, jake role jsou vztazeny k rbacobject 
-            # print(response)
-
-            authorizedroles = await RBACObjectGQLModel.resolve_roles(info=info, id=rbacobject)
-            # authloader = getLoadersFromInfoFromInfo(info=info).authorizations
-            # authloader.setTokenByInfo(info)
-            # authorizedroles = await authloader.load(rbacobject)
-            
+            if self.isDEMO():
+                return True
+            rbacobject = rbacobjectOf(source)
+            decision = info.context.get("permissionDecisions", {}).get((roles, rbacobject), None)
+            if decision is None:
+                decisions = await self.isAllowedMany(info, [rbacobject])
+                decision = decisions[rbacobject]
+            return decision
 
-            print("RolebasedPermission.rbacobject", rbacobject)
-            # _ = await self.canEditGroup(session,  source.id, ...)
-            print("RolebasedPermission.authorized", authorizedroles)
-            
-            # logging.info(f"RolebasedPermission.authorized {authorizedroles}")
-
-            # user_id = "2d9dc5ca-a4a2-11ed-b9df-0242ac120003"
-            user = getUserFromInfo(info)
-            # logging.info(f"RolebasedPermission.authorized user {user}")
-            user_id = user["id"]
-            s = [r for r in authorizedroles if (r["roletype"]["id"] in roleIdsNeeded)and(r["user"]["id"] == user_id)]
-            # s = [r for r in authorizedroles if r["roletype"]["id"] in roleIdsNeeded]
-            
-            logging.info(f"RolebasedPermission.authorized user {user} has roles {s}")
-
-            if len(s) > 0:
-                print("RolebasedPermission.access allowed")
-            else:
-                print("RolebasedPermission.access denied")
-            print(s)
-            print(roleIdsNeeded)
-            isAllowed = len(s) > 0
-            return isAllowed
-        
     return RolebasedPermission
 
 
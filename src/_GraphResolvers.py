@@ -3,6 +3,8 @@ import uuid
 import datetime
 import typing
 import logging
+import json
+import base64
 
 IDType = uuid.UUID
 
@@ -74,28 +76,197 @@ def resolve_created(self) -> typing.Optional[datetime.datetime]:
 
 UserGQLModel = typing.Annotated["UserGQLModel", strawberry.lazy(".GraphTypeDefinitionsExt")]
 
-async def resolve_user(user_id):
-    from .GraphTypeDefinitionsExt import UserGQLModel
-    result = None if user_id is None else await UserGQLModel.resolve_reference(id=user_id, info=None)
+from functools import cache
+
+@cache
+def externalType(name):
+    """Trida z GraphTypeDefinitionsExt (rozsireni federovanych typu), importovana az pri prvnim pouziti"""
+    from . import GraphTypeDefinitionsExt
+    return getattr(GraphTypeDefinitionsExt, name)
+
+def createStub(info: strawberry.types.Info, cls, id):
+    """Federacni stub cls(id=id) bez pristupu do DB. V ramci requestu je pro kazde (cls, id) vytvorena jedna instance."""
+    if id is None:
+        return None
+    stubs = info.context.setdefault("stubs", {})
+    key = (cls, id)
+    result = stubs.get(key, None)
+    if result is None:
+        if hasattr(cls, "getLoader"):
+            # typ nacitany z DB nema konstruktor s id, stub nese jen id (viz resolveReferenceFromFK)
+            result = cls.__new__(cls)
+            result.id = id
+        else:
+            result = cls(id=id)
+        stubs[key] = result
     return result
-    
+
+from graphql import FieldNode
+
+def isIdOnly(fieldNodes):
+    """True, pokud je ze vsech uzlu vybrano jen id (pripadne __typename)"""
+    return all(
+        (node.selection_set is not None) and all(
+            isinstance(selection, FieldNode) and (selection.name.value in ("id", "__typename"))
+            for selection in node.selection_set.selections)
+        for node in fieldNodes)
+
+def isIdOnlySelection(info: strawberry.types.Info):
+    """True, pokud je z vraceneho typu vybrano jen id (pripadne __typename).
+    Vysledek je drzen v kontextu pro kazde pole dotazu (uzel AST), pro vsechny radky listu se tedy vyhodnocuje jednou.
+    Fragmenty nejsou rozebirany, pole s fragmentem se vzdy nacita z DB.
+    """
+    fieldNodes = info._raw_info.field_nodes
+    selections = info.context.setdefault("idOnlySelections", {})
+    key = id(fieldNodes[0])
+    result = selections.get(key, None)
+    if result is None:
+        result = isIdOnly(fieldNodes)
+        selections[key] = result
+    return result
+
+def nestedDepth(fieldNodes, name):
+    """Pocet urovni, do kterych je pole name vnoreno samo do sebe (subEvents { subEvents { ... } }), vcetne uzlu fieldNodes"""
+    nested = [
+        selection
+        for node in fieldNodes if node.selection_set is not None
+        for selection in node.selection_set.selections
+        if isinstance(selection, FieldNode) and (selection.name.value == name)]
+    return 1 + (nestedDepth(nested, name) if len(nested) > 0 else 0)
+
+def recursiveDepth(info: strawberry.types.Info):
+    """nestedDepth pro prave resolvovane pole. Vysledek je drzen v kontextu pro kazde pole dotazu (uzel AST), fragmenty nejsou rozebirany."""
+    fieldNodes = info._raw_info.field_nodes
+    depths = info.context.setdefault("recursiveDepths", {})
+    key = id(fieldNodes[0])
+    result = depths.get(key, None)
+    if result is None:
+        result = nestedDepth(fieldNodes, info._raw_info.field_name)
+        depths[key] = result
+    return result
+
+def selectedFields(info: strawberry.types.Info):
+    """Pole vybrana z vraceneho typu, dict {jmeno pole GQL: [FieldNode, ...]}, fragmenty nejsou rozebirany"""
+    result = {}
+    for node in info._raw_info.field_nodes:
+        if node.selection_set is None:
+            continue
+        for selection in node.selection_set.selections:
+            if isinstance(selection, FieldNode):
+                result.setdefault(selection.name.value, []).append(selection)
+    return result
+
+def eagerRelations(info: strawberry.types.Info, eager):
+    """Dvojice (vazba, hloubka) pro vazby (atributy relationship) z eager {jmeno pole GQL: vazba}, jejichz pole jsou v dotazu vybrana.
+    Vazba many-to-one, ze ktere je vybrano jen id, neni nacitana (resolver vraci stub, viz resolveReferenceFromFK).
+    Hloubka je pocet vnorenych urovni rekurzivni vazby (subEvents { subEvents { ... } }), pro ostatni vazby 1.
+    """
+    selected = selectedFields(info)
+    result = []
+    for name, relation in eager.items():
+        if (name not in selected) or not (relation.property.uselist or not isIdOnly(selected[name])):
+            continue
+        recursive = relation.property.mapper is relation.property.parent
+        result.append((relation, nestedDepth(selected[name], name) if recursive else 1))
+    return result
+
+async def loadRelations(info: strawberry.types.Info, relations, rows):
+    """Nacte vazby (dvojice (vazba, hloubka) z eagerRelations) radku rows a vlozi je do loaderu requestu (loader je urcen tabulkou vazby),
+    resolvery vazeb (load, filter_by podle ciziho klice) je pak cerpaji z cache bez dotazu do DB.
+    Vazby many-to-one jsou jiz nacteny s radky (joinedload), kazda kolekce je nactena jednim dotazem na uroven (cizi klic IN (...), viz prime_levels),
+    dotazy kolekci bezi soucasne. Oproti selectinload odpada plneni kolekci na radcich, ktere resolvery nepouzivaji.
+    """
+    import asyncio
+    loaders = getLoadersFromInfo(info)
+
+    async def loadCollection(relationship, loader, depth):
+        [(local, remote)] = relationship.local_remote_pairs
+        await loader.prime_levels(remote.key, [getattr(row, local.key) for row in rows], depth)
+
+    collections = []
+    for relation, depth in relations:
+        relationship = relation.property
+        loader = getattr(loaders, relationship.mapper.class_.__tablename__)
+        if relationship.uselist:
+            collections.append(loadCollection(relationship, loader, depth))
+        else:
+            for row in rows:
+                related = getattr(row, relationship.key)
+                if related is not None:
+                    loader.clear(related.id)
+                    loader.prime(related.id, related)
+    await asyncio.gather(*collections)
+
+async def resolveReferenceFromFK(info: strawberry.types.Info, cls, id):
+    """Entita cls s primarnim klicem id (hodnota ciziho klice radku).
+    Je-li vybrano jen id, je vracen stub bez dotazu do DB, jinak je entita nactena (cls.resolve_reference).
+    """
+    if id is None:
+        return None
+    if isIdOnlySelection(info):
+        return createStub(info, cls, id)
+    return await cls.resolve_reference(info, id)
+
+async def resolveEntities(info: strawberry.types.Info, representations, typeMap, resolveOther):
+    """Resolver federacniho pole _entities.
+    Reprezentace jsou seskupeny podle __typename, typy s getLoader jsou nacteny jednim load_many na typ,
+    rozsirene (extend) typy jsou jen stuby (createStub), ostatni typy resi resolveOther (puvodni resolver strawberry).
+    Poradi vysledku odpovida poradi reprezentaci, chyba u jedne reprezentace je vracena na jejim miste.
+    """
+    import asyncio
+    results = [None] * len(representations)
+    groups = {}
+    for index, representation in enumerate(representations):
+        definition = typeMap[representation["__typename"]].definition
+        groups.setdefault(definition, []).append(index)
+
+    def entityId(index):
+        id = representations[index].get("id", None)
+        return IDType(id) if isinstance(id, str) else id
+
+    async def resolveGroup(definition, indexes):
+        cls = definition.origin
+        if hasattr(cls, "getLoader"):
+            ids = {}
+            for index in indexes:
+                try:
+                    ids[index] = entityId(index)
+                except ValueError as e:
+                    results[index] = e
+            rows = await cls.getLoader(info).load_many(list(ids.values()))
+            for index, row in zip(ids.keys(), rows):
+                if row is not None:
+                    row.__strawberry_definition__ = cls.__strawberry_definition__  # little hack :)
+                results[index] = row
+        elif definition.extend:
+            for index in indexes:
+                try:
+                    results[index] = createStub(info, cls, entityId(index))
+                except ValueError as e:
+                    results[index] = e
+        else:
+            for index in indexes:
+                [result] = resolveOther(info, [dict(representations[index])])
+                results[index] = (await result) if inspect.isawaitable(result) else result
+
+    await asyncio.gather(*(resolveGroup(definition, indexes) for definition, indexes in groups.items()))
+    return results
+
 @strawberry.field(description="""Who created entity""",
         permission_classes=[OnlyForAuthentized()])
-async def resolve_createdby(self) -> typing.Optional["UserGQLModel"]:
-    return await resolve_user(self.createdby)
+def resolve_createdby(self, info: strawberry.types.Info) -> typing.Optional["UserGQLModel"]:
+    return createStub(info, externalType("UserGQLModel"), self.createdby)
 
 @strawberry.field(description="""Who made last change""",
         permission_classes=[OnlyForAuthentized()])
-async def resolve_changedby(self) -> typing.Optional["UserGQLModel"]:
-    return await resolve_user(self.changedby)
+def resolve_changedby(self, info: strawberry.types.Info) -> typing.Optional["UserGQLModel"]:
+    return createStub(info, externalType("UserGQLModel"), self.changedby)
 
 RBACObjectGQLModel = typing.Annotated["RBACObjectGQLModel", strawberry.lazy(".GraphTypeDefinitionsExt")]
 @strawberry.field(description="""Who made last change""",
         permission_classes=[OnlyForAuthentized()])
-async def resolve_rbacobject(self, info: strawberry.types.Info) -> typing.Optional[RBACObjectGQLModel]:
-    from .GraphTypeDefinitionsExt import RBACObjectGQLModel
-    result = None if self.rbacobject is None else await RBACObjectGQLModel.resolve_reference(info, self.rbacobject)
-    return result
+def resolve_rbacobject(self, info: strawberry.types.Info) -> typing.Optional[RBACObjectGQLModel]:
+    return createStub(info, externalType("RBACObjectGQLModel"), self.rbacobject)
 
 resolve_result_id: IDType = strawberry.field(description="primary key of CU operation object")
 resolve_result_msg: str = strawberry.field(description="""Should be `ok` if descired state has been reached, otherwise `fail`.
@@ -105,7 +276,26 @@ from inspect import signature
 import inspect 
 from functools import wraps
 
-def asPage(field, *, extendedfilter=None):
+def asPage(field=None, *, extendedfilter=None, permission=None, eager=None):
+    """Z resolveru vracejiciho loader vytvori strankovany resolver (skip, limit, pripadne where, orderby, desc).
+    permission (RoleBasedPermission(...)) omezuje vysledek na polozky, na jejichz rbacobject ma uzivatel opravneni,
+    mnozina povolenych rbacobject je zjistena jednou za request a pridana do SQL (rbacobject IN (...)) pred LIMIT,
+    v DEMO rezimu omezeni neni.
+    eager ({jmeno pole GQL: vazba}) urcuje vazby, ktere jsou, jsou-li v dotazu vybrany, nacteny spolu se strankou
+    (pevny pocet dotazu nezavisly na poctu radku) a vlozeny do loaderu requestu, viz eagerRelations a loadRelations.
+    """
+    from sqlalchemy.orm import joinedload
+    async def loadPage(info, loader, **kwargs):
+        if permission is not None:
+            kwargs["rbacobjects"] = await permission.permittedRbacobjects(info, loader)
+        relations = [] if eager is None else eagerRelations(info, eager)
+        if len(relations) == 0:
+            return await loader.page(extendedfilter=extendedfilter, **kwargs)
+        options = [joinedload(relation) for relation, depth in relations if not relation.property.uselist]
+        results = list(await loader.page(extendedfilter=extendedfilter, options=options, **kwargs))
+        await loadRelations(info, relations, results)
+        return results
+
     def decorator(field):
         # print(field.__name__, field.__annotations__)
         signatureField = signature(field)
@@ -134,7 +324,7 @@ def asPage(field, *, extendedfilter=None):
             limit: typing.Optional[int] = limitParameterDefault
         ) -> signature(field).return_annotation:
             loader = await field(self, info)
-            results = await loader.page(skip=skip, limit=limit, extendedfilter=extendedfilter)
+            results = await loadPage(info, loader, skip=skip, limit=limit)
             return results
         foreignkeyVectorSimple.__name__ = field.__name__
         foreignkeyVectorSimple.__doc__ = field.__doc__
@@ -154,7 +344,7 @@ def asPage(field, *, extendedfilter=None):
             loader = await field(self, info, where=wf)    
             # logging.info(f"got a loader {loader}")
             # wf = None if where is None else strawberry.asdict(where)
-            results = await loader.page(skip=skip, limit=limit, where=wf, orderby=orderby, desc=desc, extendedfilter=extendedfilter)
+            results = await loadPage(info, loader, skip=skip, limit=limit, where=wf, orderby=orderby, desc=desc)
             return results
         foreignkeyVectorComplex.__name__ = field.__name__
         foreignkeyVectorComplex.__doc__ = field.__doc__
@@ -168,6 +358,38 @@ def asPage(field, *, extendedfilter=None):
     return decorator(field) if field else decorator
 
 
+@strawberry.type(description="""Information about the page of a connection (keyset pagination)""")
+class PageInfoGQLModel:
+    has_next_page: bool = strawberry.field(description="""True if there are more items after the end cursor""")
+    end_cursor: typing.Optional[str] = strawberry.field(description="""Cursor of the last item, use it as `after` for the next page""", default=None)
+
+def encodeCursor(row, orderby):
+    """Vytvori nepruhledny kurzor z hodnot (orderby, id) radku"""
+    value = getattr(row, orderby)
+    value = None if value is None else value.isoformat()
+    payload = json.dumps([value, f"{row.id}"])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decodeCursor(cursor):
+    """Inverze k encodeCursor, vraci dvojici (hodnota orderby, id)"""
+    try:
+        [value, id] = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        value = None if value is None else datetime.datetime.fromisoformat(value)
+        return (value, IDType(id))
+    except Exception as e:
+        raise ValueError(f"invalid cursor {cursor}") from e
+
+async def resolveConnection(loader, first, after, orderby, where=None, rbacobjects=None):
+    """Nacte stranku pomoci loader.keyset_page a vrati trojici (radky, kurzory, has_next_page)"""
+    assert first is not None and first >= 0, "first must be a non negative number"
+    afterKey = None if after is None else decodeCursor(after)
+    rows = await loader.keyset_page(first=first + 1, after=afterKey, orderby=orderby, where=where, rbacobjects=rbacobjects)
+    rows = list(rows)
+    hasNextPage = len(rows) > first
+    rows = rows[:first]
+    cursors = [encodeCursor(row, orderby) for row in rows]
+    return rows, cursors, hasNextPage
+
 async def encapsulateInsert(info, loader, entity, result):
     actinguser = getUserFromInfo(info)
     id = uuid.UUID(actinguser["id"])
@@ -220,10 +442,12 @@ async def encapsulateUpdate(info, loader, entity, result):
 
 #     return decorator(field)
 
-def asForeignList(*, foreignKeyName: str):
+def asForeignList(*, foreignKeyName: str, permission=None):
+    """Z resolveru vracejiciho loader vytvori strankovany resolver polozek, jejichz foreignKeyName je id rodice.
+    permission (RoleBasedPermission(...)) omezuje vysledek stejne jako u asPage.
+    """
     assert foreignKeyName is not None, "foreignKeyName must be defined"
     def decorator(field):
-        print(field.__name__, field.__annotations__)
         signatureField = signature(field)
         return_annotation = signatureField.return_annotation
 
@@ -247,7 +471,8 @@ def asForeignList(*, foreignKeyName: str):
             loader = field(self, info)
             if inspect.isawaitable(loader):
                 loader = await loader
-            results = await loader.page(skip=skip, limit=limit, extendedfilter=extendedfilter)
+            permitted = {} if permission is None else {"rbacobjects": await permission.permittedRbacobjects(info, loader)}
+            results = await loader.page(skip=skip, limit=limit, extendedfilter=extendedfilter, **permitted)
             return results
         foreignkeyVectorSimple.__name__ = field.__name__
         foreignkeyVectorSimple.__doc__ = field.__doc__
@@ -268,7 +493,8 @@ def asForeignList(*, foreignKeyName: str):
                 loader = await loader
             
             wf = None if where is None else strawberry.asdict(where)
-            results = await loader.page(skip=skip, limit=limit, where=wf, orderby=orderby, desc=desc, extendedfilter=extendedfilter)
+            permitted = {} if permission is None else {"rbacobjects": await permission.permittedRbacobjects(info, loader)}
+            results = await loader.page(skip=skip, limit=limit, where=wf, orderby=orderby, desc=desc, extendedfilter=extendedfilter, **permitted)
             return results
         foreignkeyVectorComplex.__name__ = field.__name__
         foreignkeyVectorComplex.__doc__ = field.__doc__
@@ -287,7 +513,8 @@ def asForeignList(*, foreignKeyName: str):
             loader = field(self, info)
             
             wf = None if where is None else strawberry.asdict(where)
-            results = await loader.page(skip=skip, limit=limit, where=wf, orderby=orderby, desc=desc, extendedfilter=extendedfilter)
+            permitted = {} if permission is None else {"rbacobjects": await permission.permittedRbacobjects(info, loader)}
+            results = await loader.page(skip=skip, limit=limit, where=wf, orderby=orderby, desc=desc, extendedfilter=extendedfilter, **permitted)
             return results
         foreignkeyVectorComplex2.__module__ = field.__module__
         if return_annotation._name == "List":
@@ -64,6 +64,41 @@ async def Async_Session_Maker(DBModels):
     return async_session_maker
 
 
+@pytest_asyncio.fixture
+async def CountingDatabase():
+    """Prazdna SQLite DB v pameti, vsechny SQL prikazy jsou zaznamenavany do statements.
+    Vraci dict {"asyncSessionMaker", "statements"}, data vklada test (modul) sam.
+    """
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from src.DBDefinitions import BaseModel
+
+    asyncEngine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with asyncEngine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+    asyncSessionMaker = async_sessionmaker(asyncEngine, expire_on_commit=False)
+
+    statements = []
+    event.listen(asyncEngine.sync_engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    yield {"asyncSessionMaker": asyncSessionMaker, "statements": statements}
+    await asyncEngine.dispose()
+
+@pytest.fixture
+def CountingExecutor(CountingDatabase, DemoTrue):
+    """Provede dotaz nad CountingDatabase s novymi loadery, statements obsahuji jen prikazy tohoto dotazu. Vraci data, chyby selzou.
+    Dotaz je proveden v DEMO rezimu, opravneni (RoleBasedPermission) tedy nic neomezuji.
+    """
+    from src.GraphTypeDefinitions import schema
+    from src.Dataloaders import createLoadersContext
+    async def Execute(query, variable_values={}):
+        context = createLoadersContext(CountingDatabase["asyncSessionMaker"])
+        context["user"] = {"id": "2d9dc5ca-a4a2-11ed-b9df-0242ac120003"}
+        CountingDatabase["statements"].clear()
+        result = await schema.execute(query, variable_values=variable_values, context_value=context)
+        assert result.errors is None, result.errors
+        return result.data
+    return Execute
+
 @pytest_asyncio.fixture
 async def SQLite(Async_Session_Maker, DemoData, DBModels):
     
@@ -1,6 +1,7 @@
 import time
 import logging
 import datetime
+import pytest
 import pytest_asyncio
 import uuid
 
@@ -196,4 +197,28 @@ async def FillDataViaGQL(DBModels, DemoData, GQLInsertQueries, ClientExecutorAdm
 
         logging.info(f"{tablename} initialized via gql query")
     duration = time.time() - start_time
-    logging.info(f"All WANTED tables are initialized in {duration}, total read queries {queriesR} and write queries {queriesW}")
\ No newline at end of file
+    logging.info(f"All WANTED tables are initialized in {duration}, total read queries {queriesR} and write queries {queriesW}")
+
+
+@pytest.fixture
+def SeedData():
+    """Data pro SeededDatabase, {tablename: [radky], ...}, modul ji prekryje vlastni fixturou.
+    Klice, ktere nejsou jmeny tabulek, jsou jen predany testum.
+    """
+    return {}
+
+@pytest_asyncio.fixture
+async def SeededDatabase(CountingDatabase, SeedData, DBModels):
+    """CountingDatabase naplnena radky ze SeedData (v poradi DBModels kvuli cizim klicum).
+    Vraci {**CountingDatabase, **SeedData}.
+    """
+    from sqlalchemy import insert
+
+    async with CountingDatabase["asyncSessionMaker"]() as session:
+        for DBModel in DBModels:
+            rows = SeedData.get(DBModel.__tablename__, None)
+            if rows:
+                await session.execute(insert(DBModel), rows)
+        await session.commit()
+    CountingDatabase["statements"].clear()
+    return {**CountingDatabase, **SeedData}
@@ -0,0 +1,271 @@
+import uuid
+import asyncio
+import datetime
+import pytest
+import pytest_asyncio
+
+from aiohttp import web
+
+###########################################################################################################################
+#
+# role na rbacobject (loader authorizations, authorizationCache) a RoleBasedPermission proti falesnemu GQL endpointu
+#
+###########################################################################################################################
+
+administratorId = "ced46aa4-3217-4fc1-b79d-f6be7d21c6b6"
+lecturerId = "5f0c2578-931f-11ed-9b95-0242ac110002"
+userId = "2d9dc5ca-a4a2-11ed-b9df-0242ac120003"
+otherUserId = "89d1e724-ae0f-11ed-9bd8-0242ac110002"
+
+def role(roleTypeId, userId, groupId, valid=True):
+    return {"valid": valid, "roletype": {"id": roleTypeId}, "user": {"id": userId}, "group": {"id": groupId}}
+
+# role na rbacobject, skupina role (group) neni rbacobject
+groupId = "00000000-0000-0000-0000-0000000000a1"
+fakeRoles = {
+    "00000000-0000-0000-0000-000000000001": [
+        role(administratorId, userId, groupId),
+        role(lecturerId, otherUserId, groupId)],
+    "00000000-0000-0000-0000-000000000002": [
+        role(lecturerId, userId, groupId),
+        # zneplatnena role opravneni nedava
+        role(administratorId, userId, groupId, valid=False)],
+}
+
+@pytest.fixture
+def SeedData():
+    # uzivatel ma na ...0001 roli administrator, na ...0002 roli lecturer, na ...0003 zadnou, kazdy paty radek je bez rbacobject
+    rbacobjects = [uuid.UUID(rbacobject) for rbacobject in [*fakeRoles.keys(), "00000000-0000-0000-0000-000000000003"]]
+    def rbacobject(index):
+        return None if index % 5 == 4 else rbacobjects[index % 3]
+    typeId = uuid.uuid4()
+    start = datetime.datetime(2024, 1, 1)
+    events = [
+        {"id": uuid.uuid4(), "name": f"event {index}", "type_id": typeId, "startdate": start + datetime.timedelta(hours=index),
+         "rbacobject": rbacobject(index)}
+        for index in range(60)]
+    presences = [
+        {"id": uuid.uuid4(), "event_id": events[0]["id"], "user_id": uuid.uuid4(), "rbacobject": rbacobject(index)}
+        for index in range(10)]
+    return {"eventtypes": [{"id": typeId, "name": "type"}], "events": events, "events_users": presences, "typeId": typeId}
+
+@pytest_asyncio.fixture
+async def RBACEndpoint(monkeypatch):
+    state = {"calls": 0, "ids": []}
+
+    async def handler(request):
+        state["calls"] = state["calls"] + 1
+        body = await request.json()
+        data = {}
+        for name, id in body["variables"].items():
+            state["ids"].append(id)
+            assert "rbacById" in body["query"]
+            data["r" + name[2:]] = {"roles": fakeRoles.get(id, [])}
+        return web.json_response({"data": data})
+
+    app = web.Application()
+    app.router.add_post("/gql", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    monkeypatch.setenv("GQLUG_ENDPOINT_URL", f"http://127.0.0.1:{port}/gql")
+
+    from src._GraphPermissions import authorizationCache
+    authorizationCache.clear()
+    yield state
+    authorizationCache.clear()
+    await runner.cleanup()
+
+def createInfo(asyncSessionMaker=None):
+    from types import SimpleNamespace
+    from src.Dataloaders import createLoaders
+    context = {"loaders": createLoaders(asyncSessionMaker), "user": {"id": userId}}
+    return SimpleNamespace(context=context)
+
+@pytest.mark.asyncio
+async def test_authorizations_batched(RBACEndpoint):
+    import src.GraphTypeDefinitions
+    from src.GraphTypeDefinitionsExt import RBACObjectGQLModel
+    info = createInfo()
+    rbacobjects = [*fakeRoles.keys(), "00000000-0000-0000-0000-000000000003"]
+    results = await asyncio.gather(*[
+        RBACObjectGQLModel.resolve_roles(info=info, id=rbacobjects[index % 3]) for index in range(100)])
+    # jeden dotaz, kazdy rbacobject jen jednou
+    assert RBACEndpoint["calls"] == 1
+    assert sorted(RBACEndpoint["ids"]) == sorted(rbacobjects)
+    assert results[0] == fakeRoles[rbacobjects[0]]
+    assert results[2] == []
+    assert results[0].roleTypeIdsOf(userId) == frozenset([administratorId])
+
+    # dalsi request je obslouzen z procesni cache
+    await RBACObjectGQLModel.resolve_roles(info=createInfo(), id=rbacobjects[1])
+    assert RBACEndpoint["calls"] == 1
+
+@pytest.mark.asyncio
+async def test_authorizations_ttl(RBACEndpoint):
+    from src._GraphPermissions import AuthorizationCache
+    cache = AuthorizationCache(ttl=0)
+    rbacobject = "00000000-0000-0000-0000-000000000001"
+    await cache.load_many([rbacobject])
+    await asyncio.sleep(0.01)
+    await cache.load_many([rbacobject])
+    assert RBACEndpoint["calls"] == 2
+
+@pytest.mark.asyncio
+async def test_role_based_permission(RBACEndpoint):
+    from types import SimpleNamespace
+    import src.GraphTypeDefinitions
+    from src._GraphPermissions import RoleBasedPermission
+    permission = RoleBasedPermission(roles="administrator")()
+    info = createInfo()
+    allowed = SimpleNamespace(rbacobject="00000000-0000-0000-0000-000000000001")
+    denied = SimpleNamespace(rbacobject="00000000-0000-0000-0000-000000000002")
+    assert await permission.has_permission(allowed, info)
+    assert not await permission.has_permission(denied, info)
+    assert await RoleBasedPermission(roles="administrator;lecturer")().has_permission(denied, info)
+    assert RBACEndpoint["calls"] == 2
+
+@pytest.mark.asyncio
+async def test_role_based_permission_list(RBACEndpoint):
+    from types import SimpleNamespace
+    import src.GraphTypeDefinitions
+    from src._GraphPermissions import RoleBasedPermission
+    Permission = RoleBasedPermission(roles="administrator")
+    rbacobjects = [*fakeRoles.keys(), "00000000-0000-0000-0000-000000000003"]
+    entities = [SimpleNamespace(id=index, rbacobject=rbacobjects[index % 3]) for index in range(500)]
+
+    listInfo = createInfo()
+    permitted = await Permission.filterPermitted(listInfo, entities)
+    # role byly nacteny jednou davkou, kazdy rbacobject byl vyhodnocen jednou
+    assert RBACEndpoint["calls"] == 1
+    assert len(listInfo.context["permissionDecisions"]) == 3
+
+    # stejny vysledek jako kontrola po polozkach
+    itemInfo = createInfo()
+    expected = [entity for entity in entities if await Permission().has_permission(entity, itemInfo)]
+    assert [entity.id for entity in permitted] == [entity.id for entity in expected]
+    assert len(permitted) == 167
+
+@pytest.mark.asyncio
+async def test_role_based_page_in_sql(RBACEndpoint, SeededDatabase):
+    import src.GraphTypeDefinitions
+    from src._GraphPermissions import RoleBasedPermission
+
+    asyncSessionMaker = SeededDatabase["asyncSessionMaker"]
+    for roles in ["administrator", "administrator;lecturer"]:
+        Permission = RoleBasedPermission(roles=roles)
+        info = createInfo(asyncSessionMaker)
+        loader = info.context["loaders"].events
+        permitted = await Permission.permittedRbacobjects(info, loader)
+        page = list(await loader.page(skip=5, limit=10, orderby="startdate", rbacobjects=permitted))
+        # LIMIT plati pro povolene radky, vysledek odpovida filtrovani po nacteni vsech radku, radky bez rbacobject nejsou vraceny nikdy
+        allRows = list(await loader.page(skip=0, limit=1000, orderby="startdate"))
+        expected = (await Permission.filterPermitted(info, allRows))[5:15]
+        assert [row.id for row in page] == [row.id for row in expected]
+        assert len(page) == 10
+    # zneplatnena role administrator na rbacobject ...0002 opravneni nedava
+    info = createInfo(asyncSessionMaker)
+    permitted = await RoleBasedPermission(roles="administrator").permittedRbacobjects(info, info.context["loaders"].events)
+    assert permitted == frozenset(list(fakeRoles.keys())[:1])
+
+@pytest.mark.asyncio
+async def test_decision_cache(RBACEndpoint, monkeypatch):
+    from types import SimpleNamespace
+    import src.GraphTypeDefinitions
+    from src import _GraphPermissions
+    from src._GraphPermissions import RoleBasedPermission, DecisionCache, InvalidateAuthorizations
+
+    # vychozi stav je vypnuto
+    assert not _GraphPermissions.decisionCache.enabled
+    assert DecisionCache(enabled=True, ttl=60, denyttl=600).denyttl == 60
+    cache = DecisionCache(enabled=True, ttl=60, denyttl=5)
+    monkeypatch.setattr(_GraphPermissions, "decisionCache", cache)
+
+    Permission = RoleBasedPermission(roles="administrator")
+    allowed = SimpleNamespace(rbacobject="00000000-0000-0000-0000-000000000001")
+    denied = SimpleNamespace(rbacobject="00000000-0000-0000-0000-000000000002")
+    assert await Permission().has_permission(allowed, createInfo())
+    assert not await Permission().has_permission(denied, createInfo())
+    assert cache.stats()["misses"] == 2
+
+    # dalsi requesty jsou rozhodnuty z cache, bez cteni roli
+    _GraphPermissions.authorizationCache.clear()
+    assert await Permission().has_permission(allowed, createInfo())
+    assert not await Permission().has_permission(denied, createInfo())
+    assert RBACEndpoint["calls"] == 2
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["hitRate"] == 0.5
+
+    # zamitnuti ma kratsi TTL nez povoleni
+    [allowedEntry, deniedEntry] = [cache.entries[key] for key in sorted(cache.entries.keys(), key=lambda key: key[1])]
+    assert deniedEntry[0] < allowedEntry[0]
+
+    # zmena roli na rbacobject
+    fakeRoles[denied.rbacobject].append(role(administratorId, userId, denied.rbacobject))
+    try:
+        InvalidateAuthorizations(rbacobject=denied.rbacobject)
+        assert (userId, denied.rbacobject, "administrator") not in cache.entries
+        assert (userId, allowed.rbacobject, "administrator") in cache.entries
+        assert await Permission().has_permission(denied, createInfo())
+        assert RBACEndpoint["calls"] == 3
+    finally:
+        fakeRoles[denied.rbacobject].pop()
+    InvalidateAuthorizations()
+    assert cache.stats()["size"] == 0
+
+@pytest.mark.asyncio
+async def test_permission_trace(RBACEndpoint, monkeypatch):
+    from types import SimpleNamespace
+    import src.GraphTypeDefinitions
+    from src import _GraphPermissions
+    from src._GraphPermissions import RoleBasedPermission
+
+    permission = RoleBasedPermission(roles="administrator")()
+    entity = SimpleNamespace(rbacobject="00000000-0000-0000-0000-000000000001")
+    info = createInfo()
+    assert await permission.has_permission(entity, info)
+    assert "trace" not in info.context
+
+    monkeypatch.setattr(_GraphPermissions, "isTracing", True)
+    info = createInfo()
+    assert await permission.has_permission(entity, info)
+    assert await permission.has_permission(entity, info)
+    # opakovana kontrola v ramci requestu neni trasovana znovu
+    assert info.context["trace"] == [{
+        "permission": "RoleBasedPermission", "allowed": True, "roles": "administrator",
+        "rbacobject": entity.rbacobject, "source": "authorizations"}]
+
+@pytest.mark.asyncio
+async def test_event_lists_filtered_by_permission(RBACEndpoint, SeededDatabase, monkeypatch):
+    from src.Dataloaders import createLoadersContext
+    from src.GraphTypeDefinitions import schema
+
+    monkeypatch.setenv("DEMO", "False")
+    asyncSessionMaker = SeededDatabase["asyncSessionMaker"]
+    [events, presences, typeId] = [SeededDatabase["events"], SeededDatabase["events_users"], SeededDatabase["typeId"]]
+    # povolene jsou radky na ...0001 (administrator) a ...0002 (lecturer)
+    rbacobjects = [uuid.UUID(rbacobject) for rbacobject in fakeRoles.keys()]
+    permitted = lambda rows: {f"{row['id']}" for row in rows if row["rbacobject"] in rbacobjects}
+
+    query = """query($typeId: UUID!, $eventId: UUID!) {
+        eventPage(limit: 100) { id }
+        eventConnection(first: 100) { edges { node { id } } }
+        eventPresencePage(limit: 100) { id }
+        eventById(id: $eventId) { presences { id } }
+        eventTypeById(id: $typeId) { events(limit: 100) { id } eventsCount }
+    }"""
+    context = createLoadersContext(asyncSessionMaker)
+    context["user"] = {"id": userId}
+    result = await schema.execute(query, variable_values={"typeId": f"{typeId}", "eventId": f"{events[0]['id']}"}, context_value=context)
+    assert result.errors is None, result.errors
+    data = result.data
+    assert {row["id"] for row in data["eventPage"]} == permitted(events)
+    assert {edge["node"]["id"] for edge in data["eventConnection"]["edges"]} == permitted(events)
+    assert {row["id"] for row in data["eventPresencePage"]} == permitted(presences)
+    assert {row["id"] for row in data["eventById"]["presences"]} == permitted(presences)
+    assert {row["id"] for row in data["eventTypeById"]["events"]} == permitted(events)
+    assert data["eventTypeById"]["eventsCount"] == len(permitted(events))
+    # role byly nacteny jednim dotazem
+    assert RBACEndpoint["calls"] == 1
@@ -0,0 +1,91 @@
+import uuid
+import datetime
+import pytest
+
+###########################################################################################################################
+#
+# strankovani podle klice (eventConnection, eventPresenceConnection)
+#
+###########################################################################################################################
+
+EVENTS = 25
+# udalosti bez startdate, strankuji se az za ostatnimi (podle id)
+UNDATED = 5
+PRESENCES = 15
+
+@pytest.fixture
+def SeedData():
+    start = datetime.datetime(2024, 1, 1)
+    events = [
+        {"id": uuid.uuid4(), "name": f"event {index:02}", "startdate": start + datetime.timedelta(hours=index), "lastchange": start}
+        for index in range(EVENTS - UNDATED)]
+    events.extend(sorted(
+        ({"id": uuid.uuid4(), "name": f"undated {index}", "startdate": None, "lastchange": start} for index in range(UNDATED)),
+        key=lambda row: row["id"]))
+    presences = [
+        {"id": uuid.uuid4(), "event_id": events[0]["id"], "user_id": uuid.uuid4(), "lastchange": start + datetime.timedelta(minutes=index)}
+        for index in range(PRESENCES)]
+    return {"events": events, "events_users": presences}
+
+@pytest.mark.asyncio
+async def test_connections_resolve(SeededDatabase, CountingExecutor):
+    data = await CountingExecutor("""{
+        eventConnection(first: 5) { edges { cursor node { id } } pageInfo { hasNextPage endCursor } }
+        eventPresenceConnection(first: 5) { edges { cursor node { id } } pageInfo { hasNextPage endCursor } }
+    }""")
+    assert [edge["node"]["id"] for edge in data["eventConnection"]["edges"]] == [f"{row['id']}" for row in SeededDatabase["events"][:5]]
+    assert [edge["node"]["id"] for edge in data["eventPresenceConnection"]["edges"]] == [f"{row['id']}" for row in SeededDatabase["events_users"][:5]]
+    assert data["eventConnection"]["pageInfo"]["hasNextPage"]
+    assert data["eventPresenceConnection"]["pageInfo"]["hasNextPage"]
+
+async def walk(CountingExecutor, field, first, arguments=""):
+    """Projde vsechny stranky pomoci after = endCursor, vraci (list id, list stranek)"""
+    ids = []
+    pages = []
+    after = None
+    while True:
+        afterArgument = "" if after is None else f', after: "{after}"'
+        data = await CountingExecutor("""{ %s(first: %s%s%s) { edges { cursor node { id } } pageInfo { hasNextPage endCursor } } }""" % (
+            field, first, afterArgument, arguments))
+        page = data[field]
+        pages.append(page)
+        ids.extend(edge["node"]["id"] for edge in page["edges"])
+        if page["edges"]:
+            assert page["pageInfo"]["endCursor"] == page["edges"][-1]["cursor"]
+        if not page["pageInfo"]["hasNextPage"]:
+            return ids, pages
+        after = page["pageInfo"]["endCursor"]
+
+@pytest.mark.asyncio
+async def test_event_connection_cursor_round_trip(SeededDatabase, CountingExecutor):
+    ids, pages = await walk(CountingExecutor, "eventConnection", 7)
+    # kazda udalost prave jednou, datovane podle startdate, nedatovane na konci podle id
+    assert ids == [f"{row['id']}" for row in SeededDatabase["events"]]
+    assert [len(page["edges"]) for page in pages] == [7, 7, 7, 4]
+
+    # stranka pres hranici datovanych a nedatovanych udalosti, dalsi stranka zacina v nedatovanych
+    boundary = pages[2]["edges"]
+    assert boundary[-2]["node"]["id"] == f"{SeededDatabase['events'][EVENTS - UNDATED - 1]['id']}"
+    assert boundary[-1]["node"]["id"] == f"{SeededDatabase['events'][EVENTS - UNDATED]['id']}"
+
+    # jine razeni, vsechny lastchange jsou shodne, rozhoduje id
+    ids, pages = await walk(CountingExecutor, "eventConnection", 10, ", orderBy: LASTCHANGE")
+    assert ids == sorted(f"{row['id']}" for row in SeededDatabase["events"])
+
+@pytest.mark.asyncio
+async def test_connection_last_page(SeededDatabase, CountingExecutor):
+    # posledni stranka je zaplnena presne, hasNextPage je False
+    ids, pages = await walk(CountingExecutor, "eventPresenceConnection", 5)
+    assert ids == [f"{row['id']}" for row in SeededDatabase["events_users"]]
+    assert [len(page["edges"]) for page in pages] == [5, 5, 5]
+    assert [page["pageInfo"]["hasNextPage"] for page in pages] == [True, True, False]
+
+    # za koncem je prazdna stranka, endCursor zustava
+    endCursor = pages[-1]["pageInfo"]["endCursor"]
+    data = await CountingExecutor("""{ eventPresenceConnection(first: 5, after: "%s") { edges { cursor } pageInfo { hasNextPage endCursor } } }""" % endCursor)
+    assert data["eventPresenceConnection"] == {"edges": [], "pageInfo": {"hasNextPage": False, "endCursor": endCursor}}
+
+    # konec v nedatovanych udalostech
+    ids, pages = await walk(CountingExecutor, "eventConnection", UNDATED)
+    assert pages[-1]["pageInfo"]["hasNextPage"] is False
+    assert len(pages) == EVENTS // UNDATED
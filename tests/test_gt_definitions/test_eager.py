@@ -0,0 +1,58 @@
+import uuid
+import datetime
+import pytest
+
+###########################################################################################################################
+#
+# eventPage nacita vybrane vazby (eventType, presences, groups, subEvents) spolu se strankou, pocet dotazu nezavisi na poctu radku
+#
+###########################################################################################################################
+
+@pytest.fixture
+def SeedData():
+    eventTypes = [{"id": uuid.uuid4(), "name": f"type {index}"} for index in range(3)]
+    start = datetime.datetime(2024, 1, 1)
+    masters = [
+        {"id": uuid.uuid4(), "name": f"master {index}", "type_id": eventTypes[index % 3]["id"], "startdate": start + datetime.timedelta(hours=index)}
+        for index in range(30)]
+    subEvents = [
+        {"id": uuid.uuid4(), "name": f"sub {index}", "type_id": eventTypes[0]["id"], "masterevent_id": masters[index % 10]["id"], "startdate": start + datetime.timedelta(days=10)}
+        for index in range(40)]
+    presences = [{"id": uuid.uuid4(), "event_id": masters[index % 20]["id"], "user_id": uuid.uuid4()} for index in range(100)]
+    groups = [{"id": uuid.uuid4(), "event_id": masters[index % 15]["id"], "group_id": uuid.uuid4()} for index in range(45)]
+    return {"eventtypes": eventTypes, "events": [*masters, *subEvents], "events_users": presences, "events_groups": groups, "masters": masters}
+
+eventFields = """id eventType { id name } presences { id } groups { id } subEvents { id name }"""
+
+def normalized(row):
+    return {
+        **row,
+        "presences": sorted(item["id"] for item in row["presences"]),
+        "groups": sorted(item["id"] for item in row["groups"]),
+        "subEvents": sorted(item["id"] for item in row["subEvents"])
+    }
+
+@pytest.mark.asyncio
+async def test_page_relations_fixed_queries(SeededDatabase, CountingExecutor):
+    # stranka (s eventtypes) + jeden dotaz na kazdou kolekci
+    for limit in [5, 30]:
+        data = await CountingExecutor("""{ eventPage(limit: %s, orderby: "startdate") { %s } }""" % (limit, eventFields))
+        assert len(data["eventPage"]) == limit
+        assert len(SeededDatabase["statements"]) == 4
+
+    # vysledek je shodny s nactenim bez eager loadingu (eventById)
+    rows = data["eventPage"]
+    for row in rows[:12]:
+        byId = await CountingExecutor("""{ eventById(id: "%s") { %s } }""" % (row["id"], eventFields))
+        assert normalized(byId["eventById"]) == normalized(row)
+    assert sum(len(row["presences"]) for row in rows) == 100
+    assert sum(len(row["groups"]) for row in rows) == 45
+    assert sum(len(row["subEvents"]) for row in rows) == 40
+
+@pytest.mark.asyncio
+async def test_page_relations_only_selected(SeededDatabase, CountingExecutor):
+    # nevybrane vazby nejsou nacitany, eventType { id } je stub z ciziho klice
+    await CountingExecutor("""{ eventPage(limit: 30) { id eventType { id } presences { id } } }""")
+    assert len(SeededDatabase["statements"]) == 2
+    assert "JOIN" not in SeededDatabase["statements"][0]
+    assert "FROM events_users" in SeededDatabase["statements"][1]
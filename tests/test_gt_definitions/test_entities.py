@@ -0,0 +1,79 @@
+import uuid
+import datetime
+import pytest
+
+###########################################################################################################################
+#
+# federacni _entities, reprezentace jsou resolvovany davkove (jeden SQL dotaz na typ)
+#
+###########################################################################################################################
+
+EVENTS = 100
+USERS = 20
+
+@pytest.fixture
+def SeedData():
+    userIds = [uuid.uuid4() for _ in range(USERS)]
+    groupIds = [uuid.uuid4() for _ in range(USERS)]
+    start = datetime.datetime(2024, 1, 1)
+    events = [{"id": uuid.uuid4(), "name": f"event {index}", "startdate": start + datetime.timedelta(hours=index)} for index in range(EVENTS)]
+    presences = [{"id": uuid.uuid4(), "event_id": row["id"], "user_id": userIds[index % USERS]} for index, row in enumerate(events)]
+    links = [{"id": uuid.uuid4(), "event_id": row["id"], "group_id": groupIds[index % USERS]} for index, row in enumerate(events)]
+    return {"events": events, "events_users": presences, "events_groups": links, "userIds": userIds, "groupIds": groupIds, "start": start}
+
+@pytest.mark.asyncio
+async def test_entities_one_statement_per_type(SeededDatabase, CountingExecutor):
+    representations = [
+        *[{"__typename": "EventGQLModel", "id": f"{row['id']}"} for row in SeededDatabase["events"]],
+        *[{"__typename": "PresenceGQLModel", "id": f"{row['id']}"} for row in SeededDatabase["events_users"]],
+        {"__typename": "EventGQLModel", "id": f"{uuid.uuid4()}"},
+    ]
+    data = await CountingExecutor("""query($representations: [_Any!]!) {
+        _entities(representations: $representations) {
+            ... on EventGQLModel { id name }
+            ... on PresenceGQLModel { id }
+        }
+    }""", {"representations": representations})
+    entities = data["_entities"]
+    assert len(entities) == len(representations)
+    assert [entity["id"] for entity in entities[:-1]] == [representation["id"] for representation in representations[:-1]]
+    assert entities[0]["name"] == "event 0"
+    assert entities[-1] is None
+    assert len(SeededDatabase["statements"]) == 2
+
+@pytest.mark.asyncio
+async def test_entities_users_and_groups_events(SeededDatabase, CountingExecutor):
+    representations = [
+        *[{"__typename": "UserGQLModel", "id": f"{id}"} for id in SeededDatabase["userIds"]],
+        *[{"__typename": "GroupGQLModel", "id": f"{id}"} for id in SeededDatabase["groupIds"]],
+    ]
+    data = await CountingExecutor("""query($representations: [_Any!]!) {
+        _entities(representations: $representations) {
+            ... on UserGQLModel { id events(limit: 3) { id startdate } }
+            ... on GroupGQLModel { id events(skip: 1, limit: 10) { id } }
+        }
+    }""", {"representations": representations})
+    entities = data["_entities"]
+    # udalosti vsech uzivatelu jednim dotazem, udalosti vsech skupin druhym
+    assert len(SeededDatabase["statements"]) == 2
+
+    perOwner = EVENTS // USERS
+    userEvents = entities[0]["events"]
+    assert len(userEvents) == 3
+    expected = [f"{row['id']}" for index, row in enumerate(SeededDatabase["events"]) if index % USERS == 0]
+    assert [row["id"] for row in userEvents] == expected[:3]
+    groupEvents = entities[USERS]["events"]
+    assert [row["id"] for row in groupEvents] == expected[1:perOwner]
+
+@pytest.mark.asyncio
+async def test_entities_users_events_where(SeededDatabase, CountingExecutor):
+    representations = [{"__typename": "UserGQLModel", "id": f"{id}"} for id in SeededDatabase["userIds"][:2]]
+    startdate = (SeededDatabase["start"] + datetime.timedelta(hours=USERS)).isoformat()
+    data = await CountingExecutor("""query($representations: [_Any!]!, $startdate: DateTime) {
+        _entities(representations: $representations) {
+            ... on UserGQLModel { id events(where: {startdate: {_ge: $startdate}}) { id } }
+        }
+    }""", {"representations": representations, "startdate": startdate})
+    perOwner = EVENTS // USERS
+    assert [len(entity["events"]) for entity in data["_entities"]] == [perOwner - 1, perOwner - 1]
+    assert len(SeededDatabase["statements"]) == 1
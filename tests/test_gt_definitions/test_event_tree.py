@@ -0,0 +1,60 @@
+import uuid
+import datetime
+import pytest
+
+###########################################################################################################################
+#
+# EventGQLModel.ancestors a descendants (rekurzivni CTE nad masterevent_id)
+#
+# root
+#   semester a (startdate +2 dny)
+#     lesson a1 (+3), lesson a2 (+4)
+#       part a2x (+5)
+#   semester b (startdate +1 den)
+#     lesson b1 (+6)
+#
+###########################################################################################################################
+
+@pytest.fixture
+def SeedData():
+    typeId = uuid.uuid4()
+    start = datetime.datetime(2024, 1, 1)
+    masters = {"root": None, "a": "root", "b": "root", "a1": "a", "a2": "a", "a2x": "a2", "b1": "b"}
+    days = {"root": 0, "a": 2, "b": 1, "a1": 3, "a2": 4, "a2x": 5, "b1": 6}
+    ids = {name: uuid.uuid4() for name in masters}
+    events = [
+        {"id": ids[name], "name": name, "type_id": typeId, "startdate": start + datetime.timedelta(days=days[name]),
+            "masterevent_id": None if master is None else ids[master]}
+        for name, master in masters.items()]
+    return {"eventtypes": [{"id": typeId, "name": "type"}], "events": events, "ids": ids}
+
+async def names(CountingExecutor, SeededDatabase, field, name, arguments=""):
+    data = await CountingExecutor(
+        f"""query($id: UUID!) {{ eventById(id: $id) {{ {field}{arguments} {{ name }} }} }}""",
+        {"id": f"{SeededDatabase['ids'][name]}"})
+    return [row["name"] for row in data["eventById"][field]]
+
+@pytest.mark.asyncio
+async def test_descendants_ordered_by_level(SeededDatabase, CountingExecutor):
+    # uroven, v ramci urovne startdate
+    assert await names(CountingExecutor, SeededDatabase, "descendants", "root") == ["b", "a", "a1", "a2", "b1", "a2x"]
+    # eventById a jeden dotaz pro cely podstrom
+    assert len(SeededDatabase["statements"]) == 2
+    assert await names(CountingExecutor, SeededDatabase, "descendants", "a") == ["a1", "a2", "a2x"]
+
+@pytest.mark.asyncio
+async def test_descendants_max_depth(SeededDatabase, CountingExecutor):
+    assert await names(CountingExecutor, SeededDatabase, "descendants", "root", "(maxDepth: 1)") == ["b", "a"]
+    assert await names(CountingExecutor, SeededDatabase, "descendants", "root", "(maxDepth: 2)") == ["b", "a", "a1", "a2", "b1"]
+    assert await names(CountingExecutor, SeededDatabase, "descendants", "root", "(maxDepth: 10)") == ["b", "a", "a1", "a2", "b1", "a2x"]
+    assert await names(CountingExecutor, SeededDatabase, "descendants", "a2x") == []
+
+@pytest.mark.asyncio
+async def test_ancestors_nearest_first(SeededDatabase, CountingExecutor):
+    assert await names(CountingExecutor, SeededDatabase, "ancestors", "a2x") == ["a2", "a", "root"]
+    assert len(SeededDatabase["statements"]) == 2
+    assert await names(CountingExecutor, SeededDatabase, "ancestors", "b1") == ["b", "root"]
+
+@pytest.mark.asyncio
+async def test_ancestors_of_event_without_master(SeededDatabase, CountingExecutor):
+    assert await names(CountingExecutor, SeededDatabase, "ancestors", "root") == []
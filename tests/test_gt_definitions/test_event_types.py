@@ -0,0 +1,49 @@
+import uuid
+import datetime
+import pytest
+
+###########################################################################################################################
+#
+# EventTypeGQLModel.events je strankovany, eventsCount je COUNT ... GROUP BY, oboji jednim dotazem pro vsechny typy stranky
+#
+###########################################################################################################################
+
+@pytest.fixture
+def SeedData():
+    eventTypes = [{"id": uuid.uuid4(), "name": f"type {index}"} for index in range(4)]
+    start = datetime.datetime(2024, 1, 1)
+    # typ s indexem i ma (i + 1) * 10 udalosti, posledni typ zadnou
+    events = [
+        {"id": uuid.uuid4(), "name": f"event {typeIndex} {index:02}", "type_id": eventType["id"], "startdate": start + datetime.timedelta(hours=index)}
+        for typeIndex, eventType in enumerate(eventTypes[:3]) for index in range((typeIndex + 1) * 10)]
+    return {"eventtypes": eventTypes, "events": events}
+
+def byName(data):
+    return {row["name"]: row for row in data["eventTypePage"]}
+
+@pytest.mark.asyncio
+async def test_events_paged(SeededDatabase, CountingExecutor):
+    data = byName(await CountingExecutor("""{ eventTypePage(limit: 10) { name eventsCount events(skip: 2, limit: 5) { name } } }"""))
+    # stranka typu, udalosti vsech typu, pocty vsech typu
+    assert len(SeededDatabase["statements"]) == 3
+    assert [data[f"type {index}"]["eventsCount"] for index in range(4)] == [10, 20, 30, 0]
+    assert [row["name"] for row in data["type 1"]["events"]] == [f"event 1 {index:02}" for index in range(2, 7)]
+    assert data["type 3"]["events"] == []
+
+    # vychozi limit
+    data = byName(await CountingExecutor("""{ eventTypePage(limit: 10) { name events { name } } }"""))
+    assert len(data["type 2"]["events"]) == 10
+
+@pytest.mark.asyncio
+async def test_events_where_orderby(SeededDatabase, CountingExecutor):
+    data = byName(await CountingExecutor("""{ eventTypePage(limit: 10) {
+        name
+        eventsCount(where: {name: {_eq: "event 2 05"}})
+        events(orderby: "name", desc: true, limit: 3) { name }
+        filtered: events(where: {name: {_eq: "event 2 05"}}) { name }
+    } }"""))
+    assert len(SeededDatabase["statements"]) == 4
+    assert [data[f"type {index}"]["eventsCount"] for index in range(4)] == [0, 0, 1, 0]
+    assert [row["name"] for row in data["type 2"]["events"]] == ["event 2 29", "event 2 28", "event 2 27"]
+    assert data["type 2"]["filtered"] == [{"name": "event 2 05"}]
+    assert data["type 0"]["filtered"] == []
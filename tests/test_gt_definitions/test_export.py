@@ -0,0 +1,161 @@
+import io
+import csv
+import json
+import uuid
+import datetime
+import pytest
+import pytest_asyncio
+
+###########################################################################################################################
+#
+# export udalosti a prezenci (src.DBExport, endpointy /export/events a /export/presences)
+#
+###########################################################################################################################
+
+EVENTS = 5
+START = datetime.datetime(2024, 1, 1, 8, 0)
+
+@pytest.fixture
+def SeedData():
+    typeId = uuid.uuid4()
+    invitationTypeId = uuid.uuid4()
+    # poradi vlozeni je opacne k poradi exportu (startdate, id)
+    events = [
+        {"id": uuid.uuid4(), "name": f"event {index}", "type_id": typeId, "startdate": START + datetime.timedelta(days=index),
+            "description": None if index % 2 else f"description {index}"}
+        for index in reversed(range(EVENTS))]
+    presences = [
+        {"id": uuid.uuid4(), "event_id": event["id"], "user_id": uuid.uuid4(), "invitationtype_id": invitationTypeId}
+        for event in events for _ in range(2)]
+    return {
+        "eventtypes": [{"id": typeId, "name": "type"}], "eventinvitationtypes": [{"id": invitationTypeId, "name": "invited"}],
+        "events": events, "events_users": presences,
+        "exportedEvents": sorted(events, key=lambda row: row["startdate"]), "typeId": typeId}
+
+def readNDJSON(text):
+    return [json.loads(line) for line in text.splitlines()]
+
+def readCSV(text):
+    return list(csv.DictReader(io.StringIO(text)))
+
+def test_to_json_value():
+    from src.DBExport import toJsonValue
+
+    id = uuid.uuid4()
+    assert toJsonValue(id) == f"{id}"
+    assert toJsonValue(datetime.datetime(2024, 1, 2, 3, 4, 5)) == "2024-01-02T03:04:05"
+    assert toJsonValue(datetime.date(2024, 1, 2)) == "2024-01-02"
+    assert toJsonValue("text") == "text"
+    assert toJsonValue(None) is None
+
+def test_convert_where():
+    from src.DBDefinitions import EventModel
+    from src.DBExport import convertWhere
+
+    typeId = uuid.uuid4()
+    where = convertWhere(EventModel, {
+        "startdate": {"_ge": "2024-01-02T08:00:00+01:00"},
+        "_or": [{"type_id": {"_eq": f"{typeId}"}}, {"name": {"_in": ["a", "b"]}}]
+    })
+    # casova zona je odstranena, sloupce jsou bez zony
+    assert where["startdate"]["_ge"] == datetime.datetime(2024, 1, 2, 8, 0)
+    assert where["_or"][0]["type_id"]["_eq"] == typeId
+    assert where["_or"][1]["name"]["_in"] == ["a", "b"]
+
+def test_convert_where_rejects_unknown_names():
+    from src.DBDefinitions import EventModel
+    from src.DBExport import convertWhere
+
+    with pytest.raises(AssertionError):
+        convertWhere(EventModel, {"unknown": {"_eq": 1}})
+    with pytest.raises(AssertionError):
+        convertWhere(EventModel, {"_and": [{"description": {"_eq": "x"}}]}, allowedNames=["name"])
+
+@pytest.mark.asyncio
+async def test_stream_events_ndjson(SeededDatabase):
+    from src.DBDefinitions import EventModel
+    from src.DBExport import streamRows, create_statement_for_events_export
+
+    blocks = [block async for block in streamRows(
+        SeededDatabase["asyncSessionMaker"], EventModel, create_statement_for_events_export(), format="ndjson", chunkSize=2)]
+    # 5 radku po 2 radcich
+    assert len(blocks) == 3
+    rows = readNDJSON("".join(blocks))
+    assert [row["id"] for row in rows] == [f"{event['id']}" for event in SeededDatabase["exportedEvents"]]
+    assert rows[0]["startdate"] == START.isoformat()
+    assert rows[0]["type_id"] == f"{SeededDatabase['typeId']}"
+    assert rows[1]["description"] is None
+
+@pytest.mark.asyncio
+async def test_stream_presences_csv(SeededDatabase):
+    from src.DBDefinitions import EventModel, PresenceModel
+    from src.DBExport import streamRows, convertWhere, create_statement_for_presences_export
+
+    firstEvent = SeededDatabase["exportedEvents"][0]
+    where = convertWhere(EventModel, {"startdate": {"_lt": (START + datetime.timedelta(hours=1)).isoformat()}})
+    blocks = [block async for block in streamRows(
+        SeededDatabase["asyncSessionMaker"], PresenceModel, create_statement_for_presences_export(where), format="csv")]
+    # hlavicka je samostatny blok
+    assert readCSV(blocks[0]) == []
+    rows = readCSV("".join(blocks))
+    assert list(rows[0].keys()) == [column.key for column in PresenceModel.__table__.columns]
+    assert {row["event_id"] for row in rows} == {f"{firstEvent['id']}"}
+    assert len(rows) == 2
+    assert all(row["presencetype_id"] == "" for row in rows)
+
+@pytest.mark.asyncio
+async def test_stream_rows_unknown_format(SeededDatabase):
+    from src.DBDefinitions import EventModel
+    from src.DBExport import streamRows, create_statement_for_events_export
+
+    with pytest.raises(AssertionError):
+        [block async for block in streamRows(SeededDatabase["asyncSessionMaker"], EventModel, create_statement_for_events_export(), format="xml")]
+
+@pytest_asyncio.fixture
+async def ExportClient(SeededDatabase, DemoTrue, monkeypatch):
+    import httpx
+    import main
+
+    async def sessionMaker():
+        return SeededDatabase["asyncSessionMaker"]
+    async def sentinel(request, item):
+        return None
+    monkeypatch.setattr(main, "RunOnceAndReturnSessionMaker", sessionMaker)
+    monkeypatch.setattr(main, "sentinel", sentinel)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        yield client
+
+@pytest.mark.asyncio
+async def test_export_events_endpoint(SeededDatabase, ExportClient):
+    where = {"startdate": {"_ge": (START + datetime.timedelta(days=3)).isoformat()}}
+    response = await ExportClient.post("/export/events", json={"where": where})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = readNDJSON(response.text)
+    assert [row["id"] for row in rows] == [f"{event['id']}" for event in SeededDatabase["exportedEvents"][3:]]
+
+    response = await ExportClient.post("/export/events", json={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = readCSV(response.text)
+    assert [row["name"] for row in rows] == [event["name"] for event in SeededDatabase["exportedEvents"]]
+
+@pytest.mark.asyncio
+async def test_export_presences_endpoint(SeededDatabase, ExportClient):
+    lastEvent = SeededDatabase["exportedEvents"][-1]
+    where = {"_and": [{"type_id": {"_eq": f"{SeededDatabase['typeId']}"}}, {"name": {"_eq": lastEvent["name"]}}]}
+    response = await ExportClient.post("/export/presences", json={"where": where, "format": "csv"})
+    assert response.status_code == 200
+    rows = readCSV(response.text)
+    assert len(rows) == 2
+    assert {row["event_id"] for row in rows} == {f"{lastEvent['id']}"}
+
+@pytest.mark.asyncio
+async def test_export_rejects_invalid_requests(ExportClient):
+    response = await ExportClient.post("/export/events", json={"format": "xml"})
+    assert response.status_code == 400
+    # description neni v EventInputFilter
+    response = await ExportClient.post("/export/events", json={"where": {"description": {"_eq": "x"}}})
+    assert response.status_code == 400
+    response = await ExportClient.post("/export/presences", json={"where": {"startdate": {"_ge": "not a date"}}})
+    assert response.status_code == 400
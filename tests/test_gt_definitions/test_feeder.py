@@ -0,0 +1,297 @@
+import uuid
+import datetime
+import pytest
+import pytest_asyncio
+
+from sqlalchemy import select, insert, update, delete, func, text
+
+###########################################################################################################################
+#
+# proudove cteni systemdata.json (iterJsonTables, get_demodata)
+#
+###########################################################################################################################
+
+sourceJson = {
+    "events": [
+        {"id": "3c8b2f8e-6b3a-4a55-9e3b-2c1d9f6c1a01", "name": "a \"quoted\" {name}", "startdate": "2024-01-02T08:00:00+01:00",
+            "type_id": "b87d7c2c-8fd4-11ed-a6d4-0242ac110002", "masterevent_id": "", "capacity": 12345678},
+        {"id": "3c8b2f8e-6b3a-4a55-9e3b-2c1d9f6c1a02", "name": "b", "startdate": "not a date", "enddate": None, "nested": {"list": [1, 2.5, [3]]}}
+    ],
+    "empty": [],
+    "version": {"major": 1, "tables": ["events"]},
+    "groups": [
+        {"id": "9baf3aaa-7d0e-4cdb-9e1c-6e9f6b7e0001", "name": "group", "grouptype_id": "cd49e152-610c-11ed-9f29-001a7dda7110",
+            "outer_id": "not an uuid", "created": "2023-05-01T10:00:00"}
+    ],
+    "eventtypes": [{"id": "b87d7c2c-8fd4-11ed-a6d4-0242ac110002", "name": "CV"}]
+}
+
+def test_iter_json_tables_small_chunks():
+    import io
+    import json
+    from src.DBFeeder import iterJsonTables
+
+    text = json.dumps(sourceJson, indent=1)
+    expected = [(tableName, row) for tableName, rows in sourceJson.items() if isinstance(rows, list) for row in rows]
+    # bloky o velikosti 1 az 13 znaku deli retezce, cisla i vnorene struktury
+    for chunkSize in [1, 2, 7, 13, 1 << 20]:
+        assert list(iterJsonTables(io.StringIO(text), None, chunkSize=chunkSize)) == expected
+    selected = list(iterJsonTables(io.StringIO(text), {"groups", "empty"}, chunkSize=5))
+    assert selected == [("groups", sourceJson["groups"][0])]
+    assert list(iterJsonTables(io.StringIO("{}"), None)) == []
+
+def test_iter_json_tables_invalid():
+    import io
+    from src.DBFeeder import iterJsonTables
+
+    with pytest.raises(ValueError):
+        list(iterJsonTables(io.StringIO('{"events": [{"id": 1} {"id": 2}]}'), None, chunkSize=4))
+    with pytest.raises(ValueError):
+        list(iterJsonTables(io.StringIO('["events"]'), None))
+
+@pytest.fixture
+def SourceFile(tmp_path):
+    import json
+    filename = tmp_path / "systemdata.json"
+    filename.write_text(json.dumps(sourceJson), encoding="utf-8")
+    return f"{filename}"
+
+def test_get_demodata_selected_models(SourceFile):
+    from src.DBDefinitions import EventModel
+    from src.DBFeeder import get_demodata
+
+    data = get_demodata([EventModel], filename=SourceFile)
+    assert list(data.keys()) == ["events"]
+    [first, second] = data["events"]
+    assert first["id"] == uuid.UUID(sourceJson["events"][0]["id"])
+    assert first["type_id"] == uuid.UUID(sourceJson["events"][0]["type_id"])
+    # casova zona je odstranena, prazdne id je None
+    assert first["startdate"] == datetime.datetime(2024, 1, 2, 8, 0)
+    assert first["masterevent_id"] is None
+    # atributy mimo model jsou ponechany beze zmeny
+    assert first["name"] == sourceJson["events"][0]["name"]
+    assert first["capacity"] == 12345678
+    assert second["startdate"] is None
+    assert second["nested"] == {"list": [1, 2.5, [3]]}
+
+def test_get_demodata_without_models(SourceFile):
+    from src.DBFeeder import get_demodata
+
+    data = get_demodata(filename=SourceFile)
+    assert set(data.keys()) == {"events", "groups", "eventtypes"}
+    assert data["eventtypes"][0]["id"] == uuid.UUID(sourceJson["eventtypes"][0]["id"])
+    # tabulka bez modelu v teto sluzbe, prevod podle jmen klicu
+    [group] = data["groups"]
+    assert group["id"] == uuid.UUID(sourceJson["groups"][0]["id"])
+    assert group["grouptype_id"] == uuid.UUID(sourceJson["groups"][0]["grouptype_id"])
+    assert group["outer_id"] == "not an uuid"
+    assert group["created"] == datetime.datetime(2023, 5, 1, 10, 0)
+
+def test_get_demodata_systemdata():
+    import json
+    from src.DBDefinitions import EventModel, PresenceModel
+    from src.DBFeeder import get_demodata
+
+    with open("./systemdata.json", "r", encoding="utf-8") as f:
+        source = json.load(f)
+    data = get_demodata([EventModel, PresenceModel])
+    assert set(data.keys()) == {"events", "events_users"}
+    assert [f"{row['id']}" for row in data["events"]] == [row["id"] for row in source["events"]]
+    assert len(data["events_users"]) == len(source["events_users"])
+    assert all(isinstance(row["event_id"], uuid.UUID) for row in data["events_users"])
+
+    data = get_demodata()
+    assert set(data.keys()) == {tableName for tableName, rows in source.items() if len(rows) > 0}
+
+###########################################################################################################################
+#
+# SyncModels synchronizuje jen tabulky se zmenenym zdrojem a neprepisuje radky zmenene v DB po synchronizaci
+#
+###########################################################################################################################
+
+def sourceData(names):
+    return {"eventtypes": [{"id": id, "name": name} for id, name in names.items()]}
+
+async def readNames(asyncSessionMaker):
+    from src.DBDefinitions import EventTypeModel
+    async with asyncSessionMaker() as session:
+        rows = await session.execute(select(EventTypeModel.id, EventTypeModel.name))
+        return {row.id: row.name for row in rows}
+
+async def readSyncedAt(asyncSessionMaker):
+    from src.DBDefinitions import feederStateTable
+    async with asyncSessionMaker() as session:
+        rows = await session.execute(select(feederStateTable.c.lastchange).where(feederStateTable.c.tablename == "eventtypes"))
+        return rows.scalar()
+
+@pytest.mark.asyncio
+async def test_sync_skips_unchanged_source(CountingDatabase):
+    from src.DBDefinitions import EventTypeModel
+    from src.DBFeeder import SyncModels
+
+    asyncSessionMaker = CountingDatabase["asyncSessionMaker"]
+    names = {uuid.uuid4(): f"type {index}" for index in range(3)}
+    result = await SyncModels(asyncSessionMaker, [EventTypeModel], sourceData(names))
+    assert result["eventtypes"] == (3, 0, 0)
+    result = await SyncModels(asyncSessionMaker, [EventTypeModel], sourceData(names))
+    assert result["eventtypes"] == "skipped"
+
+    # smazany seedovany radek (jiny pocet radku) je pri dalsi synchronizaci doplnen
+    deletedId = list(names)[0]
+    async with asyncSessionMaker() as session:
+        await session.execute(delete(EventTypeModel).where(EventTypeModel.id == deletedId))
+        await session.commit()
+    result = await SyncModels(asyncSessionMaker, [EventTypeModel], sourceData(names))
+    assert result["eventtypes"] == (1, 0, 0)
+    assert await readNames(asyncSessionMaker) == names
+    result = await SyncModels(asyncSessionMaker, [EventTypeModel], sourceData(names))
+    assert result["eventtypes"] == "skipped"
+
+@pytest.mark.asyncio
+async def test_sync_keeps_rows_changed_after_sync(CountingDatabase):
+    from src.DBDefinitions import EventTypeModel
+    from src.DBFeeder import SyncModels
+
+    asyncSessionMaker = CountingDatabase["asyncSessionMaker"]
+    names = {uuid.uuid4(): f"type {index}" for index in range(3)}
+    await SyncModels(asyncSessionMaker, [EventTypeModel], sourceData(names))
+    syncedAt = await readSyncedAt(asyncSessionMaker)
+
+    [editedId, untouchedId, _] = list(names)
+    async with asyncSessionMaker() as session:
+        # zmena po synchronizaci
+        await session.execute(
+            update(EventTypeModel).where(EventTypeModel.id == editedId)
+            .values(name="edited", lastchange=syncedAt + datetime.timedelta(hours=1)))
+        # radek, ktery od synchronizace nikdo nezmenil
+        await session.execute(
+            update(EventTypeModel).where(EventTypeModel.id == untouchedId)
+            .values(lastchange=syncedAt - datetime.timedelta(hours=1)))
+        await session.commit()
+
+    # zmeneny zdroj (seed)
+    newId = uuid.uuid4()
+    changed = {**{id: f"{name} v2" for id, name in names.items()}, newId: "type new"}
+    result = await SyncModels(asyncSessionMaker, [EventTypeModel], sourceData(changed))
+    (inserted, updated, kept) = result["eventtypes"]
+    assert inserted == 1
+    assert kept == 1
+
+    stored = await readNames(asyncSessionMaker)
+    assert stored[editedId] == "edited"
+    assert stored[untouchedId] == f"{names[untouchedId]} v2"
+    assert stored[newId] == "type new"
+    assert updated == len([id for id in names if stored[id].endswith(" v2")])
+
+@pytest.mark.asyncio
+async def test_sync_keeps_rows_updated_by_loader(CountingDatabase):
+    from src.DBDefinitions import EventTypeModel
+    from src.Dataloaders import createIdLoaderExt
+    from src.DBFeeder import SyncModels
+
+    asyncSessionMaker = CountingDatabase["asyncSessionMaker"]
+    names = {uuid.uuid4(): f"type {index}" for index in range(2)}
+    await SyncModels(asyncSessionMaker, [EventTypeModel], sourceData(names))
+
+    # lastchange zapsany pri update je cas DB, je tedy pozdejsi nez cas synchronizace
+    [editedId, untouchedId] = list(names)
+    loader = createIdLoaderExt(asyncSessionMaker, EventTypeModel)
+    row = await loader.load(editedId)
+    row.name = "edited"
+    assert await loader.update(row) is not None
+    assert (await readNames(asyncSessionMaker))[editedId] == "edited"
+
+    changed = {id: f"{name} v2" for id, name in names.items()}
+    result = await SyncModels(asyncSessionMaker, [EventTypeModel], sourceData(changed))
+    assert result["eventtypes"] == (0, 1, 1)
+    stored = await readNames(asyncSessionMaker)
+    assert stored == {editedId: "edited", untouchedId: f"{names[untouchedId]} v2"}
+
+@pytest.mark.asyncio
+async def test_sync_refills_tables_after_drop(tmp_path, monkeypatch):
+    import json
+    from src.DBDefinitions import startEngine, EventModel, PresenceModel
+    from src.DBFeeder import initDB
+
+    with open("./systemdata.json", "r", encoding="utf-8") as f:
+        source = json.load(f)
+    monkeypatch.setenv("DEMODATA", "True")
+    connectionString = f"sqlite+aiosqlite:///{tmp_path / 'events.sqlite'}"
+    # makeDrop smaze i feeder_state, kazde spusteni tedy tabulky znovu naplni
+    for _ in range(2):
+        asyncSessionMaker = await startEngine(connectionString, makeDrop=True, makeUp=True)
+        await initDB(asyncSessionMaker)
+        async with asyncSessionMaker() as session:
+            for DBModel in [EventModel, PresenceModel]:
+                rowcount = (await session.execute(select(func.count()).select_from(DBModel))).scalar()
+                assert rowcount == len(source[DBModel.__tablename__])
+        await asyncSessionMaker.kw["bind"].dispose()
+
+@pytest.mark.asyncio
+async def test_first_sync_does_not_update_existing_rows(CountingDatabase):
+    from src.DBDefinitions import EventTypeModel
+    from src.DBFeeder import SyncModels
+
+    asyncSessionMaker = CountingDatabase["asyncSessionMaker"]
+    existingId = uuid.uuid4()
+    async with asyncSessionMaker() as session:
+        await session.execute(insert(EventTypeModel).values(id=existingId, name="from DB"))
+        await session.commit()
+
+    # DB naplnena pred zavedenim feeder_state (ImportModels), stejne jako ImportModels radky jen doplni
+    newId = uuid.uuid4()
+    result = await SyncModels(asyncSessionMaker, [EventTypeModel], sourceData({existingId: "from seed", newId: "new"}))
+    assert result["eventtypes"] == (1, 0, 1)
+    stored = await readNames(asyncSessionMaker)
+    assert stored == {existingId: "from DB", newId: "new"}
+
+###########################################################################################################################
+#
+# BulkImportModels uklada radky v poradi _chunk, nadrizene udalosti (masterevent_id) jsou vlozeny pred podrizenymi
+#
+###########################################################################################################################
+
+@pytest_asyncio.fixture
+async def ForeignKeyDatabase():
+    """Prazdna SQLite DB v pameti s vynucovanim cizich klicu (kazdy INSERT je kontrolovan hned)"""
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from src.DBDefinitions import BaseModel
+
+    asyncEngine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    event.listen(asyncEngine.sync_engine, "connect", lambda connection, record: connection.execute("PRAGMA foreign_keys=ON"))
+    async with asyncEngine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+    yield async_sessionmaker(asyncEngine, expire_on_commit=False)
+    await asyncEngine.dispose()
+
+@pytest.mark.asyncio
+async def test_bulk_import_masterevent_chains(ForeignKeyDatabase):
+    import random
+    from src.DBDefinitions import EventModel
+    from src.DBGenerator import generateData, withCatalogues, dbModels
+    from src.DBFeeder import BulkImportModels
+
+    data = withCatalogues(generateData(events=300, users=200, seed=1))
+    events = data["events"]
+    assert len([row for row in events if row["masterevent_id"] is not None]) > 0
+    # poradi ve zdroji nesmi hrat roli, rozhoduje _chunk
+    random.Random(0).shuffle(events)
+
+    async with ForeignKeyDatabase() as session:
+        foreignKeys = (await session.execute(text("PRAGMA foreign_keys"))).scalar()
+    assert foreignKeys == 1
+
+    # male davky, aby se skolni roky, semestry i vyuka rozlozily do vice davek
+    result = await BulkImportModels(ForeignKeyDatabase, dbModels, data, chunkSize=50)
+    assert result["events"][0] == len(events)
+    assert result["events_users"][0] == len(data["events_users"])
+
+    async with ForeignKeyDatabase() as session:
+        rows = await session.execute(select(EventModel.id, EventModel.masterevent_id))
+        stored = {row.id: row.masterevent_id for row in rows}
+    assert stored == {row["id"]: row["masterevent_id"] for row in events}
+
+    # opakovany import nic nevlozi
+    result = await BulkImportModels(ForeignKeyDatabase, dbModels, data, chunkSize=50)
+    assert all(inserted == 0 for (inserted, _) in result.values())
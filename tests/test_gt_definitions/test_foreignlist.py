@@ -0,0 +1,44 @@
+import uuid
+import pytest
+import strawberry
+
+from typing import List, Optional
+###########################################################################################################################
+#
+# asForeignList, strankovany seznam polozek omezeny na rodice (cizi klic)
+#
+###########################################################################################################################
+
+@pytest.fixture
+def SeedData():
+    events = [{"id": uuid.uuid4(), "name": f"event {index}"} for index in range(2)]
+    presences = [{"id": uuid.uuid4(), "event_id": events[index % 2]["id"], "user_id": uuid.uuid4()} for index in range(9)]
+    return {"events": events, "events_users": presences}
+
+@pytest.mark.asyncio
+async def test_foreign_list(SeededDatabase, capsys):
+    from types import SimpleNamespace
+    import src.GraphTypeDefinitions
+    from src._GraphResolvers import asForeignList
+    from src.GraphTypeDefinitions import PresenceGQLModel, PresenceInputFilter
+    from src.Dataloaders import createLoadersContext
+
+    def presences(self, info: strawberry.types.Info) -> List[PresenceGQLModel]:
+        return PresenceGQLModel.getLoader(info)
+    def presencesWhere(self, info: strawberry.types.Info, where: Optional[PresenceInputFilter] = None) -> List[PresenceGQLModel]:
+        return PresenceGQLModel.getLoader(info)
+    simple = asForeignList(foreignKeyName="event_id")(presences)
+    complex = asForeignList(foreignKeyName="event_id")(presencesWhere)
+    # dekorator nic nevypisuje
+    assert capsys.readouterr().out == ""
+
+    info = SimpleNamespace(context=createLoadersContext(SeededDatabase["asyncSessionMaker"]))
+    [first, second] = SeededDatabase["events"]
+    expected = {f"{row['id']}" for row in SeededDatabase["events_users"] if row["event_id"] == first["id"]}
+    rows = list(await simple(SimpleNamespace(id=first["id"]), info, skip=0, limit=100))
+    assert {f"{row.id}" for row in rows} == expected
+    rows = list(await complex(SimpleNamespace(id=first["id"]), info, skip=1, limit=2))
+    assert len(rows) == 2
+    assert {f"{row.id}" for row in rows} <= expected
+    rows = list(await complex(SimpleNamespace(id=second["id"]), info, skip=0, limit=100))
+    assert len(rows) == 4
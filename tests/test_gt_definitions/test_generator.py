@@ -0,0 +1,67 @@
+import sys
+import logging
+import pytest
+
+###########################################################################################################################
+#
+# generator syntetickych dat (src.DBGenerator)
+#
+###########################################################################################################################
+
+def test_same_seed_same_data():
+    from src.DBGenerator import generateData
+
+    first = generateData(events=500, users=300, seed=7)
+    assert first == generateData(events=500, users=300, seed=7)
+    other = generateData(events=500, users=300, seed=8)
+    assert [row["id"] for row in first["events"]] != [row["id"] for row in other["events"]]
+
+@pytest.mark.parametrize("events", [0, 1, 2, 3, 50, 137, 1000])
+def test_event_count_within_limit(events):
+    from src.DBGenerator import generateData
+
+    data = generateData(events=events, users=200, seed=1)
+    assert len(data["events"]) <= events
+    if events >= 50:
+        assert len(data["events"]) == events
+
+def test_references():
+    from src.DBGenerator import generateData, eventTypeIds
+
+    data = generateData(events=1000, users=300, seed=2)
+    events = {row["id"]: row for row in data["events"]}
+    assert len(events) == len(data["events"])
+    for row in data["events"]:
+        assert f"{row['type_id']}" in eventTypeIds.values()
+        master = row["masterevent_id"]
+        if master is None:
+            assert row["_chunk"] == 0
+            continue
+        # nadrizena udalost existuje a je ukladana drive (nizsi _chunk)
+        assert master in events
+        assert events[master]["_chunk"] < row["_chunk"]
+    assert all(row["event_id"] in events for row in data["events_groups"])
+    assert all(row["event_id"] in events for row in data["events_users"])
+    ids = [row["id"] for rows in data.values() for row in rows]
+    assert len(ids) == len(set(ids))
+
+def test_write_data_round_trip(tmp_path):
+    from src.DBGenerator import generateData, writeData, dbModels
+    from src.DBFeeder import get_demodata
+
+    data = generateData(events=200, users=100, seed=3)
+    filename = f"{tmp_path / 'data.json'}"
+    writeData(data, filename)
+    assert get_demodata(dbModels, filename=filename) == data
+
+def test_main_logs_counts(tmp_path, monkeypatch, caplog, capsys):
+    from src.DBGenerator import main
+
+    filename = f"{tmp_path / 'data.json'}"
+    monkeypatch.setattr(sys, "argv", ["DBGenerator", "--events", "100", "--users", "50", "--output", filename])
+    with caplog.at_level(logging.INFO):
+        main()
+    messages = [record.getMessage() for record in caplog.records]
+    assert "generated events: 100 rows" in messages
+    assert f"data written to {filename}" in messages
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,67 @@
+import uuid
+import pytest
+
+###########################################################################################################################
+#
+# vnorene subEvents jsou nacitany po urovnich, pocet dotazu roste s hloubkou, nikoliv s poctem udalosti
+#
+###########################################################################################################################
+
+def generateHierarchy(fanout, depth=4):
+    """Strom udalosti o depth urovnich (koren + depth - 1 urovni subEvents), kazda udalost ma fanout podudalosti"""
+    root = {"id": uuid.uuid4(), "name": "root", "masterevent_id": None}
+    events = [root]
+    level = [root]
+    for index in range(depth - 1):
+        level = [
+            {"id": uuid.uuid4(), "name": f"level {index + 1}", "masterevent_id": parent["id"]}
+            for parent in level for _ in range(fanout)]
+        events.extend(level)
+    presences = [{"id": uuid.uuid4(), "event_id": row["id"], "user_id": uuid.uuid4()} for row in level]
+    return root, events, presences
+
+@pytest.fixture(params=[2, 4])
+def SeedData(request):
+    root, events, presences = generateHierarchy(fanout=request.param)
+    return {"events": events, "events_users": presences, "root": root}
+
+def flatten(row, field="subEvents"):
+    result = []
+    for child in row.get(field, []):
+        result.append((row["id"], child["id"]))
+        result.extend(flatten(child, field))
+    return result
+
+@pytest.mark.asyncio
+async def test_levels_by_id(SeededDatabase, CountingExecutor):
+    root = SeededDatabase["root"]
+    data = await CountingExecutor("""{ eventById(id: "%s") { id subEvents { id subEvents { id subEvents { id presences { id } } } } } }""" % root["id"])
+    # koren, tri urovne subEvents, prezence
+    assert len(SeededDatabase["statements"]) == 5
+    edges = flatten(data["eventById"])
+    expected = [(f"{row['masterevent_id']}", f"{row['id']}") for row in SeededDatabase["events"] if row["masterevent_id"] is not None]
+    assert sorted(edges) == sorted(expected)
+
+    leaves = [leaf for first in data["eventById"]["subEvents"] for second in first["subEvents"] for leaf in second["subEvents"]]
+    assert sum(len(leaf["presences"]) for leaf in leaves) == len(SeededDatabase["events_users"])
+
+    # mene urovni = mene dotazu
+    await CountingExecutor("""{ eventById(id: "%s") { id subEvents { id subEvents { id } } } }""" % root["id"])
+    assert len(SeededDatabase["statements"]) == 3
+
+@pytest.mark.asyncio
+async def test_levels_with_other_fields(SeededDatabase, CountingExecutor):
+    # dalsi (i asynchronni) pole na urovnich nerozdeli davku
+    root = SeededDatabase["root"]
+    data = await CountingExecutor("""{ eventById(id: "%s") {
+        id subEvents { id masterEvent { name } subEvents { id eventType { id } subEvents { id name } } } } }""" % root["id"])
+    assert len(SeededDatabase["statements"]) == 4
+    assert all(row["masterEvent"]["name"] == "root" for row in data["eventById"]["subEvents"])
+
+@pytest.mark.asyncio
+async def test_levels_from_page(SeededDatabase, CountingExecutor):
+    # prvni uroven je nactena se strankou (eager loading), dalsi urovne po urovnich
+    data = await CountingExecutor("""{ eventPage(limit: 1, orderby: "masterevent_id") { id subEvents { id subEvents { id subEvents { id } } } } }""")
+    assert data["eventPage"][0]["id"] == f"{SeededDatabase['root']['id']}"
+    assert len(SeededDatabase["statements"]) == 4
+    assert len(flatten(data["eventPage"][0])) == len(SeededDatabase["events"]) - 1
@@ -0,0 +1,42 @@
+import uuid
+import datetime
+import pytest
+
+###########################################################################################################################
+#
+# vyber jen id z relace (eventType { id }, masterEvent { id }, ...) je zodpovezen z ciziho klice bez dotazu do DB
+#
+###########################################################################################################################
+
+@pytest.fixture
+def SeedData():
+    eventType = {"id": uuid.uuid4(), "name": "lecture"}
+    presenceType = {"id": uuid.uuid4(), "name": "present"}
+    master = {"id": uuid.uuid4(), "name": "semester", "type_id": eventType["id"]}
+    events = [{"id": uuid.uuid4(), "name": f"event {index}", "type_id": eventType["id"], "masterevent_id": master["id"]} for index in range(20)]
+    presences = [{"id": uuid.uuid4(), "event_id": row["id"], "user_id": uuid.uuid4(), "presencetype_id": presenceType["id"]} for row in events]
+    return {
+        "eventtypes": [eventType], "eventpresencetypes": [presenceType], "events": [master, *events], "events_users": presences,
+        "eventType": eventType, "master": master, "presenceType": presenceType}
+
+@pytest.mark.asyncio
+async def test_id_only_relations(SeededDatabase, CountingExecutor):
+    data = await CountingExecutor("""{ eventPage(limit: 100) { id eventType { id __typename } masterEvent { id } } }""")
+    assert len(SeededDatabase["statements"]) == 1
+    rows = [row for row in data["eventPage"] if row["masterEvent"] is not None]
+    assert len(rows) == 20
+    assert all(row["eventType"] == {"id": f"{SeededDatabase['eventType']['id']}", "__typename": "EventTypeGQLModel"} for row in rows)
+    assert all(row["masterEvent"]["id"] == f"{SeededDatabase['master']['id']}" for row in rows)
+
+    data = await CountingExecutor("""{ eventPresencePage(limit: 100) { id event { id } presenceType { id } } }""")
+    assert len(SeededDatabase["statements"]) == 1
+    assert all(row["presenceType"]["id"] == f"{SeededDatabase['presenceType']['id']}" for row in data["eventPresencePage"])
+
+@pytest.mark.asyncio
+async def test_relations_with_other_fields(SeededDatabase, CountingExecutor):
+    # s dalsimi poli (i ve fragmentu) je entita nactena z DB
+    data = await CountingExecutor("""{ eventPage(limit: 100) { id eventType { id name } masterEvent { ... on EventGQLModel { id } } } }""")
+    # masterEvent je soucasti stranky, loader events jej ma v cache, eventtypes jsou pripojeny k dotazu stranky (eager loading)
+    assert len(SeededDatabase["statements"]) == 1
+    assert "JOIN eventtypes" in SeededDatabase["statements"][0]
+    assert all(row["eventType"]["name"] == "lecture" for row in data["eventPage"])
@@ -0,0 +1,62 @@
+import uuid
+import pytest
+
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.dialects import postgresql
+
+###########################################################################################################################
+#
+# partitioned tabulka events (jen PostgreSQL), DDL je overeno prekladem bez pripojeni k DB
+#
+###########################################################################################################################
+
+@pytest.fixture
+def SeedData():
+    typeId = uuid.uuid4()
+    return {"eventtypes": [{"id": typeId, "name": "type"}], "typeId": typeId}
+
+def compileDDL(table):
+    return str(CreateTable(table).compile(dialect=postgresql.dialect()))
+
+def test_partitioned_events_keep_foreign_keys():
+    from src.DBDefinitions import partitionedEventsTable
+
+    table = partitionedEventsTable()
+    assert [column.name for column in table.primary_key.columns] == ["id", "startdate"]
+    assert {foreignKey.target_fullname for foreignKey in table.foreign_keys} == {"eventtypes.id"}
+    ddl = compileDDL(table)
+    assert "PARTITION BY RANGE (startdate)" in ddl
+    assert "REFERENCES eventtypes (id)" in ddl
+    assert "REFERENCES events " not in ddl
+
+@pytest.mark.parametrize("partitioned", [False, True])
+def test_foreign_keys_to_events(partitioned):
+    from src.DBDefinitions import partitioning, EventModel, EventGroupModel
+
+    partitioning["events"] = partitioned
+    try:
+        eventsDDL = compileDDL(EventModel.__table__)
+        groupsDDL = compileDDL(EventGroupModel.__table__)
+    finally:
+        partitioning["events"] = False
+    # odkazy na events.id jen bez partitions, ostatni cizi klice vzdy
+    assert ("REFERENCES events (id)" in groupsDDL) != partitioned
+    assert ("REFERENCES events (id)" in eventsDDL) != partitioned
+    assert "REFERENCES eventtypes (id)" in eventsDDL
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("partitioned", [False, True])
+async def test_insert_without_startdate(partitioned, SeededDatabase, CountingExecutor, monkeypatch):
+    from sqlalchemy import select, func
+    from src.DBDefinitions import partitioning, EventModel
+
+    typeId = SeededDatabase["typeId"]
+    # v partitioned tabulce je startdate NOT NULL, insert bez nej je odmitnut jeste pred zapisem
+    monkeypatch.setitem(partitioning, "events", partitioned)
+    data = await CountingExecutor("""mutation($typeId: UUID!) {
+        result: eventInsert(event: {name: "event", typeId: $typeId, startdate: null}) { id msg }
+    }""", {"typeId": f"{typeId}"})
+    assert data["result"]["msg"] == ("fail" if partitioned else "ok")
+    async with SeededDatabase["asyncSessionMaker"]() as session:
+        count = (await session.execute(select(func.count()).select_from(EventModel))).scalar()
+    assert count == (0 if partitioned else 1)
@@ -0,0 +1,110 @@
+import json
+import uuid
+import pytest
+import pytest_asyncio
+
+###########################################################################################################################
+#
+# benchmarks.replay, nacteni zaznamenanych operaci a jejich prehrani proti main.app
+#
+###########################################################################################################################
+
+def queriesLine(name, query=None, mutation=None, variables={}):
+    # stejny format jako zapisuje fixture QueriesFile
+    return f'"{name}": {json.dumps({"query": query, "mutation": mutation, "variables": variables})}, \n'
+
+def test_parse_queries_line():
+    from benchmarks.replay import parseLine
+
+    id = f"{uuid.uuid4()}"
+    query = "query($id: UUID!) { eventById(id: $id) { id } }"
+    assert parseLine(queriesLine("query_eventById_1", query=query, variables={"id": id})) == {"query": query, "variables": {"id": id}}
+    mutation = "mutation { eventTypeInsert(eventType: {name: \"x\"}) { id } }"
+    assert parseLine(queriesLine("mutation_eventTypeInsert_1", mutation=mutation)) == {"query": mutation, "variables": {}}
+
+def test_parse_jsonl_line():
+    from benchmarks.replay import parseLine
+
+    query = "query Page($limit: Int!) { eventPage(limit: $limit) { id } }"
+    line = json.dumps({"query": query, "variables": {"limit": 5}, "operationName": "Page"})
+    assert parseLine(line) == {"query": query, "variables": {"limit": 5}, "operationName": "Page"}
+    # variables null je prazdny dict
+    assert parseLine(json.dumps({"query": query, "variables": None})) == {"query": query, "variables": {}}
+
+@pytest.mark.parametrize("line", [
+    "",
+    "   \n",
+    "not json at all",
+    '"broken": {"query": ',
+    "[1, 2, 3]",
+    '{"variables": {"id": 1}}',
+    '"name": {"query": null, "mutation": null}',
+    '{"query": 42}',
+])
+def test_parse_malformed_lines(line):
+    from benchmarks.replay import parseLine
+
+    assert parseLine(line) is None
+
+def test_load_operations(tmp_path):
+    from benchmarks.replay import loadOperations
+
+    query = "query { eventTypePage { id } }"
+    queries = tmp_path / "queries.txt"
+    queries.write_text(queriesLine("query_eventTypePage_1", query=query) + "garbage\n\n", encoding="utf-8")
+    jsonl = tmp_path / "operations.jsonl"
+    jsonl.write_text(json.dumps({"query": query, "variables": {"a": 1}}) + "\n{\n", encoding="utf-8")
+
+    operations, skipped = loadOperations([f"{queries}", f"{jsonl}"])
+    assert operations == [{"query": query, "variables": {}}, {"query": query, "variables": {"a": 1}}]
+    assert skipped == 3
+
+@pytest.fixture
+def SeedData():
+    typeId = uuid.uuid4()
+    return {"eventtypes": [{"id": typeId, "name": "type"}], "typeId": typeId}
+
+@pytest_asyncio.fixture
+async def ReplayApp(SeededDatabase, DemoTrue, monkeypatch):
+    import main
+
+    async def sessionMaker():
+        return SeededDatabase["asyncSessionMaker"]
+    async def sentinel(request, item):
+        return None
+    monkeypatch.setattr(main, "RunOnceAndReturnSessionMaker", sessionMaker)
+    monkeypatch.setattr(main, "sentinel", sentinel)
+    return {**SeededDatabase, "app": main.app}
+
+@pytest.mark.asyncio
+async def test_replay(ReplayApp):
+    from benchmarks.replay import parseLine, replay, PoolWaitMeter
+
+    operations = [
+        parseLine(queriesLine("query_eventTypeById_1", query="query($id: UUID!) { eventTypeById(id: $id) { id name } }",
+            variables={"id": f"{ReplayApp['typeId']}"})),
+        parseLine(json.dumps({"query": "query { eventTypePage { id } }"})),
+        # neznama polozka, odpoved obsahuje errors
+        parseLine(json.dumps({"query": "query { unknownField }"})),
+    ]
+    meter = PoolWaitMeter(ReplayApp["asyncSessionMaker"].kw["bind"])
+    statements = ReplayApp["statements"]
+    statements.clear()
+    (duration, latencies, errors) = await replay(ReplayApp["app"], operations, requests=7, concurrency=2)
+    assert len(latencies) == 7
+    assert duration > 0
+    # operace se opakuji cyklicky, chybna je 3. a 6.
+    assert errors == 2
+    assert len(statements) > 0
+    assert len(meter.waits) > 0
+
+@pytest.mark.asyncio
+async def test_replay_with_rate(ReplayApp):
+    from benchmarks.replay import replay
+
+    operations = [{"query": "query { eventTypePage { id name } }", "variables": {}}]
+    (duration, latencies, errors) = await replay(ReplayApp["app"], operations, requests=4, concurrency=4, rate=100)
+    assert errors == 0
+    assert len(latencies) == 4
+    # 4 operace pri 100 ops/s, posledni startuje po 30 ms
+    assert duration >= 0.03
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+import pytest_asyncio
+
+from aiohttp import web
+
+###########################################################################################################################
+#
+# katalog roli proti lokalnimu (falesnemu) GQL endpointu
+#
+###########################################################################################################################
+
+fakeRoles = [
+    {"id": "ced46aa4-3217-4fc1-b79d-f6be7d21c6b6", "name": "administrátor", "nameEn": "administrator"},
+    {"id": "11111111-2222-3333-4444-555555555555", "name": "nová role", "nameEn": "new role"},
+]
+
+@pytest_asyncio.fixture
+async def RoleEndpoint():
+    state = {"roles": fakeRoles, "status": 200, "calls": 0}
+
+    async def handler(request):
+        state["calls"] = state["calls"] + 1
+        body = await request.json()
+        assert "roleTypePage" in body["query"]
+        return web.json_response({"data": {"roleTypePage": state["roles"]}}, status=state["status"])
+
+    app = web.Application()
+    app.router.add_post("/gql", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    state["url"] = f"http://127.0.0.1:{port}/gql"
+    yield state
+    await runner.cleanup()
+
+@pytest.mark.asyncio
+async def test_role_catalogue_refresh(RoleEndpoint):
+    from src._GraphPermissions import RoleCatalogue, ReadAllRoles, rolelist
+    catalogue = RoleCatalogue(rolelist, readRoles=lambda: ReadAllRoles(RoleEndpoint["url"]))
+    assert "new role" not in catalogue.roleIndex
+    assert await catalogue.refresh()
+    assert catalogue.roleIndex["new role"] == "11111111-2222-3333-4444-555555555555"
+
+    # pri chybe zustava posledni znamy katalog
+    RoleEndpoint["status"] = 500
+    assert not await catalogue.refresh()
+    assert catalogue.roleIndex["new role"] == "11111111-2222-3333-4444-555555555555"
+
+@pytest.mark.asyncio
+async def test_role_catalogue_fallback():
+    from src._GraphPermissions import RoleCatalogue, ReadAllRoles, rolelist
+    catalogue = RoleCatalogue(rolelist, readRoles=lambda: ReadAllRoles("http://127.0.0.1:1/gql"))
+    assert not await catalogue.refresh()
+    assert catalogue.roleIndex["administrator"] == "ced46aa4-3217-4fc1-b79d-f6be7d21c6b6"
+
+@pytest.mark.asyncio
+async def test_role_catalogue_background_refresh(RoleEndpoint, monkeypatch):
+    import src._GraphPermissions as permissions
+    catalogue = permissions.RoleCatalogue(
+        permissions.rolelist, ttl=0.05, readRoles=lambda: permissions.ReadAllRoles(RoleEndpoint["url"]))
+    monkeypatch.setattr(permissions, "roleCatalogue", catalogue)
+
+    await catalogue.start()
+    try:
+        assert permissions.RolesToList("administrator; new role") == [
+            "ced46aa4-3217-4fc1-b79d-f6be7d21c6b6", "11111111-2222-3333-4444-555555555555"]
+
+        RoleEndpoint["roles"] = [{"id": "66666666-2222-3333-4444-555555555555", "name": "nová role", "nameEn": "new role"}]
+        await asyncio.sleep(0.2)
+        assert RoleEndpoint["calls"] > 2
+        # RolesToList cte obnoveny index
+        assert permissions.RolesToList("new role") == ["66666666-2222-3333-4444-555555555555"]
+    finally:
+        await catalogue.stop()
+    assert catalogue.task is None
@@ -0,0 +1,78 @@
+import pytest
+
+import sqlalchemy
+
+###########################################################################################################################
+#
+# startEngine provadi create_all jen pri zmene otisku schematu (schema_version)
+#
+###########################################################################################################################
+
+@pytest.fixture
+def CreateAllCalls(monkeypatch):
+    from src.DBDefinitions import BaseModel
+
+    calls = []
+    createAll = BaseModel.metadata.create_all
+    def spy(*args, **kwargs):
+        calls.append(args)
+        return createAll(*args, **kwargs)
+    monkeypatch.setattr(BaseModel.metadata, "create_all", spy)
+    return calls
+
+async def start(connectionstring):
+    from src.DBDefinitions import startEngine
+    asyncSessionMaker = await startEngine(connectionstring, makeDrop=False, makeUp=True)
+    await asyncSessionMaker.kw["bind"].dispose()
+    return asyncSessionMaker
+
+async def tableNames(connectionstring):
+    from sqlalchemy.ext.asyncio import create_async_engine
+    asyncEngine = create_async_engine(connectionstring)
+    async with asyncEngine.connect() as conn:
+        result = await conn.run_sync(lambda connection: set(sqlalchemy.inspect(connection).get_table_names()))
+    await asyncEngine.dispose()
+    return result
+
+@pytest.mark.asyncio
+async def test_matching_fingerprint_skips_create_all(tmp_path, CreateAllCalls):
+    connectionstring = f"sqlite+aiosqlite:///{tmp_path / 'data.sqlite'}"
+    await start(connectionstring)
+    assert len(CreateAllCalls) == 1
+    assert {"events", "events_users", "schema_version"} <= await tableNames(connectionstring)
+
+    await start(connectionstring)
+    await start(connectionstring)
+    assert len(CreateAllCalls) == 1
+
+@pytest.mark.asyncio
+async def test_changed_model_runs_create_all(tmp_path, CreateAllCalls):
+    from src.DBDefinitions import BaseModel, SCHEMANAME, schemaVersionTable
+
+    connectionstring = f"sqlite+aiosqlite:///{tmp_path / 'data.sqlite'}"
+    await start(connectionstring)
+    assert len(CreateAllCalls) == 1
+
+    # nova tabulka v modelech meni otisk
+    table = sqlalchemy.Table("schema_version_probe", BaseModel.metadata, sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True))
+    try:
+        await start(connectionstring)
+    finally:
+        BaseModel.metadata.remove(table)
+    assert len(CreateAllCalls) == 2
+    assert "schema_version_probe" in await tableNames(connectionstring)
+
+    # otisk v DB opet neodpovida (modely bez nove tabulky)
+    await start(connectionstring)
+    assert len(CreateAllCalls) == 3
+    await start(connectionstring)
+    assert len(CreateAllCalls) == 3
+
+    # otisk zmeneny v DB (napr. jinou verzi sluzby)
+    from sqlalchemy.ext.asyncio import create_async_engine
+    asyncEngine = create_async_engine(connectionstring)
+    async with asyncEngine.begin() as conn:
+        await conn.execute(sqlalchemy.update(schemaVersionTable).where(schemaVersionTable.c.name == SCHEMANAME).values(fingerprint="other"))
+    await asyncEngine.dispose()
+    await start(connectionstring)
+    assert len(CreateAllCalls) == 4
@@ -0,0 +1,32 @@
+import os
+import sys
+import time
+import subprocess
+
+from benchmarks.profile_startup import bootEnv
+
+###########################################################################################################################
+#
+# regresni test doby startu, rozpocet lze zmenit promennou STARTUP_BUDGET (v sekundach)
+#
+###########################################################################################################################
+
+def importInNewProcess(module):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", f"import {module}"],
+        env={**os.environ, **bootEnv}, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    return time.perf_counter() - start, result.stdout
+
+def test_boot_time_budget():
+    budget = float(os.environ.get("STARTUP_BUDGET", "5"))
+    # nejlepsi ze tri pokusu, prvni muze byt zatizen studenou cache souboru
+    duration = min(importInNewProcess("main")[0] for _ in range(3))
+    assert duration < budget, f"import main took {duration:.2f} s, budget is {budget:.2f} s"
+
+def test_request_modules_have_no_import_output():
+    for module in ["src.Dataloaders", "src.GraphResolvers", "src._GraphPermissions", "src.GraphTypeDefinitions"]:
+        _, output = importInNewProcess(module)
+        assert output == "", f"import {module} printed {output}"
@@ -0,0 +1,78 @@
+import uuid
+import datetime
+import pytest
+
+from sqlalchemy import select
+
+###########################################################################################################################
+#
+# update entit jednim UPDATE ... WHERE lastchange = ... RETURNING, vraceny radek je vlozen do cache loaderu
+#
+###########################################################################################################################
+
+@pytest.fixture
+def SeedData():
+    typeId = uuid.uuid4()
+    eventId = uuid.uuid4()
+    # lastchange dle server_default (now()), format se lisi od hodnot zapisovanych z Pythonu
+    return {
+        "eventtypes": [{"id": typeId, "name": "type"}],
+        "events": [{"id": eventId, "name": "original", "type_id": typeId}],
+        "eventId": eventId}
+
+async def readEvent(SeededDatabase):
+    from src.DBDefinitions import EventModel
+    async with SeededDatabase["asyncSessionMaker"]() as session:
+        rows = await session.execute(select(EventModel).where(EventModel.id == SeededDatabase["eventId"]))
+        return rows.scalar()
+
+updateQuery = """mutation($id: UUID!, $lastchange: DateTime!, $name: String!) {
+    result: eventUpdate(event: {id: $id, lastchange: $lastchange, name: $name}) { id msg event { id name lastchange } }
+}"""
+
+failQuery = """mutation($id: UUID!, $lastchange: DateTime!) {
+    result: eventUpdate(event: {id: $id, lastchange: $lastchange, name: "stale"}) { id msg }
+}"""
+
+@pytest.mark.asyncio
+async def test_update_returns_primed_row(SeededDatabase, CountingExecutor):
+    original = await readEvent(SeededDatabase)
+    variables = {"id": f"{SeededDatabase['eventId']}", "lastchange": original.lastchange.isoformat(), "name": "renamed"}
+    data = await CountingExecutor(updateQuery, variables)
+    result = data["result"]
+    assert result["msg"] == "ok"
+    assert result["event"]["name"] == "renamed"
+    # jen UPDATE ... RETURNING, event je nacten z cache loaderu
+    assert len(SeededDatabase["statements"]) == 1
+    assert SeededDatabase["statements"][0].lstrip().upper().startswith("UPDATE")
+    assert "RETURNING" in SeededDatabase["statements"][0].upper()
+
+    stored = await readEvent(SeededDatabase)
+    assert stored.name == "renamed"
+    assert stored.changedby == uuid.UUID("2d9dc5ca-a4a2-11ed-b9df-0242ac120003")
+    assert datetime.datetime.fromisoformat(result["event"]["lastchange"]) == stored.lastchange
+
+    # vracene lastchange lze pouzit pro dalsi update
+    variables = {**variables, "lastchange": result["event"]["lastchange"], "name": "renamed again"}
+    data = await CountingExecutor(updateQuery, variables)
+    assert data["result"]["msg"] == "ok"
+    assert data["result"]["event"]["name"] == "renamed again"
+
+@pytest.mark.asyncio
+async def test_update_with_stale_lastchange_fails(SeededDatabase, CountingExecutor):
+    original = await readEvent(SeededDatabase)
+    stale = original.lastchange - datetime.timedelta(seconds=1)
+    data = await CountingExecutor(failQuery, {"id": f"{SeededDatabase['eventId']}", "lastchange": stale.isoformat()})
+    assert data["result"]["msg"] == "fail"
+    assert len(SeededDatabase["statements"]) == 1
+
+    stored = await readEvent(SeededDatabase)
+    assert stored.name == "original"
+    assert stored.lastchange == original.lastchange
+    assert stored.changedby is None
+
+@pytest.mark.asyncio
+async def test_update_of_missing_row_fails(SeededDatabase, CountingExecutor):
+    original = await readEvent(SeededDatabase)
+    data = await CountingExecutor(failQuery, {"id": f"{uuid.uuid4()}", "lastchange": original.lastchange.isoformat()})
+    assert data["result"]["msg"] == "fail"